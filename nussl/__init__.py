@@ -1,33 +1,69 @@
-try:
-    import vamp
-    vamp_imported = True
-except Exception:
-    vamp_imported = False
-
 # Current nussl version
 __version__ = '1.1.3'
 
+import importlib
+import sys
+import types
+import warnings
+
+
 class ImportErrorClass(object):
     def __init__(self, lib, **kwargs):
         raise ImportError(
             f'Cannot import {type(self).__name__} because {lib} is not installed')
 
-import warnings
-
-try:
-    import musdb
-except RuntimeError:
-    warnings.warn(
-        "Importing musdb failed, likely because ffmpeg or ffprobe are not installed!.")
-    musdb = None
 
 from .core import AudioSignal, STFTParams
 from .core import utils, efz_utils, play_utils, constants, mixing
 
-
 from . import core
-from . import evaluation
-from . import datasets
-from . import ml
-from . import separation
 
+# Subpackages that pull in heavy dependencies (torch, ignite, museval,
+# sklearn, jams, ...) are imported on first attribute access, so that
+# ``import nussl`` stays fast for code that only needs :mod:`nussl.core`.
+_LAZY_SUBMODULES = ['evaluation', 'datasets', 'ml', 'separation']
+
+
+def _import_musdb():
+    try:
+        import musdb
+    except RuntimeError:
+        warnings.warn(
+            "Importing musdb failed, likely because ffmpeg or ffprobe are not installed!.")
+        musdb = None
+    return musdb
+
+
+def _import_vamp():
+    try:
+        import vamp
+        return True
+    except Exception:
+        return False
+
+
+_LAZY_ATTRIBUTES = {
+    'musdb': _import_musdb,
+    'vamp_imported': _import_vamp,
+}
+
+
+class _LazyModule(types.ModuleType):
+    # a module-level __getattr__ (PEP 562) needs Python 3.7, so the lazy attributes
+    # are looked up by the class of this module instead
+    def __getattr__(self, name):
+        if name in _LAZY_SUBMODULES:
+            value = importlib.import_module(f'.{name}', self.__name__)
+        elif name in _LAZY_ATTRIBUTES:
+            value = _LAZY_ATTRIBUTES[name]()
+        else:
+            raise AttributeError(f"module '{self.__name__}' has no attribute '{name}'")
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(
+            list(self.__dict__) + _LAZY_SUBMODULES + list(_LAZY_ATTRIBUTES))
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -4,13 +4,10 @@ import os.path
 import warnings
 from collections import namedtuple
 
-import audioread
-import librosa
 import numpy as np
 import scipy.io.wavfile as wav
 import scipy
 from scipy.signal import check_COLA
-import soundfile as sf
 import pyloudnorm
 
 from . import constants
@@ -155,6 +152,9 @@ class AudioSignal(object):
         duration (``float``): Length of the signal to read from the file (in seconds). Defaults to
             full length of the signal (i.e., ``None``).
         sample_rate (``int``): Sampling rate of this :class:`AudioSignal` object.
+        dtype (``str``): Floating point precision to keep :attr:`audio_data` in (one of
+            ``'float32'`` or ``'float64'``). :attr:`stft_data` is kept in the matching complex
+            precision. Defaults to ``None``, which uses :attr:`constants.DEFAULT_DTYPE`.
 
     Attributes:
         path_to_input_file (``str``): Path to the input file. ``None`` if this AudioSignal never
@@ -168,10 +168,14 @@ class AudioSignal(object):
     """
 
     def __init__(self, path_to_input_file=None, audio_data_array=None, stft=None, label=None,
-                 sample_rate=None, stft_params=None, offset=0, duration=None):
+                 sample_rate=None, stft_params=None, offset=0, duration=None, dtype=None):
+
+        self._dtype = None
+        self.dtype = dtype
 
         self.path_to_input_file = path_to_input_file
         self._audio_data = None
+        self._is_view = False
         self.original_signal_length = None
         self._stft_data = None
         self._sample_rate = None
@@ -373,6 +377,8 @@ class AudioSignal(object):
     @audio_data.setter
     def audio_data(self, value):
 
+        self._is_view = False
+
         if value is None:
             self._audio_data = None
             return
@@ -392,6 +398,9 @@ class AudioSignal(object):
         if value.ndim < 2:
             value = np.expand_dims(value, axis=constants.CHAN_INDEX)
 
+        if self.dtype is not None:
+            value = value.astype(self.dtype, copy=False)
+
         self._audio_data = value
 
         self.set_active_region_to_default()
@@ -454,9 +463,42 @@ class AudioSignal(object):
         if not np.iscomplexobj(value):
             warnings.warn('Initializing STFT with data that is non-complex. '
                           'This might lead to weird results!')
+        elif self.dtype is not None:
+            value = value.astype(utils._complex_dtype(self.dtype), copy=False)
 
         self._stft_data = value
 
+    @property
+    def dtype(self):
+        """
+        ``np.dtype``
+            The floating point precision policy for this :class:`AudioSignal`. If set, 
+            :attr:`audio_data` is kept in this dtype and :attr:`stft_data` in the matching 
+            complex dtype (e.g. ``float32`` and ``complex64``). If not set on this object,
+            :attr:`constants.DEFAULT_DTYPE` is used. ``None`` means that no policy is
+            applied and the dtype of the data is kept as is.
+
+            Setting this casts any existing :attr:`audio_data` and :attr:`stft_data`.
+
+        Raises:
+            ``ValueError``: If set to something not in :attr:`constants.ALL_DTYPES`.
+        """
+        return utils._resolve_dtype(self._dtype)
+
+    @dtype.setter
+    def dtype(self, value):
+        # validate before storing
+        utils._resolve_dtype(value)
+        self._dtype = value
+
+        if self.dtype is None:
+            return
+        if getattr(self, '_audio_data', None) is not None:
+            self._audio_data = self._audio_data.astype(self.dtype, copy=False)
+        if getattr(self, '_stft_data', None) is not None and np.iscomplexobj(self._stft_data):
+            self._stft_data = self._stft_data.astype(
+                utils._complex_dtype(self.dtype), copy=False)
+
     @property
     def stft_params(self):
         """
@@ -783,14 +825,7 @@ class AudioSignal(object):
         if duration is not None:
             assert duration >= 0, 'Parameter `duration` must be >= 0!'
 
-        try:
-            # try reading headers with soundfile for speed
-            audio_info = sf.info(input_file_path)
-            file_length = audio_info.duration
-        except:
-            # if that doesn't work try audioread
-            with audioread.audio_open(os.path.realpath(input_file_path)) as input_file:
-                file_length = input_file.duration
+        file_length = utils.get_audio_file_duration(input_file_path)
 
         if offset > file_length:
             raise AudioSignalException('offset is longer than signal!')
@@ -800,6 +835,7 @@ class AudioSignal(object):
                           ' Reading until end of signal...',
                           UserWarning)
 
+        import librosa  # lazy load to keep `import nussl` fast
         audio_input, self._sample_rate = librosa.load(input_file_path,
                                                       sr=None,
                                                       offset=offset,
@@ -827,7 +863,8 @@ class AudioSignal(object):
             * :func:`load_audio_from_file` to read in an audio file from disc.
 
         Notes:
-            Only accepts float arrays and int arrays of depth 16-bits.
+            Only accepts float arrays and int arrays of depth 16-bits. Int arrays are
+            converted to :attr:`dtype` if set, float64 otherwise.
 
         Parameters:
             signal (:obj:`np.ndarray`): Array containing the audio signal sampled at
@@ -842,7 +879,8 @@ class AudioSignal(object):
 
         # Change from fixed point to floating point
         if not np.issubdtype(signal.dtype, np.floating):
-            signal = signal.astype('float') / (np.iinfo(np.dtype('int16')).max + 1.0)
+            float_dtype = self.dtype if self.dtype is not None else 'float'
+            signal = signal.astype(float_dtype) / (np.iinfo(np.dtype('int16')).max + 1.0)
 
         self.audio_data = signal
         self.original_signal_length = self.signal_length
@@ -889,7 +927,8 @@ class AudioSignal(object):
         length of the signal).
 
         This is useful for reusing a single :class:`AudioSignal` object to do multiple operations on
-        only select parts of the audio data.
+        only select parts of the audio data. To work on several regions of the same audio at once,
+        see :func:`make_region_view`.
 
         Warnings:
             Many functions will raise exceptions while the active region is not default. Be aware
@@ -918,10 +957,95 @@ class AudioSignal(object):
                 :attr:`signal_length`.
 
         """
+        # a view's region is its window onto the shared buffer, so it is detached first
+        self._materialize_view()
+        self._set_region(start, end)
+
+    def _set_region(self, start, end):
         start, end = int(start), int(end)
         self._active_start = start if start >= 0 else 0
         self._active_end = end if end < self._signal_length else self._signal_length
 
+    def make_region_view(self, start, end):
+        """
+        Makes a lightweight :class:`AudioSignal` object that is a view onto the samples between
+        ``start`` and ``end`` of this object. The view shares the audio buffer of this object
+        instead of copying it, so many (possibly overlapping) views of a long recording can
+        be made cheaply. Everything that reads audio (e.g. :func:`stft`, :func:`rms`,
+        :func:`get_channel`, arithmetic) works on the view as it would on a copy of the
+        region.
+
+        The view gets its own copy of the buffer the first time it is mutated (e.g. by setting
+        :attr:`audio_data`, :func:`apply_gain`, :func:`zero_pad` or :func:`truncate_samples`),
+        after which it no longer refers to this object. Setting the active region of the view
+        (with :func:`set_active_region` or :func:`set_active_region_to_default`) also gives it
+        its own copy first, so the rest of the shared buffer is never exposed through the view.
+        Writing into the array returned by
+        :attr:`audio_data` in place writes through to the shared buffer, as with any numpy
+        view.
+
+        Examples:
+            >>> import nussl
+            >>> import numpy as np
+            >>> sig = nussl.AudioSignal(audio_data_array=np.random.randn(2, 44100))
+            >>> windows = [sig.make_region_view(i, i + 4096) for i in range(0, 40000, 1024)]
+            >>> windows[0].signal_length
+            4096
+
+        See Also:
+            * :func:`set_active_region`
+            * :func:`materialize`
+
+        Args:
+            start (int): Beginning of the view (in samples). Cannot be less than 0.
+            end (int): End of the view (in samples). Cannot be larger than
+                :attr:`signal_length`.
+
+        Returns:
+            (:class:`AudioSignal`): New :class:`AudioSignal` object sharing this object's
+            audio buffer.
+        """
+        if self._audio_data is None:
+            raise AudioSignalException('Cannot make a region view without audio data!')
+
+        start = int(start) + (self._active_start or 0)
+        end = int(end) + (self._active_start or 0)
+        end = min(end, self._active_end)
+
+        view = self._copy_without_data()
+        view._audio_data = self._audio_data
+        view._is_view = True
+        view._set_region(start, end)
+        view.original_signal_length = view.signal_length
+        return view
+
+    @property
+    def is_view(self):
+        """
+        ``bool``
+            ``True`` if this object was made by :func:`make_region_view` and still shares its
+            audio buffer with the object it was made from.
+        """
+        return self._is_view
+
+    def materialize(self):
+        """
+        Copies the active region of :attr:`audio_data` into a buffer owned by this object and
+        resets the active region to default. For an object made by :func:`make_region_view`,
+        this detaches it from the shared buffer. Called automatically before operations that
+        change the length of the audio.
+
+        Returns:
+            (:class:`AudioSignal`): This :class:`AudioSignal` object.
+        """
+        if self._audio_data is not None:
+            self.audio_data = np.array(self.audio_data)
+        return self
+
+    def _materialize_view(self):
+        if self.is_view:
+            self.materialize()
+
     def set_active_region_to_default(self):
         """
         Resets the active region of this :class:`AudioSignal` object to its default value of the
@@ -932,6 +1056,7 @@ class AudioSignal(object):
             :class:`AudioSignal`.
 
         """
+        self._materialize_view()
         self._active_start = 0
         self._active_end = self._signal_length
 
@@ -1002,17 +1127,16 @@ class AudioSignal(object):
             else window_type
         )
 
-        stft_data = []
-
         window = self.get_window(window_type, window_length)
 
-        for chan in self.get_channels():
-            _, _, _stft = scipy.signal.stft(
-                chan, fs=self.sample_rate, window=window,
-                nperseg=window_length, noverlap=window_length - hop_length)
-            stft_data.append(_stft)
+        # all channels at once, straight from the (possibly shared) audio buffer
+        _, _, stft_data = scipy.signal.stft(
+            self.audio_data, fs=self.sample_rate, window=window,
+            nperseg=window_length, noverlap=window_length - hop_length)
 
-        stft_data = np.array(stft_data).transpose((1, 2, 0))
+        stft_data = stft_data.transpose((1, 2, 0))
+        if self.dtype is not None:
+            stft_data = stft_data.astype(utils._complex_dtype(self.dtype), copy=False)
 
         if overwrite:
             self.stft_data = stft_data
@@ -1060,18 +1184,13 @@ class AudioSignal(object):
             else window_type
         )
 
-        signals = []
-
         window = self.get_window(window_type, window_length)
 
-        for stft in self.get_stft_channels():
-            _, _signal = scipy.signal.istft(
-                stft, fs=self.sample_rate, window=window,
-                nperseg=window_length, noverlap=window_length - hop_length)
-
-            signals.append(_signal)
-
-        calculated_signal = np.array(signals)
+        _, calculated_signal = scipy.signal.istft(
+            self.stft_data.transpose((2, 0, 1)), fs=self.sample_rate, window=window,
+            nperseg=window_length, noverlap=window_length - hop_length)
+        if self.dtype is not None:
+            calculated_signal = calculated_signal.astype(self.dtype, copy=False)
 
         # Make sure it's shaped correctly
         calculated_signal = np.expand_dims(calculated_signal, -1) \
@@ -1123,9 +1242,12 @@ class AudioSignal(object):
                     f' {mask.shape}, self.stft_data: {self.stft_data.shape}'
                 )
 
-        magnitude, phase = np.abs(self.stft_data), np.angle(self.stft_data)
-        masked_abs = magnitude * mask.mask
-        masked_stft = masked_abs * np.exp(1j * phase)
+        # Scaling the magnitude and keeping the phase is the same as scaling the
+        # complex STFT directly, which also keeps the precision of stft_data.
+        mask_data = mask.mask
+        if mask_data.dtype.kind == 'f':
+            mask_data = mask_data.astype(self.stft_data.real.dtype, copy=False)
+        masked_stft = self.stft_data * mask_data
 
         if overwrite:
             self.stft_data = masked_stft
@@ -1203,6 +1325,7 @@ class AudioSignal(object):
             n_samples: (int) number of samples that will be left.
 
         """
+        self._materialize_view()
         if not self.active_region_is_default:
             raise AudioSignalException('Cannot truncate while active region is not set as default!')
 
@@ -1233,6 +1356,7 @@ class AudioSignal(object):
             after: (int) number of samples to remove at end of self.audio_data
 
         """
+        self._materialize_view()
         if not self.active_region_is_default:
             raise AudioSignalException('Cannot crop signal while active region '
                                        'is not set as default!')
@@ -1252,6 +1376,7 @@ class AudioSignal(object):
             after: (int) number of zeros to be put after the current contents fo self.audio_data
 
         """
+        self._materialize_view()
         if not self.active_region_is_default:
             raise AudioSignalException('Cannot zero-pad while active region is not set as default!')
 
@@ -1282,7 +1407,7 @@ class AudioSignal(object):
 
         self._verify_audio_arithmetic(other)
 
-        new_signal = copy.deepcopy(self)
+        new_signal = self._copy_without_data()
         new_signal.audio_data = self.audio_data + other.audio_data
 
         return new_signal
@@ -1306,9 +1431,21 @@ class AudioSignal(object):
         """
         self._verify_audio_arithmetic(other)
 
-        other_copy = copy.deepcopy(other)
-        other_copy *= -1
-        return self.add(other_copy)
+        new_signal = self._copy_without_data()
+        new_signal.audio_data = self.audio_data - other.audio_data
+
+        return new_signal
+
+    def _copy_without_data(self):
+        """
+        Deep copies this object except for :attr:`audio_data` and :attr:`stft_data`, which 
+        are ``None`` in the copy. Avoids copying buffers that are about to be replaced 
+        (or that are shared by a region view).
+        """
+        memo = {id(self._audio_data): None, id(self._stft_data): None}
+        new_signal = copy.deepcopy(self, memo)
+        new_signal._is_view = False
+        return new_signal
 
     def make_copy_with_audio_data(self, audio_data, verbose=True):
         """ Makes a copy of this :class:`AudioSignal` object with :attr:`audio_data` initialized to
@@ -1326,15 +1463,14 @@ class AudioSignal(object):
 
         """
         if verbose:
-            if not self.active_region_is_default:
+            if not self.active_region_is_default and not self.is_view:
                 warnings.warn('Making a copy when active region is not default.')
 
             if audio_data.shape != self.audio_data.shape:
                 warnings.warn('Shape of new audio_data does not match current audio_data.')
 
-        new_signal = copy.deepcopy(self)
+        new_signal = self._copy_without_data()
         new_signal.audio_data = audio_data
-        new_signal.stft_data = None
         return new_signal
 
     def make_copy_with_stft_data(self, stft_data, verbose=True):
@@ -1352,13 +1488,13 @@ class AudioSignal(object):
 
         """
         if verbose:
-            if not self.active_region_is_default:
+            if not self.active_region_is_default and not self.is_view:
                 warnings.warn('Making a copy when active region is not default.')
 
             if stft_data.shape != self.stft_data.shape:
                 warnings.warn('Shape of new stft_data does not match current stft_data.')
 
-        new_signal = copy.deepcopy(self)
+        new_signal = self._copy_without_data()
         new_signal.stft_data = stft_data
         new_signal.original_signal_length = self.original_signal_length
         new_signal.audio_data = None
@@ -1409,12 +1545,13 @@ class AudioSignal(object):
             (float): Root-mean-square of :attr:`audio_data`.
 
         """
-        if win_len is not None:
-            hop_len = win_len // 2 if hop_len is None else hop_len
-            rms_func = lambda arr: librosa.feature.rms(arr, frame_length=win_len,
-                                                       hop_length=hop_len)[0, :]
-        else:
-            rms_func = lambda arr: np.sqrt(np.mean(np.square(arr)))
+        if win_len is None:
+            return np.squeeze(np.sqrt(np.mean(np.square(self.audio_data), axis=-1)))
+
+        import librosa  # lazy load to keep `import nussl` fast
+        hop_len = win_len // 2 if hop_len is None else hop_len
+        rms_func = lambda arr: librosa.feature.rms(arr, frame_length=win_len,
+                                                   hop_length=hop_len)[0, :]
 
         result = []
         for ch in self.get_channels():
@@ -1461,6 +1598,7 @@ class AudioSignal(object):
             warnings.warn('Cannot resample to the same sample rate.')
             return
 
+        import librosa  # lazy load to keep `import nussl` fast
         resampled_signal = []
 
         for channel in self.get_channels():
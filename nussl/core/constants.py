@@ -14,7 +14,7 @@ __all__ = ['DEFAULT_SAMPLE_RATE', 'DEFAULT_WIN_LEN_PARAM', 'DEFAULT_BIT_DEPTH',
            'WINDOW_BLACKMAN', 'WINDOW_TRIANGULAR', 'WINDOW_DEFAULT',
            'ALL_WINDOWS', 'NUMPY_JSON_KEY', 'LEN_INDEX', 'CHAN_INDEX',
            'STFT_VERT_INDEX', 'STFT_LEN_INDEX', 'STFT_CHAN_INDEX',
-           'LEVEL_MAX', 'LEVEL_MIN']
+           'LEVEL_MAX', 'LEVEL_MIN', 'ALL_DTYPES', 'DEFAULT_DTYPE']
 
 DEFAULT_SAMPLE_RATE = 44100  #: (int): Default sample rate. 44.1 kHz, CD-quality
 DEFAULT_WIN_LEN_PARAM = 0.032  #: (float): Default window length. 32ms
@@ -86,6 +86,22 @@ DEFAULT_DOWNLOAD_DIRECTORY = os.path.expanduser('~/.nussl/')
 
 USE_LIBROSA_STFT = False  #: (bool): Whether *nussl* will use librosa's stft function by default
 
+# ############# Precision policy ############# #
+
+ALL_DTYPES = ['float32', 'float64']
+"""list(str): list of floating point precisions that audio and masks can be kept in. The
+corresponding STFT precisions are complex64 and complex128, respectively.
+"""
+
+DEFAULT_DTYPE = None
+"""
+(str) Global precision policy for :class:`AudioSignal` and mask data. One of 
+:attr:`ALL_DTYPES`, or ``None`` to keep the dtype of whatever data is loaded (integer 
+data is converted to float64). Setting this to ``'float32'`` keeps audio in float32 and 
+STFT data in complex64 throughout. Can be overridden per object via the ``dtype`` 
+argument of :class:`AudioSignal`.
+"""
+
 
 # ############# MUSDB interface ############### #
 STEM_TARGET_DICT = OrderedDict([
@@ -64,8 +64,20 @@ Examples:
     assert isinstance(foreground_mask, nussl.BinaryMask)  # this is True
     assert isinstance(background_mask, nussl.BinaryMask)  # this is True
 
+For long multichannel signals, binary masks can be bit-packed in memory (8 time-frequency bins per 
+byte) by passing ``storage='packed'``. The mask is unpacked only when :attr:`mask` is accessed 
+(e.g. when it is applied to a signal), and inversion and addition work directly on the packed bits.
+
+.. code-block:: python
+    :linenos:
+
+    packed_mask = nussl.BinaryMask(rand_bool_mask, storage='packed')
+    packed_mask.nbytes  # rand_bool_mask.nbytes / 8
+
 """
 
+import copy
+
 import numpy as np
 
 from . import MaskBase
@@ -78,16 +90,18 @@ class BinaryMask(MaskBase):
     
     Args:
         input_mask (:obj:`np.ndarray`): 2- or 3-D :obj:`np.array` that represents the mask.
+        storage (str): ``'packed'`` to keep the mask bit-packed in memory, or ``None``.
     """
+    STORAGE_TYPES = [None, 'packed']
 
-    def __init__(self, input_mask=None, mask_shape=None):
-        super(BinaryMask, self).__init__(input_mask, mask_shape)
+    def __init__(self, input_mask=None, mask_shape=None, dtype=None, storage=None):
+        super(BinaryMask, self).__init__(input_mask, mask_shape, dtype, storage)
 
     @staticmethod
     def _validate_mask(mask_):
         assert isinstance(mask_, np.ndarray), 'Mask must be a numpy array!'
 
-        if mask_.dtype == np.bool:
+        if mask_.dtype == bool:
             # This is perfect, do nothing here
             return mask_
         elif mask_.dtype.kind in np.typecodes['AllInteger']:
@@ -101,6 +115,35 @@ class BinaryMask(MaskBase):
 
         return mask_.astype('bool')
 
+    def _compress(self, mask_):
+        # one row of packed bits per channel, so channels can be unpacked on their own
+        n_channels = mask_.shape[-1]
+        rows = np.moveaxis(mask_, -1, 0).reshape(n_channels, -1)
+        return np.packbits(rows, axis=-1)
+
+    def _decompressed_dtype(self):
+        return np.dtype(bool)
+
+    def _decompress(self, ch=None):
+        n_freq, n_time, n_channels = self.shape
+        if ch is not None:
+            bits = np.unpackbits(self._mask[ch], count=n_freq * n_time)
+            return bits.view(bool).reshape(n_freq, n_time)
+        bits = np.unpackbits(self._mask, axis=-1, count=n_freq * n_time)
+        return np.moveaxis(bits.view(bool).reshape(n_channels, n_freq, n_time), 0, -1)
+
+    def _add(self, other):
+        packed = self._storage == 'packed'
+        if packed and isinstance(other, BinaryMask) and other.storage == 'packed':
+            if other.shape != self.shape:
+                raise ValueError(
+                    f'Cannot add masks with shapes {self.shape} and {other.shape}!')
+            # addition of boolean arrays is a logical or
+            new_mask = copy.copy(self)
+            new_mask._mask = np.bitwise_or(self._mask, other._mask)
+            return new_mask
+        return super()._add(other)
+
     def mask_as_ints(self, channel=None):
         """
         Returns this :class:`BinaryMask` as a numpy array of ints of 0's and 1's.
@@ -123,4 +166,9 @@ class BinaryMask(MaskBase):
             A new :class:`BinaryMask` object that has all of the boolean values flipped.
 
         """
+        if self._storage == 'packed':
+            # the padding bits at the end of each row are flipped too, but never unpacked
+            new_mask = copy.copy(self)
+            new_mask._mask = np.invert(self._mask)
+            return new_mask
         return BinaryMask(np.logical_not(self.mask))
@@ -6,6 +6,10 @@ below.
 
 Right now only spectrogram-like masks are supported (note the shape of the :ref:`mask` property), but in future
 releases nussl will support masks for representations with different dimensionality requirements.
+
+Masks can optionally be kept in a compact form in memory (see the ``storage`` argument). In that case
+:attr:`mask` is decompressed on access into a read-only array, so write the whole mask back via 
+``mask_obj.mask = ...`` instead of modifying the array returned by :attr:`mask` in place.
 """
 
 import numbers
@@ -20,10 +24,27 @@ class MaskBase(object):
     """
     Args:
         input_mask (:obj:`np.ndarray`): A 2- or 3-dimensional numpy ``ndarray`` representing a mask.
+        mask_shape (tuple): Shape of an all-zeros mask to initialize, if ``input_mask`` is 
+            not given.
+        dtype (str): Floating point precision to keep float-valued masks in. Defaults to
+            ``None``, which uses :attr:`constants.DEFAULT_DTYPE`.
+        storage (str): Compact in-memory representation for the mask. Must be one of
+            :attr:`STORAGE_TYPES` of the mask class. Defaults to ``None`` (a plain array).
         
     """
-    def __init__(self, input_mask=None, mask_shape=None):
+    STORAGE_TYPES = [None]
+
+    def __init__(self, input_mask=None, mask_shape=None, dtype=None, storage=None):
         self._mask = None
+        self._shape = None
+        utils._resolve_dtype(dtype)
+        self._dtype = dtype
+
+        if storage not in self.STORAGE_TYPES:
+            raise ValueError(
+                f'storage must be one of {self.STORAGE_TYPES} for {type(self).__name__}, '
+                f'got {storage}!')
+        self._storage = storage
 
         if mask_shape is None and input_mask is None:
             raise ValueError('Cannot initialize mask without mask_shape or input_mask!')
@@ -32,7 +53,8 @@ class MaskBase(object):
         if isinstance(input_mask, np.ndarray):
             self.mask = input_mask
         elif isinstance(mask_shape, tuple):
-            self.mask = np.zeros(mask_shape)
+            float_dtype = utils._resolve_dtype(self._dtype)
+            self.mask = np.zeros(mask_shape, dtype=float_dtype or float)
         else:
             raise ValueError('input_mask must be a np.ndarray, or mask_shape must be a tuple!')
 
@@ -47,12 +69,17 @@ class MaskBase(object):
         
         This base class will throw a ``NotImplementedError`` if instantiated directly.
         
+        If the mask is kept in a compact :attr:`storage`, this decompresses it into a new,
+        read-only array on every access.
+
         Raises:
             :obj:`ValueError` if :attr:`mask.ndim` is less than 2 or greater than 3, or if values fail validation.
             :obj:`NotImplementedError` if instantiated directly.
 
         """
-        return self._mask
+        if self._storage is None:
+            return self._mask
+        return self._read_only(self._decompress())
 
     @mask.setter
     def mask(self, value):
@@ -67,7 +94,61 @@ class MaskBase(object):
         if value.ndim > 3:
             raise ValueError('Cannot support arrays with more than 3 dimensions!')
 
-        self._mask = self._validate_mask(value)
+        self._shape = value.shape
+        value = self._validate_mask(value)
+
+        if self._storage is not None:
+            self._mask = self._compress(value)
+            return
+
+        float_dtype = utils._resolve_dtype(self._dtype)
+        if float_dtype is not None and value.dtype.kind == 'f':
+            value = value.astype(float_dtype, copy=False)
+
+        self._mask = value
+
+    @property
+    def storage(self):
+        """
+        (str) The compact in-memory representation of this mask, or ``None`` if the mask is 
+        kept as a plain :obj:`np.ndarray`.
+
+        """
+        return self._storage
+
+    @property
+    def nbytes(self):
+        """
+        (int) Number of bytes used to hold the mask data in memory.
+
+        """
+        return self._mask.nbytes
+
+    def _compress(self, mask_):
+        """
+        Converts a validated mask into the compact representation given by :attr:`storage`.
+        Implemented by subclasses that support compact storage.
+        """
+        raise NotImplementedError(f'{type(self).__name__} has no compact storage!')
+
+    def _decompress(self, ch=None):
+        """
+        Inverse of :func:`_compress`. Returns the whole mask, or only channel ``ch`` as a 2D
+        array if it is given.
+        """
+        raise NotImplementedError(f'{type(self).__name__} has no compact storage!')
+
+    def _decompressed_dtype(self):
+        """
+        Data type of the arrays returned by :func:`_decompress`, without decompressing.
+        """
+        raise NotImplementedError(f'{type(self).__name__} has no compact storage!')
+
+    @staticmethod
+    def _read_only(array):
+        # writes to a decompressed copy would be lost, so they fail instead
+        array.flags.writeable = False
+        return array
 
     def get_channel(self, ch):
         """
@@ -92,6 +173,8 @@ class MaskBase(object):
         if ch < 0:
             raise ValueError(f'Cannot get channel {ch}. This will cause unexpected results!')
 
+        if self._storage is not None:
+            return self._read_only(self._decompress(ch))
         return utils._get_axis(self.mask, constants.STFT_CHAN_INDEX, ch)
 
     @property
@@ -100,7 +183,7 @@ class MaskBase(object):
         (int) Number of channels this mask has.
 
         """
-        return self.mask.shape[constants.STFT_CHAN_INDEX]
+        return self.shape[constants.STFT_CHAN_INDEX]
 
     @property
     def shape(self):
@@ -108,7 +191,7 @@ class MaskBase(object):
         (tuple) Returns the shape of the whole mask. Identical to ``np.ndarray.shape()``.
 
         """
-        return self.mask.shape
+        return self._shape
 
     @property
     def dtype(self):
@@ -116,6 +199,8 @@ class MaskBase(object):
         (str) Returns the data type of the values of the mask. 
 
         """
+        if self._storage is not None:
+            return self._decompressed_dtype()
         return self.mask.dtype
 
     @staticmethod
@@ -130,28 +215,34 @@ class MaskBase(object):
         raise NotImplementedError('Cannot call base class! Use BinaryMask or SoftMask!')
 
     @classmethod
-    def ones(cls, shape):
+    def ones(cls, shape, dtype=None, storage=None):
         """
         Makes a mask with all ones with the specified shape. Exactly the same as ``np.ones()``.
         Args:
             shape (tuple): Shape of the resultant mask.
+            dtype (str): Floating point precision of the mask. See :class:`MaskBase`.
+            storage (str): Compact in-memory representation. See :class:`MaskBase`.
 
         Returns:
 
         """
-        return cls(np.ones(shape))
+        return cls(np.ones(shape, dtype=utils._resolve_dtype(dtype) or float), dtype=dtype,
+                   storage=storage)
 
     @classmethod
-    def zeros(cls, shape):
+    def zeros(cls, shape, dtype=None, storage=None):
         """
         Makes a mask with all zeros with the specified shape. Exactly the same as ``np.zeros()``.
         Args:
             shape (tuple): Shape of the resultant mask.
+            dtype (str): Floating point precision of the mask. See :class:`MaskBase`.
+            storage (str): Compact in-memory representation. See :class:`MaskBase`.
 
         Returns:
 
         """
-        return cls(np.zeros(shape))
+        return cls(np.zeros(shape, dtype=utils._resolve_dtype(dtype) or float), dtype=dtype,
+                   storage=storage)
 
     def invert_mask(self):
         """
@@ -175,7 +266,7 @@ class MaskBase(object):
 
     def _add(self, other):
         class_method = type(self)
-        new_mask = class_method(self.mask)
+        new_mask = class_method(self.mask, dtype=self._dtype, storage=self._storage)
         if isinstance(other, MaskBase):
             new_mask.mask = new_mask.mask + other.mask
             return new_mask
@@ -189,7 +280,7 @@ class MaskBase(object):
         if not isinstance(value, numbers.Real):
             raise ValueError(f'Cannot do operation with MaskBase and {type(value)}')
         class_method = type(self)
-        new_mask = class_method(self.mask)
+        new_mask = class_method(self.mask, dtype=self._dtype, storage=self._storage)
         new_mask.mask = new_mask.mask * value
         return new_mask
 
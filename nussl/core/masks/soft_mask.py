@@ -50,12 +50,29 @@ Examples:
     [background_mask, foreground_mask] = repet.run()  # MaskSeparationBase-derived classes return MaskBase objects
     assert isinstance(foreground_mask, nussl.SoftMask)  # this is True
     assert isinstance(background_mask, nussl.SoftMask)  # this is True
+
+For long multichannel signals, soft masks can be kept in a compact form in memory by passing
+``storage='float16'`` (half precision) or ``storage='uint8'`` (8-bit linear quantization between
+the minimum and maximum value of the mask). The mask is decompressed only when :attr:`mask` is
+accessed (e.g. when it is applied to a signal), in the precision given by ``dtype``. Multiplying
+or dividing a ``uint8`` mask by a non-negative scalar only changes its quantization range and
+does not touch the quantized data.
+
+.. code-block:: python
+    :linenos:
+
+    compact_mask = nussl.SoftMask(rand_mask, storage='uint8')
+    compact_mask.nbytes  # rand_mask.nbytes / 8 for a float64 mask
 """
 
+import copy
+import numbers
+
 import numpy as np
 
 from . import MaskBase
 from . import BinaryMask
+from .. import utils
 
 
 class SoftMask(MaskBase):
@@ -65,10 +82,15 @@ class SoftMask(MaskBase):
     
     Args:
         input_mask (:obj:`np.ndarray`): 2- or 3-D :obj:`np.array` that represents the mask.
+        dtype (str): Floating point precision to keep the mask in. See :class:`MaskBase`.
+        storage (str): ``'float16'`` or ``'uint8'`` to keep the mask in a compact form
+            in memory, or ``None``.
     """
+    STORAGE_TYPES = [None, 'float16', 'uint8']
 
-    def __init__(self, input_mask=None, mask_shape=None):
-        super(SoftMask, self).__init__(input_mask, mask_shape)
+    def __init__(self, input_mask=None, mask_shape=None, dtype=None, storage=None):
+        self._quantization = None
+        super(SoftMask, self).__init__(input_mask, mask_shape, dtype, storage)
 
     @staticmethod
     def _validate_mask(mask_):
@@ -79,6 +101,38 @@ class SoftMask(MaskBase):
 
         return mask_
 
+    def _compress(self, mask_):
+        if self._storage == 'float16':
+            return mask_.astype(np.float16, copy=False)
+
+        low, high = float(np.min(mask_)), float(np.max(mask_))
+        step = (high - low) / 255 if high > low else 1.0
+        # stored as (offset, step): mask ~= offset + step * quantized
+        self._quantization = (low, step)
+        return np.round((mask_ - low) / step).astype(np.uint8)
+
+    def _decompressed_dtype(self):
+        return utils._resolve_dtype(self._dtype) or np.dtype(np.float64)
+
+    def _decompress(self, ch=None):
+        data = self._mask if ch is None else self._mask[..., ch]
+        float_dtype = self._decompressed_dtype()
+        if self._storage == 'float16':
+            return data.astype(float_dtype)
+
+        low, step = self._quantization
+        return data.astype(float_dtype) * float_dtype.type(step) + float_dtype.type(low)
+
+    def _mult(self, value):
+        if self._storage == 'uint8' and isinstance(value, numbers.Real) and value >= 0:
+            # scaling by a non-negative factor only changes the quantization range,
+            # anything else is validated and quantized again like any other mask
+            low, step = self._quantization
+            new_mask = copy.copy(self)
+            new_mask._quantization = (low * value, step * value)
+            return new_mask
+        return super()._mult(value)
+
     def mask_to_binary(self, threshold=0.5):
         """
         Create a new :class:`separation.masks.soft_mask.BinaryMask` object from this object's data.
@@ -101,4 +155,4 @@ class SoftMask(MaskBase):
             A new :class:`SoftMask` object with values set at ``1 - mask``.
 
         """
-        return SoftMask(np.abs(1 - self.mask))
+        return SoftMask(np.abs(1 - self.mask), dtype=self._dtype, storage=self._storage)
@@ -27,28 +27,46 @@ def pan_audio_signal(audio_signal, angle_in_degrees):
     Returns:
         AudioSignal: Audio signal panned by `angle_in_degrees`.
     """
-    if angle_in_degrees < -45 or angle_in_degrees > 45:
+    panned_signal = copy.deepcopy(audio_signal)
+    panned_signal.audio_data = pan_audio(audio_signal.audio_data, angle_in_degrees)
+    return panned_signal
+
+
+def pan_audio(audio_data, angle_in_degrees):
+    """
+    Array version of :func:`pan_audio_signal` that pans a whole batch of audio at 
+    once. Each item is first mixed down to mono and then panned to two channels by
+    its own angle.
+
+    Use negative numbers to pan left, positive to pan right. Angles outside of the
+    range [-45, 45] raise an error.
+
+    Args:
+        audio_data (np.ndarray): Audio of shape ``(..., n_channels, n_samples)``.
+        angle_in_degrees (float or np.ndarray): Angle(s) in degrees to pan by, between
+          -45 and 45. Must broadcast against ``audio_data.shape[:-2]``.
+
+    Raises:
+        ValueError: Angles outside of the range [-45, 45] raise an error.
+
+    Returns:
+        np.ndarray: Panned audio of shape ``(..., 2, n_samples)``.
+    """
+    angle_in_degrees = np.asarray(angle_in_degrees)
+    if np.any(angle_in_degrees < -45) or np.any(angle_in_degrees > 45):
         raise ValueError(
             "Angle must be between -45 and 45! -45 means "
             "all the way to the left, 45 means all the way "
             "to the right, and 0 is center.")
-    panned_signal = copy.deepcopy(audio_signal)
-    panned_signal.to_mono()
+    mono = np.mean(audio_data, axis=-2)
 
-    panned_signal.audio_data = np.concatenate([
-        panned_signal.audio_data, panned_signal.audio_data
-    ], axis=0)
-
-    angle = np.deg2rad(angle_in_degrees)
+    angle = np.deg2rad(angle_in_degrees)[..., None]
     left_scale = (
         np.sqrt(2)/2 * (np.cos(angle) - np.sin(angle)))
     right_scale = (
         np.sqrt(2)/2 * (np.cos(angle) + np.sin(angle)))
-    
-    panned_signal.audio_data[0] *= left_scale
-    panned_signal.audio_data[1] *= right_scale
 
-    return panned_signal
+    return np.stack([mono * left_scale, mono * right_scale], axis=-2)
 
 
 def delay_audio_signal(audio_signal, delays_in_samples):
@@ -83,15 +101,35 @@ def delay_audio_signal(audio_signal, delays_in_samples):
             "channels in audio_signal.")
             
     delayed_signal = copy.deepcopy(audio_signal)
+    delayed_signal.audio_data = delay_audio(audio_signal.audio_data, delays_in_samples)
+    return delayed_signal
 
-    for i, delay in enumerate(delays_in_samples):
-        if delay > 0:
-            _audio_data = delayed_signal.audio_data[i]
-            original_length = _audio_data.shape[-1]
 
-            _audio_data = np.pad(_audio_data, (delay, 0))
-            _audio_data = _audio_data[:original_length]
+def delay_audio(audio_data, delays_in_samples):
+    """
+    Array version of :func:`delay_audio_signal` that delays a whole batch of audio at 
+    once, each channel of each item by its own number of samples. The end of each
+    channel is truncated so that the length remains the same.
 
-            delayed_signal.audio_data[i] = _audio_data
-    
-    return delayed_signal
+    Args:
+        audio_data (np.ndarray): Audio of shape ``(..., n_channels, n_samples)``.
+        delays_in_samples (np.ndarray): Integer, non-negative delays of shape
+          ``(..., n_channels)`` (or anything that broadcasts to it).
+
+    Raises:
+        ValueError: If any delays are not integers or are negative.
+
+    Returns:
+        np.ndarray: Delayed audio, same shape as ``audio_data``.
+    """
+    delays_in_samples = np.asarray(delays_in_samples)
+    if delays_in_samples.size and not np.issubdtype(delays_in_samples.dtype, np.integer):
+        raise ValueError("All items in delay_in_samples must be integers.")
+    if np.any(delays_in_samples < 0):
+        raise ValueError("All items in delay_in_samples must be non-negative.")
+
+    delays_in_samples = np.broadcast_to(delays_in_samples, audio_data.shape[:-1])
+    source_index = np.arange(audio_data.shape[-1]) - delays_in_samples[..., None]
+    delayed = np.take_along_axis(audio_data, np.maximum(source_index, 0), axis=-1)
+    delayed[source_index < 0] = 0
+    return delayed
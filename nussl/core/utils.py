@@ -6,15 +6,15 @@ any specific algorithm or that are shared between algorithms.
 import warnings
 
 import numpy as np
-import torch
 import random
-from .. import musdb
-import librosa
 from . import constants
 
 import os
 from contextlib import contextmanager
 
+import audioread
+import soundfile as sf
+
 def seed(random_seed, set_cudnn=False):
     """
     Seeds all random states in nussl with the same random seed
@@ -36,6 +36,8 @@ def seed(random_seed, set_cudnn=False):
         set_cudnn (bool): Whether or not to set cudnn into determinstic
         mode and off of benchmark mode. Defaults to False.
     """
+    # lazy load to keep `import nussl` fast
+    import torch
 
     torch.manual_seed(random_seed)
     np.random.seed(random_seed)
@@ -59,6 +61,9 @@ def find_peak_indices(input_array, n_peaks, min_dist=None, do_min=False, thresho
         * This function only returns the indices of peaks. If you want to find peak values,
         use :func:`find_peak_values`.
 
+        * To find the peaks of many 1-D arrays at once (e.g. every frame of a
+        spectrogram), use :func:`find_peak_indices_batch`.
+
         * min_dist can be an int or a tuple of length 2.
             If input_array is 1-D, min_dist must be an integer.
             If input_array is 2-D, min_dist can be an integer, in which case the minimum
@@ -83,23 +88,66 @@ def find_peak_indices(input_array, n_peaks, min_dist=None, do_min=False, thresho
     if input_array.ndim > 2:
         raise ValueError('Cannot find peak indices on data greater than 2 dimensions!')
 
-    is_1d = input_array.ndim == 1
-    zero_dist = zero_dist0 = zero_dist1 = None
     min_dist = len(input_array) // 4 if min_dist is None else min_dist
+    peak_indices = _find_peak_indices(
+        input_array[None], n_peaks, min_dist, do_min, threshold)[0]
+
+    if input_array.ndim == 1:
+        return [int(p[0]) for p in peak_indices]
+    return [list(p) for p in peak_indices]
+
+
+def find_peak_indices_batch(input_array, n_peaks, min_dist=None, do_min=False,
+                            threshold=0.5):
+    """
+    Batched version of :func:`find_peak_indices`. Finds the peaks of every row of a 2-D
+    numpy array (i.e. a batch of 1-D arrays) at once. Each row is scaled, thresholded and
+    searched exactly as :func:`find_peak_indices` would do it on its own, but the
+    search for the next peak (and the suppression of its neighborhood) happens for all
+    rows in a single vectorized step.
+
+    Args:
+        input_array: a 2-D numpy array of shape (batch, length). Peaks are found along
+          the last axis.
+        n_peaks: (int) maximum number of peaks to find per row
+        min_dist: (int) minimum distance between peaks. Default value: length / 4
+        do_min: (bool) if True, finds indices at minimum value instead of maximum
+        threshold: (float) the value (scaled between 0.0 and 1.0)
+
+    Returns:
+        peak_indices: (list) list containing, for each row, the list of the indices of
+          its peak values.
+
+    """
+    input_array = np.array(input_array, dtype=float)
 
-    if is_1d:
-        zero_dist = min_dist
+    if input_array.ndim != 2:
+        raise ValueError('input_array must be 2-dimensional: (batch, length)!')
+
+    min_dist = input_array.shape[-1] // 4 if min_dist is None else min_dist
+    peak_indices = _find_peak_indices(
+        input_array, n_peaks, min_dist, do_min, threshold)
+    return [[int(p[0]) for p in row] for row in peak_indices]
+
+
+def _find_peak_indices(input_array, n_peaks, min_dist, do_min, threshold):
+    """
+    Greedy peak picking with neighborhood suppression on a batch of 1-D or 2-D arrays
+    of shape (batch, ...). Returns a list with, for each item in the batch, the list of
+    peak index tuples.
+    """
+    batch_size, shape = input_array.shape[0], input_array.shape[1:]
+    if np.ndim(min_dist) == 0:
+        zero_dist = (min_dist,) * len(shape)
+    elif len(min_dist) == 1:
+        zero_dist = (min_dist[0],) * len(shape)
     else:
-        if type(min_dist) is int:
-            zero_dist0 = zero_dist1 = min_dist
-        elif len(min_dist) == 1:
-            zero_dist0 = zero_dist1 = min_dist[0]
-        else:
-            zero_dist0, zero_dist1 = min_dist
+        zero_dist = tuple(min_dist)
 
-    # scale input_array between [0.0, 1.0]
-    input_array -= np.min(input_array)
-    input_array /= np.max(input_array)
+    # scale each item between [0.0, 1.0]
+    axes = tuple(range(1, input_array.ndim))
+    input_array -= np.min(input_array, axis=axes, keepdims=True)
+    input_array /= np.max(input_array, axis=axes, keepdims=True)
 
     # flip sign if doing min
     input_array = -input_array if do_min else input_array
@@ -108,47 +156,42 @@ def find_peak_indices(input_array, n_peaks, min_dist=None, do_min=False, thresho
     input_array = np.multiply(input_array, (input_array >= threshold))
 
     # check to make sure we didn't throw everything out
-    if np.size(np.nonzero(input_array)) == 0:
+    num_nonzero = np.count_nonzero(input_array.reshape(batch_size, -1), axis=-1)
+    if np.any(num_nonzero == 0):
         raise ValueError('Threshold set incorrectly. No peaks above threshold.')
-    if np.size(np.nonzero(input_array)) < n_peaks:
+    if np.any(num_nonzero < n_peaks):
         warnings.warn('Threshold set such that there will be less peaks than n_peaks.')
 
-    peak_indices = []
+    flat_array = input_array.reshape(batch_size, -1)
+    rows = np.arange(batch_size)[:, None]
+    active = np.ones(batch_size, dtype=bool)
+    peak_indices = [[] for _ in range(batch_size)]
+
     for i in range(n_peaks):
         # np.unravel_index for 2D indices e.g., index 5 in a 3x3 array should be (1, 2)
-        # Also, wrap in list for duck typing
-        cur_peak_idx = list(np.unravel_index(
-            np.argmax(input_array.flatten()), input_array.shape
-        ))
-
-        # zero out peak and its surroundings
-        if is_1d:
-            cur_peak_idx = cur_peak_idx[0]
-            peak_indices.append(cur_peak_idx)
-            lower, upper = _set_array_zero_indices(cur_peak_idx, zero_dist, len(input_array))
-            input_array[lower:upper] = 0
-        else:
-            peak_indices.append(cur_peak_idx)
-            lower0, upper0 = _set_array_zero_indices(cur_peak_idx[0], zero_dist0,
-                                                     input_array.shape[0])
-            lower1, upper1 = _set_array_zero_indices(cur_peak_idx[1], zero_dist1,
-                                                     input_array.shape[1])
-            input_array[lower0:upper0, lower1:upper1] = 0
-
-        if np.sum(input_array) == 0.0:
+        cur_peak_idx = np.unravel_index(np.argmax(flat_array, axis=-1), shape)
+        for b, peak in zip(np.flatnonzero(active), 
+                           np.stack(cur_peak_idx, axis=-1)[active].tolist()):
+            peak_indices[b].append(peak)
+
+        # zero out peaks and their surroundings
+        # fractional distances round outward below the peak and inward above it
+        window = np.ix_(*[
+            np.arange(-int(np.ceil(dist)), int(dist) + 1) for dist in zero_dist])
+        window = [
+            np.clip(idx.reshape((-1,) + (1,) * len(shape)) + offset[None], 0, n - 1)
+            for idx, offset, n in zip(cur_peak_idx, window, shape)
+        ]
+        window = np.ravel_multi_index(window, shape).reshape(batch_size, -1)
+        flat_array[rows, window] = 0
+
+        active &= np.sum(flat_array, axis=-1) != 0.0
+        if not np.any(active):
             break
 
     return peak_indices
 
 
-def _set_array_zero_indices(index, zero_distance, max_len):
-    lower = index - zero_distance
-    upper = index + zero_distance + 1
-    lower = 0 if lower < 0 else lower
-    upper = max_len if upper >= max_len else upper
-    return int(lower), int(upper)
-
-
 def complex_randn(shape):
     """
     Returns a complex-valued numpy array of random values with shape :param:`shape`.
@@ -162,6 +205,39 @@ def complex_randn(shape):
     return np.random.randn(*shape) + 1j * np.random.randn(*shape)
 
 
+def _resolve_dtype(dtype=None):
+    """
+    Resolves the floating point precision to use given a per-object override and the
+    global policy in :attr:`constants.DEFAULT_DTYPE`.
+
+    Args:
+        dtype (str or np.dtype, optional): Per-object dtype. If ``None``, the global
+          policy is used.
+
+    Raises:
+        ValueError: if the resolved dtype is not one of :attr:`constants.ALL_DTYPES`.
+
+    Returns:
+        (:obj:`np.dtype`): The real-valued dtype to use, or ``None`` if no policy is set.
+    """
+    dtype = constants.DEFAULT_DTYPE if dtype is None else dtype
+    if dtype is None:
+        return None
+    dtype = np.dtype(dtype)
+    if dtype.name not in constants.ALL_DTYPES:
+        raise ValueError(
+            f"dtype must be one of {constants.ALL_DTYPES}, got {dtype.name}!")
+    return dtype
+
+
+def _complex_dtype(dtype):
+    """
+    Returns the complex dtype matching a real floating point dtype (e.g. float32 ->
+    complex64).
+    """
+    return np.result_type(dtype, np.complex64)
+
+
 def _get_axis(array, axis_num, i):
     """
     Will get index 'i' along axis 'axis_num' using np.take.
@@ -211,6 +287,50 @@ def _format(string):
     return ''.join(list(filter(str.isalnum, string))).lower()
 
 
+def get_audio_file_info(path_to_audio_file):
+    """
+    Reads the duration, number of channels and sample rate of an audio file from 
+    its header, without decoding the audio. Uses ``soundfile`` if it can read 
+    the file and ``audioread`` otherwise.
+
+    Args:
+        path_to_audio_file (str): Path to the audio file.
+
+    Returns:
+        dict: Dictionary with the ``duration`` (in seconds), ``num_channels`` and
+          ``sample_rate`` of the file.
+    """
+    try:
+        # try reading headers with soundfile for speed
+        info = sf.info(path_to_audio_file)
+        duration, num_channels, sample_rate = (
+            info.duration, info.channels, info.samplerate)
+    except:
+        # if that doesn't work try audioread
+        with audioread.audio_open(os.path.realpath(path_to_audio_file)) as input_file:
+            duration, num_channels, sample_rate = (
+                input_file.duration, input_file.channels, input_file.samplerate)
+    return {
+        'duration': float(duration),
+        'num_channels': int(num_channels),
+        'sample_rate': int(sample_rate),
+    }
+
+
+def get_audio_file_duration(path_to_audio_file):
+    """
+    Reads the duration of an audio file from its header, without decoding 
+    the audio (see :func:`get_audio_file_info`).
+
+    Args:
+        path_to_audio_file (str): Path to the audio file.
+
+    Returns:
+        float: Duration of the file in seconds.
+    """
+    return get_audio_file_info(path_to_audio_file)['duration']
+
+
 def musdb_track_to_audio_signals(track):
     """
     Converts a musdb track to a dictionary of AudioSignal objects.
@@ -280,6 +400,9 @@ def audio_signals_to_musdb_track(mixture, sources_dict, targets_dict):
     Returns:
         (:obj:`musdb.MultiTrack`) populated as specified by inputs.
     """
+    # lazy load to keep `import nussl` fast
+    from .. import musdb
+
     verify_audio_signal_list_strict(list(sources_dict.values()) + [mixture])
 
     path = mixture.path_to_input_file if mixture.path_to_input_file else "None"
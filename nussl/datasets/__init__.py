@@ -44,6 +44,38 @@ OnTheFly
     :members:
     :autosummary:
 
+.. autoclass:: nussl.datasets.SourcePool
+    :members:
+    :autosummary:
+
+Sharded archives
+----------------
+.. autoclass:: nussl.datasets.ShardedDataset
+    :members:
+    :autosummary:
+
+.. autofunction:: nussl.datasets.write_shards
+
+Batching
+--------
+.. autoclass:: nussl.datasets.BucketBatchSampler
+    :members:
+    :autosummary:
+
+.. autoclass:: nussl.datasets.GeneratedBatchSampler
+    :members:
+    :autosummary:
+
+.. autofunction:: nussl.datasets.pad_collate
+
+Statistics
+----------
+.. autofunction:: nussl.datasets.compute_statistics
+
+.. autoclass:: nussl.datasets.DatasetStatistics
+    :members:
+    :autosummary:
+
 Data transforms
 ---------------
 .. automodule:: nussl.datasets.transforms
@@ -60,6 +92,10 @@ from .hooks import (
     WHAM, 
     FUSS, 
     OnTheFly,
+    SourcePool,
     Slakh
 )
+from .batching import BucketBatchSampler, GeneratedBatchSampler, pad_collate
+from .shards import ShardedDataset, write_shards
+from .statistics import DatasetStatistics, compute_statistics
 from . import transforms
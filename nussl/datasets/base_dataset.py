@@ -1,8 +1,14 @@
+import os
 import warnings
 from typing import Iterable
 import copy
 
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, DataLoader
+import yaml
+try:
+    from yaml import CLoader as Loader, CDumper as Dumper
+except ImportError:
+    from yaml import Loader, Dumper
 
 from .. import AudioSignal
 from . import transforms as tfm
@@ -61,16 +67,29 @@ class BaseDataset(Dataset, Iterable):
           is undefined. Defaults to None.
 
         strict_sample_rate (bool, optional): Whether to raise an error if 
+
+        dtype (str, optional): Floating point precision to keep every AudioSignal 
+          object in (``'float32'`` or ``'float64'``). STFTs computed by the transforms
+          are then kept in the matching complex precision. Defaults to None, which
+          uses ``nussl.constants.DEFAULT_DTYPE``.
+
+        profiler (transforms.TransformProfiler, optional): If given, the time, memory
+          and output size of ``process_item`` and of each transform (including reading
+          from the cache) are recorded in it for every item. Defaults to None.
     
     Raises:
         DataSetException: Exceptions are raised if the output of the implemented
             functions by the subclass don't match the specification.
     """
     def __init__(self, folder, transform=None, sample_rate=None, stft_params=None,
-                 num_channels=None, strict_sample_rate=True, cache_populated=False):
+                 num_channels=None, strict_sample_rate=True, cache_populated=False,
+                 dtype=None, profiler=None):
         self.folder = folder
         self.items = self.get_items(self.folder)
+        self._item_info = {}
+        self._item_durations = {}
         self.transform = transform
+        self.profiler = profiler
 
         self.cache_populated = cache_populated
         
@@ -78,11 +97,13 @@ class BaseDataset(Dataset, Iterable):
         self.sample_rate = sample_rate
         self.num_channels = num_channels
         self.strict_sample_rate = strict_sample_rate
+        self.dtype = dtype
         self.metadata = {
             'name': self.__class__.__name__,
             'stft_params': stft_params,
             'sample_rate': sample_rate,
             'num_channels': num_channels,
+            'dtype': dtype,
             'folder': folder,
             'transforms': copy.deepcopy(transform)
         }
@@ -95,7 +116,7 @@ class BaseDataset(Dataset, Iterable):
         if self.items:
             self.process_item(self.items[0])
 
-    def filter_items_by_condition(self, func):
+    def filter_items_by_condition(self, func, num_workers=0, cache_path=None):
         """
         Filter the items in the list according to a function that takes 
         in both the dataset as well as the item currently be processed.
@@ -110,8 +131,7 @@ class BaseDataset(Dataset, Iterable):
 
             # self here refers to the dataset
             def remove_short_audio(self, item):
-                processed_item = self.process_item(item)
-                mix_length = processed_item['mix'].signal_duration
+                mix_length = self.item_info(item)['duration']
                 if mix_length < min_length:
                     return False
                 return True
@@ -119,27 +139,126 @@ class BaseDataset(Dataset, Iterable):
             dataset.items # contains all items
             dataset.filter_items_by_condition(remove_short_audio)
             dataset.items # contains only items longer than min length
+
+        Conditions on the duration, number of channels or sample rate should use 
+        ``self.item_info(item)``, which reads them from the file headers for most 
+        hooks, instead of ``self.process_item(item)``, which loads every file of 
+        the item. 
+
+        The function can be evaluated by ``num_workers`` worker processes. If 
+        ``cache_path`` is given, the result for each item is saved to that file and 
+        only items that aren't in it yet are evaluated the next time (so use a 
+        different file for each condition).
             
         Args:
             func (function): A function that takes in two arguments: the dataset and
               this dataset object (self). The function must return a bool.
+            num_workers (int, optional): Number of worker processes to evaluate
+              ``func`` with. Defaults to 0 (evaluated in this process).
+            cache_path (str, optional): Path to a YAML file to cache the results
+              in. Defaults to None.
         """
-        filtered_items = []
-        n_removed = 0
-        desc = f"Filtered {n_removed} items out of dataset"
-        pbar = tqdm.tqdm(self.items, desc=desc)
-        for item in pbar:
-            check = func(self, item)
+        results = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, 'r') as f:
+                results = yaml.load(f, Loader=Loader) or {}
+
+        missing = [i for i, item in enumerate(self.items) if str(item) not in results]
+        dataloader = DataLoader(
+            _FilterItems(self, func, missing), batch_size=None, 
+            num_workers=num_workers, collate_fn=_no_collate)
+
+        n_removed = sum(not results[str(item)] for item in self.items
+                        if str(item) in results)
+        pbar = tqdm.tqdm(dataloader, total=len(missing),
+                         desc=f"Filtered {n_removed} items out of dataset")
+        for index, check, info in pbar:
+            # workers send back copies, so the item is looked up by its index
+            item = self.items[index]
             if not isinstance(check, bool):
                 raise DataSetException(
                     "Output of filter function must be True or False!"
                 )
-            if check:
-                filtered_items.append(item)
-            else:
-                n_removed += 1
+            results[str(item)] = check
+            if info is not None:
+                self._item_info[item] = info
+            n_removed += not check
             pbar.set_description(f"Filtered {n_removed} items out of dataset")
-        self.items = filtered_items
+
+        if cache_path is not None and missing:
+            with open(cache_path, 'w') as f:
+                yaml.dump(results, f, Dumper=Dumper)
+
+        self.items = [item for item in self.items if results[str(item)]]
+
+    def get_item_info(self, item):
+        """
+        Gets information about the mixture of a single item in ``self.items``: its
+        duration (in seconds), number of channels and sample rate (before any
+        resampling by the dataset). By default, this processes the item, which can
+        be slow. Hooks whose items are audio files override this to read the 
+        information from the file headers instead. Use :func:`item_info`, which 
+        caches the result, to get the information.
+
+        Args:
+            item: An item from ``self.items``.
+
+        Returns:
+            dict: Dictionary with the ``duration``, ``num_channels`` and 
+              ``sample_rate`` of the mixture of this item.
+        """
+        mix = self.process_item(item)['mix']
+        return {
+            'duration': float(mix.signal_duration),
+            'num_channels': int(mix.num_channels),
+            'sample_rate': int(mix.sample_rate),
+        }
+
+    def item_info(self, item):
+        """
+        Gets the information about an item (see :func:`get_item_info`). The 
+        information is read once per item and kept, so this is cheap to call again.
+
+        Args:
+            item: An item from ``self.items``.
+
+        Returns:
+            dict: Dictionary with the ``duration``, ``num_channels`` and 
+              ``sample_rate`` of the mixture of this item.
+        """
+        if item not in self._item_info:
+            self._item_info[item] = self.get_item_info(item)
+        return self._item_info[item]
+
+    def get_item_duration(self, item):
+        """
+        Gets the duration (in seconds) of the mixture of a single item in 
+        ``self.items``. By default, this is the duration from :func:`item_info`, 
+        which hooks whose items are audio files read from the file headers. 
+        Override this to get durations some other way.
+
+        Args:
+            item: An item from ``self.items``.
+
+        Returns:
+            float: Duration of the mixture of this item in seconds.
+        """
+        return self.item_info(item)['duration']
+
+    def get_durations(self):
+        """
+        Gets the duration (in seconds) of every item in ``self.items``, using
+        ``self.get_item_duration``. Durations are computed once per item and kept,
+        so this is cheap to call again (e.g. after filtering the items).
+
+        Returns:
+            list: Duration of each item in ``self.items``, in the same order.
+        """
+        missing = [item for item in self.items if item not in self._item_durations]
+        for item in tqdm.tqdm(missing, desc='Reading item durations', 
+                              disable=not missing):
+            self._item_durations[item] = float(self.get_item_duration(item))
+        return [self._item_durations[item] for item in self.items]
 
     @property
     def cache_populated(self):
@@ -218,9 +337,13 @@ class BaseDataset(Dataset, Iterable):
         """
         if self.cache_populated:
             data = {'index': i}
-            data = self.post_cache_transforms(data)
+            data = self._apply_transform(self.post_cache_transforms, data)
         else:
-            data = self.process_item(self.items[i])
+            if self.profiler is not None:
+                data = self.profiler.profile(
+                    'process_item', self.process_item, self.items[i])
+            else:
+                data = self.process_item(self.items[i])
 
             if not isinstance(data, dict):
                 raise DataSetException(
@@ -228,7 +351,7 @@ class BaseDataset(Dataset, Iterable):
 
             if self.transform:
                 data['index'] = i
-                data = self.transform(data)
+                data = self._apply_transform(self.transform, data)
 
                 if not isinstance(data, dict):
                     raise tfm.TransformException(
@@ -236,6 +359,13 @@ class BaseDataset(Dataset, Iterable):
 
         return data
 
+    def _apply_transform(self, transform, data):
+        if self.profiler is None:
+            return transform(data)
+        if isinstance(transform, tfm.Compose):
+            return transform(data, profiler=self.profiler)
+        return self.profiler.profile(transform.__class__.__name__, transform, data)
+
     def __iter__(self):
         """
         Calls ``self.__getitem__`` from ``0`` to ``self.__len__()``.
@@ -307,7 +437,7 @@ class BaseDataset(Dataset, Iterable):
     def _setup_audio_signal(self, audio_signal):
         """
         You will want every item from a dataset to be uniform in sample rate, STFT
-        parameters, and number of channels. This function takes an audio signal 
+        parameters, precision, and number of channels. This function takes an audio signal 
         object loaded by the dataset and uses it to set the sample rate, STFT parameters,
         and the number of channels. If ``self.sample_rate``, ``self.stft_params``, and
         ``self.num_channels`` are set at construction time of the dataset, then the
@@ -350,6 +480,33 @@ class BaseDataset(Dataset, Iterable):
         else:
             self.num_channels = audio_signal.num_channels
 
+        if self.dtype:
+            audio_signal.dtype = self.dtype
+
+def _no_collate(result):
+    # a lambda can't be pickled for spawned DataLoader workers
+    return result
+
+
+class _FilterItems(Dataset):
+    # evaluates a filter function on items, so that this can be done by DataLoader
+    # workers, which also send back the item info they read along with the index
+    # of the item in dataset.items
+    def __init__(self, dataset, func, indices):
+        self.dataset = dataset
+        self.func = func
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        index = self.indices[i]
+        item = self.dataset.items[index]
+        check = self.func(self.dataset, item)
+        return index, check, self.dataset._item_info.get(item, None)
+
+
 class DataSetException(Exception):
     """
     Exception class for errors when working with data sets in nussl.
@@ -0,0 +1,294 @@
+"""
+Batching utilities for datasets whose items have very different lengths. Instead
+of cutting every item to the same length (e.g. with ``transforms.GetExcerpt``),
+:class:`BucketBatchSampler` groups items of similar duration into the same batch
+and :func:`pad_collate` pads the items of a batch to the longest one, so that
+little of each batch is padding. :class:`GeneratedBatchSampler` instead keeps the
+mixtures that an :class:`OnTheFly` dataset generates together in the same batch.
+"""
+import math
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+from torch.utils.data.dataloader import default_collate
+
+
+class BucketBatchSampler(Sampler):
+    """
+    Batch sampler that groups items of similar length. The items of the dataset
+    are sorted by duration (read once with ``dataset.get_durations()``, which
+    reads file headers for most hooks) and split into ``num_buckets`` buckets of
+    (nearly) equal size. Every epoch, the items in each bucket are shuffled and cut
+    into batches, and the order of all the batches is shuffled. Each batch thus
+    only has items from the same bucket, whose lengths are close to each other.
+
+    Use it as the ``batch_sampler`` of a DataLoader, together with
+    :func:`pad_collate`:
+
+    .. code-block:: python
+
+        sampler = nussl.datasets.BucketBatchSampler(dataset, batch_size=16)
+        dataloader = torch.utils.data.DataLoader(
+            dataset, batch_sampler=sampler,
+            collate_fn=nussl.datasets.pad_collate)
+
+    More buckets means less padding but less randomness in how items are batched.
+    With ``max_duration``, the number of items in a batch instead varies so that the
+    duration of the batch after padding (number of items times the longest
+    duration) stays under ``max_duration``, up to ``batch_size`` items. Each bucket
+    is then cut into batches once, in order of duration, so that the number of 
+    batches is the same every epoch; only the order of the batches and of the 
+    items in each batch is shuffled.
+
+    Args:
+        dataset (BaseDataset): Dataset to sample from.
+        batch_size (int): Number of items in each batch (or the maximum number of
+          items if ``max_duration`` is given).
+        num_buckets (int, optional): Number of buckets to group the items into.
+          Defaults to 10.
+        max_duration (float, optional): Maximum duration of a batch after padding,
+          in seconds. Defaults to None.
+        shuffle (bool, optional): Whether to shuffle the items in each bucket and the
+          order of the batches. If False, the batches are always the same and go
+          from the shortest to the longest items. Defaults to True.
+        drop_last (bool, optional): Whether to drop the last batch of each bucket if
+          it has fewer than ``batch_size`` items because the bucket ran out of items
+          (and not because of ``max_duration``). Defaults to False.
+        seed (int, optional): Seed for shuffling. The batches of each epoch are
+          determined by ``seed`` and the epoch (see :func:`set_epoch`). If None,
+          a random seed is used. Defaults to None.
+        durations (list, optional): Duration of each item in the dataset. If None,
+          these are read with ``dataset.get_durations()``. Defaults to None.
+    """
+    def __init__(self, dataset, batch_size, num_buckets=10, max_duration=None,
+                 shuffle=True, drop_last=False, seed=None, durations=None):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}!")
+        if num_buckets < 1:
+            raise ValueError(f"num_buckets must be at least 1, got {num_buckets}!")
+
+        durations = dataset.get_durations() if durations is None else durations
+        if len(durations) != len(dataset):
+            raise ValueError(
+                f"Got {len(durations)} durations for a dataset of length "
+                f"{len(dataset)}!")
+
+        self.durations = np.asarray(durations, dtype=float)
+        self.batch_size = batch_size
+        self.max_duration = max_duration
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+        order = np.argsort(self.durations, kind='stable')
+        num_buckets = min(num_buckets, max(len(order), 1))
+        self.buckets = [b for b in np.array_split(order, num_buckets) if len(b)]
+
+        self.duration_batches = None
+        if max_duration is not None:
+            # cut once, so that every epoch has the same number of batches
+            self.duration_batches = [
+                batch for bucket in self.buckets
+                for batch in self._split_bucket([int(i) for i in bucket])
+            ]
+
+    def set_epoch(self, epoch):
+        """
+        Sets the epoch, which (along with ``seed``) determines how items are shuffled.
+        Call this at the start of every epoch to get different batches every epoch
+        when ``seed`` is given.
+
+        Args:
+            epoch (int): Current epoch.
+        """
+        self.epoch = epoch
+
+    def _split_bucket(self, bucket):
+        if self.max_duration is None:
+            batches = [
+                bucket[i:i + self.batch_size]
+                for i in range(0, len(bucket), self.batch_size)
+            ]
+        else:
+            batches, batch, longest = [], [], 0
+            for index in bucket:
+                _longest = max(longest, self.durations[index])
+                too_long = _longest * (len(batch) + 1) > self.max_duration
+                if batch and (len(batch) == self.batch_size or too_long):
+                    batches.append(batch)
+                    batch, _longest = [], self.durations[index]
+                batch.append(index)
+                longest = _longest
+            if batch:
+                batches.append(batch)
+
+        if self.drop_last and batches and self._ran_out(batches[-1]):
+            batches = batches[:-1]
+        return batches
+
+    def _ran_out(self, batch):
+        # whether the batch is short only because its bucket had no more items
+        if len(batch) >= self.batch_size:
+            return False
+        if self.max_duration is None:
+            return True
+        longest = self.durations[batch].max()
+        return longest * (len(batch) + 1) <= self.max_duration
+
+    def _get_batches(self, rng):
+        if self.duration_batches is not None:
+            batches = [list(b) for b in self.duration_batches]
+            if rng is not None:
+                batches = [[int(i) for i in rng.permutation(b)] for b in batches]
+        else:
+            batches = []
+            for bucket in self.buckets:
+                if rng is not None:
+                    bucket = rng.permutation(bucket)
+                batches.extend(self._split_bucket([int(i) for i in bucket]))
+        if rng is not None:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        return batches
+
+    def _rng(self):
+        if not self.shuffle:
+            return None
+        if self.seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.seed, self.epoch])
+
+    def __iter__(self):
+        yield from self._get_batches(self._rng())
+
+    def __len__(self):
+        if self.duration_batches is not None:
+            return len(self.duration_batches)
+        round_fn = math.floor if self.drop_last else math.ceil
+        return sum(round_fn(len(b) / self.batch_size) for b in self.buckets)
+
+
+class GeneratedBatchSampler(Sampler):
+    """
+    Batch sampler for an :class:`OnTheFly` dataset with a ``batch_size``, whose 
+    batches are the batches that the dataset generates its mixtures in. Each batch
+    is then made with a single call to the mix closure, while a shuffled sampler 
+    would scatter the items of each generated batch over many batches and make the
+    dataset generate a whole batch for almost every item. Every epoch, the order
+    of the batches and the order of the items in each batch are shuffled.
+
+    .. code-block:: python
+
+        dataset = nussl.datasets.OnTheFly(
+            make_mixes, 1000, batch_size=32, seed=0, sample_rate=sample_rate)
+        dataloader = torch.utils.data.DataLoader(
+            dataset, batch_sampler=nussl.datasets.GeneratedBatchSampler(dataset),
+            num_workers=4)
+
+    Args:
+        dataset (OnTheFly): Dataset to sample from. Must have a ``batch_size``.
+        shuffle (bool, optional): Whether to shuffle the batches and the items in
+          each batch. Defaults to True.
+        drop_last (bool, optional): Whether to drop the last batch if it has fewer 
+          than ``batch_size`` items. Defaults to False.
+        seed (int, optional): Seed for shuffling. The batches of each epoch are
+          determined by ``seed`` and the epoch (see :func:`set_epoch`). If None,
+          a random seed is used. Defaults to None.
+    """
+    def __init__(self, dataset, shuffle=True, drop_last=False, seed=None):
+        batch_size = getattr(dataset, 'batch_size', None)
+        if batch_size is None:
+            raise ValueError(
+                "GeneratedBatchSampler needs an OnTheFly dataset with a batch_size!")
+
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+        num_items = len(dataset)
+        self.batches = [
+            list(range(i, min(i + batch_size, num_items)))
+            for i in range(0, num_items, batch_size)
+        ]
+        if drop_last and self.batches and len(self.batches[-1]) < batch_size:
+            self.batches = self.batches[:-1]
+
+    def set_epoch(self, epoch):
+        """
+        Sets the epoch, which (along with ``seed``) determines how batches are 
+        shuffled.
+
+        Args:
+            epoch (int): Current epoch.
+        """
+        self.epoch = epoch
+
+    def __iter__(self):
+        if not self.shuffle:
+            yield from (list(b) for b in self.batches)
+            return
+        rng = (
+            np.random.default_rng() if self.seed is None
+            else np.random.default_rng([self.seed, self.epoch]))
+        for i in rng.permutation(len(self.batches)):
+            yield [int(j) for j in rng.permutation(self.batches[i])]
+
+    def __len__(self):
+        return len(self.batches)
+
+
+def pad_collate(batch, pad_value=0):
+    """
+    Collates a list of data dictionaries (the output of a dataset with
+    ``transforms.ToSeparationModel`` as the last transform) into a batch,
+    zero-padding every array to the largest shape among the items. Arrays of
+    items with different lengths (e.g. ``mix_magnitude`` or ``source_audio``) are
+    padded at the end of every dimension that doesn't match, so the time axis can
+    be anywhere. All other values are collated with torch's default collate
+    function.
+
+    For every array, the shapes of the items before padding are returned under
+    ``'<key>_lengths'`` (e.g. ``mix_magnitude_lengths``), as a LongTensor of shape
+    (batch size, number of dimensions of an item). Losses can use them to ignore
+    the padded region of each item, e.g. frame ``t`` of item ``i`` of
+    ``mix_magnitude`` is real data if ``t < mix_magnitude_lengths[i, 0]``. They
+    are returned even if no item of the batch was padded, so that every batch has
+    the same keys.
+
+    Args:
+        batch (list): List of dictionaries to collate.
+        pad_value (float, optional): Value to pad with. Defaults to 0.
+
+    Returns:
+        dict: Dictionary where each value is batched along a new first dimension,
+        along with the ``'<key>_lengths'`` of every array.
+    """
+    output = {}
+    for key in batch[0]:
+        values = [item[key] for item in batch]
+        if isinstance(values[0], np.ndarray):
+            values = [torch.from_numpy(v) for v in values]
+        if not torch.is_tensor(values[0]):
+            output[key] = default_collate(values)
+            continue
+
+        shapes = [v.shape for v in values]
+        if any(len(s) != len(shapes[0]) for s in shapes):
+            raise ValueError(
+                f"Cannot pad {key}: its items have different numbers of dimensions!")
+        output[f'{key}_lengths'] = torch.tensor(
+            [list(s) for s in shapes], dtype=torch.long).reshape(
+                len(values), len(shapes[0]))
+        if all(s == shapes[0] for s in shapes):
+            output[key] = torch.stack(values)
+            continue
+
+        max_shape = [max(dims) for dims in zip(*shapes)]
+        padded = values[0].new_full((len(values), *max_shape), pad_value)
+        for i, v in enumerate(values):
+            padded[(i, *[slice(0, d) for d in v.shape])] = v
+        output[key] = padded
+    return output
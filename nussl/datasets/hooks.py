@@ -5,7 +5,10 @@ These data set "hooks" subclass BaseDataset and by default return AudioSignal ob
 labeled dictionaries for ease of use. Transforms can be applied to these datasets for use
 in machine learning pipelines.
 """
+import json
 import os
+import random
+import warnings
 import yaml
 from itertools import chain
 try:
@@ -15,7 +18,9 @@ except ImportError:
 
 from .. import musdb
 import numpy as np
+import torch
 import jams
+import tqdm
 try:
     from pretty_midi import PrettyMIDI
 except ImportError:
@@ -63,6 +68,16 @@ class MUSDB18(BaseDataset):
             train/validation split. split=’train’ loads the training split, 
             `split=’valid’ loads the validation split. split=None applies no 
             splitting. Defaults to None.
+        decoded_cache (str, optional): Folder for a cache of decoded stems. The
+            first time a track is accessed, the mixture and every source are 
+            decoded once through ``musdb`` and written to this folder as raw 
+            float32 files (one per stem, ``(num_samples, num_channels)``). After 
+            that, the track is read from these files through a memory map and 
+            ffmpeg is never called for it again. Defaults to None (no cache).
+        excerpt_duration (float, optional): If given, every item is a random 
+            excerpt of this many seconds of the track (the same excerpt for the
+            mixture and the sources) instead of the whole track. With 
+            ``decoded_cache``, only the excerpt is read from disk. Defaults to None.
         **kwargs: Any additional arguments that are passed up to BaseDataset 
             (see ``nussl.datasets.BaseDataset``).
     """
@@ -70,29 +85,154 @@ class MUSDB18(BaseDataset):
         "musdb": "56777516ad56fe6a8590badf877e6be013ff932c010e0fbdb0aba03ef878d4cd",
     }
     
+    CACHE_INFO_FILE = 'info.yml'
+
     def __init__(self, folder=None, is_wav=False, download=False,
-                 subsets=None, split=None, **kwargs):
+                 subsets=None, split=None, decoded_cache=None, 
+                 excerpt_duration=None, **kwargs):
         subsets = ['train', 'test'] if subsets is None else subsets
         if folder is None:
             folder = os.path.join(
                 constants.DEFAULT_DOWNLOAD_DIRECTORY, 'musdb18'
             )
+        if excerpt_duration is not None and excerpt_duration <= 0:
+            raise DataSetException(
+                f"excerpt_duration must be positive, got {excerpt_duration}!")
         self.musdb = musdb.DB(root=folder, is_wav=is_wav, download=download, 
                               subsets=subsets, split=split)
+        self.decoded_cache = decoded_cache
+        self.excerpt_duration = excerpt_duration
         super().__init__(folder, **kwargs)
         self.metadata['subsets'] = subsets
         self.metadata['split'] = split
+        self.metadata['decoded_cache'] = decoded_cache
+        self.metadata['excerpt_duration'] = excerpt_duration
 
     def get_items(self, folder):
         items = range(len(self.musdb))
         return list(items)
 
+    def _cache_folder(self, track):
+        return os.path.join(self.decoded_cache, track.subset, track.name)
+
+    def _write_decoded_cache(self, track):
+        """
+        Decodes every stem of the track once and writes each to a raw float32 file
+        in the cache folder. The info file is written last, so a track whose
+        info file exists is complete, even if another worker was writing the same
+        track at the same time.
+        """
+        cache_folder = self._cache_folder(track)
+        os.makedirs(cache_folder, exist_ok=True)
+
+        stems = track.stems
+        stem_ids = {'mixture': 0}
+        stem_ids.update({k: v.stem_id for k, v in track.sources.items()})
+
+        for name, stem_id in stem_ids.items():
+            path = os.path.join(cache_folder, f'{name}.f32')
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            np.ascontiguousarray(stems[stem_id], dtype=np.float32).tofile(tmp_path)
+            os.replace(tmp_path, path)
+
+        info = {
+            'sample_rate': int(track.rate),
+            'num_samples': int(stems.shape[1]),
+            'num_channels': int(stems.shape[2]),
+            'stems': sorted(stem_ids, key=stem_ids.get),
+        }
+        info_path = os.path.join(cache_folder, self.CACHE_INFO_FILE)
+        tmp_path = f'{info_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            yaml.dump(info, f, Dumper=Dumper)
+        os.replace(tmp_path, info_path)
+        return info
+
+    def _read_decoded_cache(self, track):
+        """
+        Reads a track from the decoded cache, populating the cache first if the
+        track is not in it yet. Only the samples of the excerpt (if 
+        ``excerpt_duration`` is set) are read from disk. The stems are stored as 
+        float32, and returned in the precision of the dataset (float64 if it has
+        none), like the stems read without the cache.
+        """
+        cache_folder = self._cache_folder(track)
+        info_path = os.path.join(cache_folder, self.CACHE_INFO_FILE)
+        if os.path.exists(info_path):
+            with open(info_path, 'r') as f:
+                info = yaml.load(f, Loader=Loader)
+        else:
+            info = self._write_decoded_cache(track)
+
+        sample_rate = info['sample_rate']
+        start, stop = self._excerpt_bounds(info['num_samples'], sample_rate)
+
+        float_dtype = utils._resolve_dtype(self.dtype) or np.dtype(np.float64)
+        audio = {}
+        for name in info['stems']:
+            stem = np.memmap(
+                os.path.join(cache_folder, f'{name}.f32'), dtype=np.float32, 
+                mode='r', shape=(info['num_samples'], info['num_channels']))
+            audio[name] = np.array(stem[start:stop].T, dtype=float_dtype)
+        return audio, sample_rate
+
+    def _excerpt_bounds(self, num_samples, sample_rate):
+        if self.excerpt_duration is None:
+            return 0, num_samples
+        excerpt_length = int(self.excerpt_duration * sample_rate)
+        if excerpt_length >= num_samples:
+            return 0, num_samples
+        start = random.randint(0, num_samples - excerpt_length)
+        return start, start + excerpt_length
+
+    def get_item_info(self, item):
+        track = self.musdb[item]
+        info = None
+        if self.decoded_cache is not None:
+            info_path = os.path.join(
+                self._cache_folder(track), self.CACHE_INFO_FILE)
+            if os.path.exists(info_path):
+                with open(info_path, 'r') as f:
+                    cache_info = yaml.load(f, Loader=Loader)
+                info = {
+                    'duration': cache_info['num_samples'] / cache_info['sample_rate'],
+                    'num_channels': cache_info['num_channels'],
+                    'sample_rate': cache_info['sample_rate'],
+                }
+        if info is None and getattr(track, 'duration', None) is not None:
+            # every MUSDB18 track is stereo
+            info = {
+                'duration': float(track.duration),
+                'num_channels': 2,
+                'sample_rate': int(track.rate),
+            }
+        if info is None:
+            info = super().get_item_info(item)
+        elif self.excerpt_duration is not None:
+            info['duration'] = min(info['duration'], self.excerpt_duration)
+        return info
+
     def process_item(self, item):
         track = self.musdb[item]
-        mix, sources = utils.musdb_track_to_audio_signals(track)
-        self._setup_audio_signal(mix)
-        for source in list(sources.values()):
-            self._setup_audio_signal(source)
+
+        if self.decoded_cache is not None:
+            audio, sample_rate = self._read_decoded_cache(track)
+            mix = self._load_audio_from_array(audio.pop('mixture'), sample_rate)
+            mix.path_to_input_file = track.name
+            sources = {}
+            for k, v in audio.items():
+                sources[k] = self._load_audio_from_array(v, sample_rate)
+                sources[k].path_to_input_file = f'musdb/{track.name}_{k}.wav'
+        else:
+            mix, sources = utils.musdb_track_to_audio_signals(track)
+            if self.excerpt_duration is not None:
+                start, stop = self._excerpt_bounds(
+                    mix.signal_length, mix.sample_rate)
+                for signal in [mix, *sources.values()]:
+                    signal.audio_data = signal.audio_data[:, start:stop]
+            self._setup_audio_signal(mix)
+            for source in list(sources.values()):
+                self._setup_audio_signal(source)
         
         output = {
             'mix': mix,
@@ -212,6 +352,17 @@ class MixSourceFolder(BaseDataset):
             mix = self._load_audio_file(mix_path)
         return mix, sources
 
+    def get_item_info(self, item):
+        if self.make_mix:
+            # the mix is as long as the longest source
+            return max([
+                utils.get_audio_file_info(os.path.join(self.folder, k, item))
+                for k in self.source_folders
+                if os.path.exists(os.path.join(self.folder, k, item))
+            ], key=lambda info: info['duration'])
+        return utils.get_audio_file_info(
+            os.path.join(self.folder, self.mix_folder, item))
+
     def process_item(self, item):
         mix, sources = self.get_mix_and_sources(item)
         output = {
@@ -273,11 +424,16 @@ class Scaper(BaseDataset):
                 ...
             }
             'metadata': {
-                'jams': [the content of the jams file used to generate the soundscape]
+                'scaper': [the annotation of the soundscape, see below]
                 'labels': ['label0', 'label1', 'label2', 'label3']
             }
         }
 
+    By default, ``metadata['scaper']`` is a dictionary with the fields of the JAMS 
+    file that are needed to load the item: ``'mix_path'``, ``'source_paths'``, 
+    ``'labels'``, and the label and ``[onset, duration]`` of every event 
+    (``'event_labels'`` and ``'event_times'``). With ``load_jam=True``, it is the 
+    JAMS object of the soundscape instead, which is slower to load.
 
     Example of generating a Scaper dataset and then loading it with nussl:
 
@@ -308,26 +464,155 @@ class Scaper(BaseDataset):
     >>>     sc.generate(audio_path, jams_path, save_isolated_events=True)
     >>> dataset = nussl.datasets.Scaper(output_dir)
     >>> dataset[0] # contains mix, sources, and metadata corresponding to 0.jams.
+
+    Parsing (and validating) JAMS files is slow. With ``annotation_cache``, every
+    JAMS file is parsed once and the fields needed to load its item (the paths to 
+    the audio, the labels, and the label and timing of every event) are kept in a 
+    JSON index, ``.nussl_annotations.json`` in ``folder`` or a file of your choice. 
+    Entries are keyed by the absolute path of the JAMS file, so one index can be 
+    shared by several folders. When the dataset is made, JAMS files that were 
+    modified (or added) since the index was written are parsed again. Items are 
+    then loaded from the index, without reading the JAMS files again (unless 
+    ``load_jam`` is set, in which case they are read without validating them).
+
+    Args:
+        folder (str): Folder containing the JAMS files (and the audio) made by Scaper.
+        args: Additional positional arguments to BaseDataset.
+        annotation_cache (bool or str, optional): Whether to keep the parsed
+          annotations in an index in ``folder``, or the path to the file to keep
+          the index in (e.g. if ``folder`` is read-only). If False, every JAMS file 
+          is parsed each time its item is processed. Defaults to False.
+        load_jam (bool, optional): Whether to put the JAMS object of each item in
+          ``metadata['scaper']``, instead of the fields needed to load the item.
+          Defaults to False.
+        kwargs: Additional keyword arguments to BaseDataset.
         
     Raises:
         DataSetException: if Scaper dataset wasn't saved with isolated event audio.
     """
+    ANNOTATION_CACHE_FILE = '.nussl_annotations.json'
+    ANNOTATION_CACHE_VERSION = 1
+    ANNOTATION_FIELDS = [
+        'mix_path', 'source_paths', 'labels', 'event_labels', 'event_times']
+
+    def __init__(self, folder, *args, annotation_cache=False, load_jam=False, 
+                 **kwargs):
+        self.annotation_cache = annotation_cache
+        self.load_jam = load_jam
+        self._annotations = None
+        super().__init__(folder, *args, **kwargs)
+        self.metadata['annotation_cache'] = annotation_cache
+        self.metadata['load_jam'] = load_jam
+
     def get_items(self, folder):
         items = sorted([
             x for x in os.listdir(folder)
             if os.path.splitext(x)[1] in ['.jams']
         ])
+        if self.annotation_cache:
+            self._annotations = self._build_annotation_index(folder, items)
         return items
 
-    def _get_info_from_item(self, item):
-        jam = jams.load(os.path.join(self.folder, item))
+    def _annotation_cache_path(self, folder):
+        if isinstance(self.annotation_cache, str):
+            return self.annotation_cache
+        return os.path.join(folder, self.ANNOTATION_CACHE_FILE)
+
+    def _read_annotation_index(self, cache_path):
+        if not os.path.exists(cache_path):
+            return {}
+        try:
+            with open(cache_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (not isinstance(index, dict) 
+                or index.get('version', None) != self.ANNOTATION_CACHE_VERSION):
+            return {}
+        return index.get('annotations', {})
+
+    def _build_annotation_index(self, folder, items):
+        """
+        Builds the index of parsed annotations of every item, keyed by the absolute
+        path of its JAMS file. The index is kept in a JSON file (see 
+        ``annotation_cache``), and only JAMS files that are not in it yet, or whose 
+        modification time or size changed since they were parsed, are parsed again.
+        """
+        cache_path = self._annotation_cache_path(folder)
+        index = self._read_annotation_index(cache_path)
+
+        annotations, changed = {}, False
+        for item in tqdm.tqdm(items, desc='Indexing JAMS files'):
+            path_to_item = os.path.abspath(os.path.join(folder, item))
+            stat = os.stat(path_to_item)
+            record = index.get(path_to_item, None)
+            if (record is None or record['mtime'] != stat.st_mtime_ns 
+                    or record['size'] != stat.st_size):
+                record = self._parse_annotation(path_to_item, item)
+                del record['jam']
+                record.update(mtime=stat.st_mtime_ns, size=stat.st_size)
+                changed = True
+            annotations[path_to_item] = record
+
+        # entries of JAMS files that were removed are dropped, entries of other 
+        # folders sharing the index are kept
+        stale = [
+            path for path in index 
+            if path not in annotations and not os.path.exists(path)
+        ]
+        if changed or stale:
+            for path in stale:
+                del index[path]
+            index.update(annotations)
+            try:
+                tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({
+                        'version': self.ANNOTATION_CACHE_VERSION,
+                        'annotations': index,
+                    }, f)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                warnings.warn(
+                    f"Could not write the annotation cache to {cache_path}!")
+        return annotations
+
+    def _parse_annotation(self, path_to_item, item):
+        """
+        Parses the JAMS file of an item into the information needed to load it: 
+        the JAMS object, the paths to the mix and the sources, and the label, 
+        onset and duration of each event.
+        """
+        jam = jams.load(path_to_item)
         ann = jam.annotations.search(namespace='scaper')[0]
-        mix_path = ann.sandbox.scaper['soundscape_audio_path']
-        source_paths = ann.sandbox.scaper['isolated_events_audio_path']
-        return jam, ann, mix_path, source_paths
+        events = list(ann)
+        return {
+            'jam': jam,
+            'mix_path': ann.sandbox.scaper['soundscape_audio_path'],
+            'source_paths': list(ann.sandbox.scaper['isolated_events_audio_path']),
+            'labels': list(ann.sandbox.scaper['fg_labels']),
+            'event_labels': [e.value['label'] for e in events],
+            'event_times': [[e.time, e.duration] for e in events],
+        }
+
+    def _get_annotation(self, item, load_jam=False):
+        path_to_item = os.path.join(self.folder, item)
+        if self._annotations is None:
+            # no index, parse the JAMS file every time
+            return self._parse_annotation(path_to_item, item)
+        annotation = dict(self._annotations[os.path.abspath(path_to_item)])
+        # the file was validated when it was indexed
+        annotation['jam'] = (
+            jams.load(path_to_item, validate=False) if load_jam else None)
+        return annotation
+
+    def get_item_info(self, item):
+        annotation = self._get_annotation(item)
+        return utils.get_audio_file_info(annotation['mix_path'])
 
     def process_item(self, item):
-        jam, ann, mix_path, source_paths = self._get_info_from_item(item)
+        annotation = self._get_annotation(item, load_jam=self.load_jam)
+        mix_path, source_paths = annotation['mix_path'], annotation['source_paths']
         if not source_paths:
             raise DataSetException(
                 "No paths to isolated events found! Did you generate "
@@ -336,8 +621,7 @@ class Scaper(BaseDataset):
         mix = self._load_audio_file(mix_path)
         sources = {}
 
-        for event_spec, event_audio_path in zip(ann, source_paths):
-            label = event_spec.value['label']
+        for label, event_audio_path in zip(annotation['event_labels'], source_paths):
             label_count = 0
             for k in sources:
                 if label in k:
@@ -349,8 +633,10 @@ class Scaper(BaseDataset):
             'mix': mix,
             'sources': sources,
             'metadata': {
-                'scaper': jam,
-                'labels': ann.sandbox.scaper['fg_labels'],
+                'scaper': (
+                    annotation['jam'] if self.load_jam else 
+                    {k: annotation[k] for k in self.ANNOTATION_FIELDS}),
+                'labels': annotation['labels'],
             }
         }
         return output
@@ -398,6 +684,41 @@ class OnTheFly(BaseDataset):
     >>>      return output
     >>>  dataset = nussl.datasets.OnTheFly(make_mix, 10)
 
+    The closure can use ``dataset.rng``, a ``np.random.Generator`` that is re-seeded 
+    from ``seed`` and the index of the item before every call. If ``seed`` is set, 
+    each item is then the same every time it is generated, no matter which
+    DataLoader worker generates it.
+
+    If ``batch_size`` is set, the closure instead creates ``batch_size`` mixtures at 
+    once, as arrays, which avoids most of the per-item Python overhead. It is called
+    with the dataset and the list of indices in the batch, and must return a 
+    dictionary where ``'mix'`` is an array of shape ``(batch, n_channels, n_samples)``,
+    ``'sources'`` is a dictionary of arrays of the same shape, and every other value 
+    (e.g. ``'metadata'``) is indexable by position in the batch. Each item is then 
+    returned as AudioSignals (at ``sample_rate``, which must be given) as usual. 
+    :func:`nussl.mixing.pan_audio` and :func:`nussl.mixing.delay_audio` work on 
+    batches of arrays, and a :class:`SourcePool` can hold the source material in 
+    shared memory so that DataLoader workers don't each keep a copy of it:
+
+    >>>  pool = nussl.datasets.SourcePool(signals)
+    >>>  def make_mixes(dataset, indices):
+    >>>      n = len(indices)
+    >>>      sources = {}
+    >>>      for i in range(n_sources):
+    >>>          audio, _ = pool.sample(dataset.rng, n, duration * sample_rate)
+    >>>          gain = dataset.rng.uniform(0.5, 1.0, size=(n, 1, 1))
+    >>>          angle = dataset.rng.uniform(-45, 45, size=n)
+    >>>          sources[f'source{i}'] = nussl.mixing.pan_audio(gain * audio, angle)
+    >>>      return {'mix': sum(sources.values()), 'sources': sources}
+    >>>  dataset = nussl.datasets.OnTheFly(
+    >>>      make_mixes, 1000, batch_size=32, seed=0, sample_rate=sample_rate)
+
+    Each generated batch is kept until an item from another batch is requested, so
+    the items of a batch should be read together: use a 
+    :class:`GeneratedBatchSampler` as the ``batch_sampler`` of the DataLoader, which
+    shuffles the batches without splitting them up. With a plain shuffled sampler,
+    almost every item would generate a whole batch.
+
     Args:
         mix_closure (function): A closure that determines how to create
           a single mixture, given the index. It has a strict input 
@@ -406,19 +727,45 @@ class OnTheFly(BaseDataset):
         num_mixtures (int): Number of mixtures that will be created on
           the fly. This determines one 'run' thrugh the dataset, or an 
           epoch.
+        batch_size (int, optional): If given, ``mix_closure`` makes this many 
+          mixtures at a time, as arrays. Defaults to None.
+        seed (int, optional): Seed for ``dataset.rng``. If None, ``dataset.rng`` is
+          seeded randomly for every item. Defaults to None.
         kwargs: Keyword arguments to BaseDataset.
     """
-    def __init__(self, mix_closure, num_mixtures, **kwargs):
+    def __init__(self, mix_closure, num_mixtures, batch_size=None, seed=None,
+                 **kwargs):
         self.num_mixtures = num_mixtures
         self.mix_closure = mix_closure
+        self.batch_size = batch_size
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self._batch_index = None
+        self._batch = None
+
+        if batch_size is not None and kwargs.get('sample_rate') is None:
+            raise DataSetException(
+                "sample_rate must be given to OnTheFly when using batch_size!")
 
         super().__init__('none', **kwargs)
         self.metadata['num_mixtures'] = num_mixtures
+        self.metadata['batch_size'] = batch_size
+        self.metadata['seed'] = seed
 
     def get_items(self, folder):
         return list(range(self.num_mixtures))
+
+    def _seed(self, index):
+        if self.seed is not None:
+            self.rng = np.random.default_rng([self.seed, index])
+        else:
+            self.rng = np.random.default_rng()
     
     def process_item(self, item):
+        if self.batch_size is not None:
+            return self._process_batched_item(item)
+
+        self._seed(item)
         output = self.mix_closure(self, item)
         if not isinstance(output, dict):
             raise DataSetException("output of mix_closure must be a dict!")
@@ -428,6 +775,127 @@ class OnTheFly(BaseDataset):
                 "'mix', 'sources' as keys!")
         return output
 
+    def _process_batched_item(self, item):
+        batch_index = item // self.batch_size
+        start = batch_index * self.batch_size
+        indices = list(range(start, min(start + self.batch_size, self.num_mixtures)))
+
+        if batch_index != self._batch_index:
+            self._seed(batch_index)
+            output = self.mix_closure(self, indices)
+            if not isinstance(output, dict):
+                raise DataSetException("output of mix_closure must be a dict!")
+            if 'mix' not in output or 'sources' not in output:
+                raise DataSetException(
+                    "output of mix_closure must be a dict containing "
+                    "'mix', 'sources' as keys!")
+            if len(output['mix']) != len(indices):
+                raise DataSetException(
+                    f"mix_closure was asked for {len(indices)} mixtures but "
+                    f"made {len(output['mix'])}!")
+            self._batch_index, self._batch = batch_index, output
+
+        j = item - start
+        output = {}
+        for key, value in self._batch.items():
+            if key == 'mix':
+                output[key] = self._load_audio_from_array(np.asarray(value[j]))
+            elif key == 'sources':
+                output[key] = {
+                    name: self._load_audio_from_array(np.asarray(source[j]))
+                    for name, source in value.items()
+                }
+            else:
+                output[key] = value[j]
+        return output
+
+
+class SourcePool(object):
+    """
+    A pool of source material for generating mixtures on the fly (see 
+    :class:`OnTheFly`). The audio of every signal is concatenated into a single 
+    buffer in shared memory, so that DataLoader workers read the same memory 
+    instead of each holding a copy, and excerpts for a whole batch of mixtures are 
+    drawn with a single gather.
+
+    Args:
+        signals (list of AudioSignal): Source material. All signals must have the same
+          sample rate and number of channels.
+        labels (list, optional): A label for each signal, returned by :func:`sample`
+          via the indices. Defaults to None.
+
+    Raises:
+        DataSetException: if the signals don't share a sample rate and number of 
+          channels.
+    """
+    def __init__(self, signals, labels=None):
+        if not signals:
+            raise DataSetException("SourcePool needs at least one signal!")
+        sample_rates = set(s.sample_rate for s in signals)
+        num_channels = set(s.num_channels for s in signals)
+        if len(sample_rates) > 1 or len(num_channels) > 1:
+            raise DataSetException(
+                "All signals in a SourcePool must have the same sample rate and "
+                f"number of channels! Got {sample_rates} and {num_channels}.")
+
+        self.sample_rate = sample_rates.pop()
+        self.num_channels = num_channels.pop()
+        self.labels = labels
+        self.lengths = np.array([s.signal_length for s in signals])
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)[:-1]])
+
+        audio = torch.from_numpy(
+            np.concatenate([s.audio_data for s in signals], axis=-1))
+        self._audio = audio.share_memory_()
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @property
+    def audio_data(self):
+        """
+        The concatenated audio of every signal in the pool, shape 
+        ``(n_channels, total_length)``.
+        """
+        return self._audio.numpy()
+
+    def sample(self, rng, num_excerpts, excerpt_length, indices=None):
+        """
+        Draws excerpts of ``excerpt_length`` samples from randomly chosen (or given)
+        signals in the pool, each at a random offset. Signals shorter than the excerpt
+        are zero-padded at the end.
+
+        Args:
+            rng (np.random.Generator): Random number generator to use (e.g. 
+              ``dataset.rng`` in an :class:`OnTheFly` closure).
+            num_excerpts (int): Number of excerpts to draw.
+            excerpt_length (int): Length of each excerpt in samples.
+            indices (np.ndarray, optional): Which signal to take each excerpt from. 
+              Defaults to None (chosen uniformly at random).
+
+        Returns:
+            tuple: The excerpts, shape ``(num_excerpts, n_channels, excerpt_length)``,
+            and the index of the signal each was taken from.
+        """
+        if indices is None:
+            indices = rng.integers(len(self), size=num_excerpts)
+        indices = np.asarray(indices)
+        excerpt_length = int(excerpt_length)
+
+        lengths = self.lengths[indices]
+        max_offsets = np.maximum(lengths - excerpt_length, 0)
+        offsets = (rng.random(num_excerpts) * (max_offsets + 1)).astype(int)
+
+        positions = offsets[:, None] + np.arange(excerpt_length)
+        valid = positions < lengths[:, None]
+        positions = self.offsets[indices][:, None] + np.minimum(
+            positions, lengths[:, None] - 1)
+
+        excerpts = self.audio_data[:, positions].transpose(1, 0, 2)
+        excerpts *= valid[:, None, :]
+        return excerpts, indices
+
+
 class FUSS(Scaper):
     """
     The Free Universal Sound Separation (FUSS) Dataset is a database of arbitrary 
@@ -457,7 +925,8 @@ class FUSS(Scaper):
         root (str): Folder where the FUSS data is. Either points to ssdata or 
           ssdata_reverb.
         split (str): Either the ``train``, ``validation``, or ``eval`` split. 
-        kwargs: Additional keyword arguments to BaseDataset.
+        kwargs: Additional keyword arguments to Scaper (e.g. ``annotation_cache``
+          or ``load_jam``) and BaseDataset.
     """
     def __init__(self, root, split='train', **kwargs):
         if split not in ['train', 'validation', 'eval']:
@@ -470,22 +939,19 @@ class FUSS(Scaper):
                          **kwargs)
         self.metadata['split'] = split
 
-    def _get_info_from_item(self, item):
-        path_to_item = os.path.join(self.folder, item)
+    def _parse_annotation(self, path_to_item, item):
+        annotation = super()._parse_annotation(path_to_item, item)
         item_base_name = os.path.splitext(item)[0]
+        folder = os.path.dirname(path_to_item)
 
-        jam = jams.load(path_to_item)
-        ann = jam.annotations.search(namespace='scaper')[0]
-        mix_path = ann.sandbox.scaper['soundscape_audio_path']
-        source_paths = ann.sandbox.scaper['isolated_events_audio_path']
-
-        mix_path = os.path.join(
-            self.folder, item_base_name + mix_path.split(item_base_name)[-1])
-        for i, source_path in enumerate(source_paths):
-            source_paths[i] = os.path.join(
-                self.folder, item_base_name + source_path.split(item_base_name)[-1])
-
-        return jam, ann, mix_path, source_paths
+        mix_path = annotation['mix_path']
+        annotation['mix_path'] = os.path.join(
+            folder, item_base_name + mix_path.split(item_base_name)[-1])
+        annotation['source_paths'] = [
+            os.path.join(folder, item_base_name + source_path.split(item_base_name)[-1])
+            for source_path in annotation['source_paths']
+        ]
+        return annotation
 
 
 class WHAM(MixSourceFolder):
@@ -644,7 +1110,7 @@ class Slakh(BaseDataset):
     def __init__(self, root, recipe=None, split='train', class_key="inst_class",
                  min_acceptable_sources=2, midi=False, make_submix=False, transform=None,
                  sample_rate=None, stft_params=None, num_channels=None, strict_sample_rate=True,
-                 cache_populated=False):
+                 cache_populated=False, dtype=None, profiler=None):
 
         self.class_key = class_key
         recipe = Slakh.default_recipe(class_key) if recipe is None else recipe
@@ -666,7 +1132,7 @@ class Slakh(BaseDataset):
         self.min_acceptable_sources = min_acceptable_sources
 
         super().__init__(root, transform, sample_rate, stft_params, num_channels,
-            strict_sample_rate, cache_populated)
+            strict_sample_rate, cache_populated, dtype, profiler)
 
         if not self.items:
             raise DataSetException(
@@ -763,6 +1229,19 @@ class Slakh(BaseDataset):
             midi_mix.instruments.extend(src_midi.instruments)
         return midi_mix, sources
 
+    def get_item_info(self, srcs_dir):
+        # every stem (and the mix) has the same length
+        with open(os.path.join(srcs_dir, 'metadata.yaml'), 'r') as f:
+            src_metadata = yaml.load(f, Loader=Loader)
+        _, audio_dir = os.path.split(src_metadata["audio_dir"])
+        audio_dir = os.path.join(srcs_dir, audio_dir)
+        stems = sorted(
+            file for file in os.listdir(audio_dir)
+            if os.path.splitext(file)[1].lower() in ('.wav', '.flac'))
+        if not stems:
+            return super().get_item_info(srcs_dir)
+        return utils.get_audio_file_info(os.path.join(audio_dir, stems[0]))
+
     def process_item(self, srcs_dir):
         # Use the file's metadata and the submix recipe to gather all the
         # sources together.
@@ -0,0 +1,333 @@
+"""
+Sharded, sequential archives of datasets. Hooks like :class:`MixSourceFolder` or
+:class:`Scaper` open several small files for every item, which is slow on network
+filesystems and cold disks. :func:`write_shards` processes every item of a dataset
+once and packs the results (mix, sources, metadata) into a few large ``.tar``
+shards, and :class:`ShardedDataset` reads them back, either by index or by
+streaming through the shards sequentially.
+"""
+import io
+import os
+import pickle
+import tarfile
+
+import numpy as np
+import torch
+from torch.utils.data import IterableDataset
+import tqdm
+import yaml
+try:
+    from yaml import CLoader as Loader, CDumper as Dumper
+except ImportError:
+    from yaml import Loader, Dumper
+
+from .. import AudioSignal
+from .base_dataset import BaseDataset, DataSetException
+
+SHARD_INDEX_FILE = 'shards.yml'
+SHARD_INDEX_VERSION = 2
+# fields of the mix info stored after the offset and size of each item, by version
+# of the index (indexes without a version are version 1)
+_INDEX_INFO_FIELDS = {
+    1: ['duration'],
+    2: ['duration', 'num_channels', 'sample_rate'],
+}
+
+
+def _encode(value):
+    if isinstance(value, AudioSignal):
+        return {
+            '__audio_signal__': True,
+            'audio_data': value.audio_data,
+            'sample_rate': value.sample_rate,
+            'path_to_input_file': value.path_to_input_file,
+        }
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_encode(v) for v in value)
+    return value
+
+
+class _EncodedItems(torch.utils.data.Dataset):
+    # processes and serializes items, so that this can be done by DataLoader workers
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, i):
+        data = self.dataset.process_item(self.dataset.items[i])
+        mix = data['mix']
+        mix_info = [
+            float(mix.signal_duration), int(mix.num_channels), int(mix.sample_rate)]
+        record = pickle.dumps(_encode(data), protocol=pickle.HIGHEST_PROTOCOL)
+        return record, mix_info
+
+
+def write_shards(dataset, folder, max_shard_size=2 ** 30, num_workers=0):
+    """
+    Writes every item of a dataset (the output of ``dataset.process_item``, without
+    any transforms) to a sharded archive in ``folder``, which can then be read with
+    :class:`ShardedDataset`. Items are written in order to ``.tar`` shards
+    (``shard-00000.tar``, ``shard-00001.tar``, ...), each holding one pickled
+    record per item, and a new shard is started once a shard grows past
+    ``max_shard_size`` bytes. An index of where each item is in the shards (along
+    with the duration, number of channels and sample rate of its mixture) is written
+    to ``shards.yml``. Indexes written by older versions of nussl, which only
+    have the duration of each item, can still be read.
+
+    AudioSignal objects in the items (including those in dictionaries like
+    ``sources``) are stored as their audio data, sample rate and path, and rebuilt
+    by :class:`ShardedDataset`. Everything else is pickled as is.
+
+    Args:
+        dataset (BaseDataset): Dataset to write.
+        folder (str): Folder to write the shards to.
+        max_shard_size (int, optional): Size in bytes after which a new shard is
+          started. Defaults to 2 ** 30 (1 GiB).
+        num_workers (int, optional): Number of worker processes to process items
+          with. Defaults to 0 (items are processed in this process).
+
+    Returns:
+        list: Paths to the shards that were written.
+    """
+    os.makedirs(folder, exist_ok=True)
+    dataloader = torch.utils.data.DataLoader(
+        _EncodedItems(dataset), batch_size=None, num_workers=num_workers)
+
+    shards = []
+    tar = None
+
+    def _close_shard():
+        tar.close()
+        # the offsets of the records are read back from the headers of the shard
+        with tarfile.open(os.path.join(folder, shards[-1]['path'])) as _tar:
+            offsets = [m.offset_data for m in _tar.getmembers()]
+        for item, offset in zip(shards[-1]['items'], offsets):
+            item[0] = offset
+
+    try:
+        for i, (record, mix_info) in enumerate(tqdm.tqdm(
+                dataloader, desc=f'Writing shards to {folder}')):
+            if tar is None or tar.offset >= max_shard_size:
+                if tar is not None:
+                    _close_shard()
+                shards.append({'path': f'shard-{len(shards):05d}.tar', 'items': []})
+                tar = tarfile.open(os.path.join(folder, shards[-1]['path']), 'w')
+
+            info = tarfile.TarInfo(f'{i:08d}.pkl')
+            info.size = len(record)
+            tar.addfile(info, io.BytesIO(record))
+            shards[-1]['items'].append([None, len(record), *mix_info])
+
+        if tar is not None:
+            _close_shard()
+    finally:
+        # the shard being written is closed if processing an item fails
+        if tar is not None and not tar.closed:
+            tar.close()
+
+    index = {
+        'version': SHARD_INDEX_VERSION,
+        'dataset': dataset.metadata['name'],
+        'num_items': len(dataset),
+        'shards': shards,
+    }
+    with open(os.path.join(folder, SHARD_INDEX_FILE), 'w') as f:
+        yaml.dump(index, f, Dumper=Dumper)
+
+    return [os.path.join(folder, s['path']) for s in shards]
+
+
+class ShardedDataset(BaseDataset, IterableDataset):
+    """
+    Reads a dataset from a sharded archive written by :func:`write_shards`.
+    Items are returned just like by the dataset that was written (the output of
+    its ``process_item``, with this dataset's transforms applied), without
+    opening any of the original files.
+
+    Items can be read by index (``dataset[i]``), which seeks to the item in its
+    shard. Iterating over the dataset (which is what a DataLoader does, since this
+    is an ``IterableDataset``) instead reads the shards sequentially. Each
+    DataLoader worker reads its own subset of the shards (or, if there are fewer
+    shards than workers, its own subset of the items of every shard). If
+    ``shuffle_buffer`` is given, the order of the shards is shuffled every
+    epoch and items are drawn at random from a buffer of ``shuffle_buffer`` items
+    that is refilled as the shards are read.
+
+    Shards are kept open once read from. They are closed by :func:`close`, when
+    the dataset is garbage collected, or at the end of a ``with`` block:
+
+    .. code-block:: python
+
+        nussl.datasets.write_shards(nussl.datasets.WHAM(root), 'wham-shards/')
+
+        with nussl.datasets.ShardedDataset(
+                'wham-shards/', shuffle_buffer=1000, transform=tfm) as dataset:
+            dataloader = torch.utils.data.DataLoader(
+                dataset, batch_size=16, num_workers=4)
+            ...
+
+    Args:
+        folder (str): Folder containing the shards and ``shards.yml``.
+        shuffle_buffer (int, optional): Size of the shuffle buffer used when
+          iterating. If None, shards and items are read in order. Defaults to None.
+        seed (int, optional): Seed for shuffling. The order of each epoch is
+          determined by ``seed`` and the epoch (see :func:`set_epoch`). If None, a
+          random seed is used. Defaults to None.
+        kwargs: Keyword arguments to BaseDataset.
+    """
+    def __init__(self, folder, shuffle_buffer=None, seed=None, **kwargs):
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.epoch = 0
+        self._handles = {}
+        self._handles_pid = None
+        super().__init__(folder, **kwargs)
+        self.metadata['shuffle_buffer'] = shuffle_buffer
+        self.metadata['seed'] = seed
+
+    def get_items(self, folder):
+        index_path = os.path.join(folder, SHARD_INDEX_FILE)
+        if not os.path.exists(index_path):
+            raise DataSetException(
+                f"No {SHARD_INDEX_FILE} in {folder}! Write the shards with "
+                f"nussl.datasets.write_shards first.")
+        with open(index_path, 'r') as f:
+            index = yaml.load(f, Loader=Loader)
+
+        version = index.get('version', 1)
+        if version not in _INDEX_INFO_FIELDS:
+            raise DataSetException(
+                f"{index_path} has version {version}, but only versions "
+                f"{sorted(_INDEX_INFO_FIELDS)} can be read. Update nussl or write "
+                f"the shards again.")
+        fields = _INDEX_INFO_FIELDS[version]
+
+        self.shard_paths = [os.path.join(folder, s['path']) for s in index['shards']]
+        items = []
+        self._index_info = {}
+        for shard, s in enumerate(index['shards']):
+            for offset, size, *info in s['items']:
+                item = (shard, offset, size)
+                items.append(item)
+                self._index_info[item] = dict(zip(fields, info))
+        return items
+
+    def get_item_info(self, item):
+        info = self._index_info[item]
+        if len(info) < len(_INDEX_INFO_FIELDS[SHARD_INDEX_VERSION]):
+            # older indexes only have the duration, the rest is read from the item
+            info = {**super().get_item_info(item), **info}
+        return dict(info)
+
+    def get_item_duration(self, item):
+        return self._index_info[item]['duration']
+
+    def set_epoch(self, epoch):
+        """
+        Sets the epoch, which (along with ``seed``) determines how shards and items
+        are shuffled when iterating.
+
+        Args:
+            epoch (int): Current epoch.
+        """
+        self.epoch = epoch
+
+    def close(self):
+        """
+        Closes the shards opened by this dataset. They are opened again the next
+        time an item is read.
+        """
+        handles, self._handles = getattr(self, '_handles', {}), {}
+        for handle in handles.values():
+            handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def _get_handle(self, shard):
+        # handles inherited from the parent process share its file offsets, so
+        # DataLoader worker processes open their own
+        if self._handles_pid != os.getpid():
+            self.close()
+            self._handles_pid = os.getpid()
+        if shard not in self._handles:
+            self._handles[shard] = open(self.shard_paths[shard], 'rb')
+        return self._handles[shard]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_handles'] = {}
+        state['_handles_pid'] = None
+        return state
+
+    def _decode(self, value):
+        if isinstance(value, dict):
+            if value.get('__audio_signal__', False):
+                signal = self._load_audio_from_array(
+                    value['audio_data'], value['sample_rate'])
+                signal.path_to_input_file = value['path_to_input_file']
+                return signal
+            return {k: self._decode(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._decode(v) for v in value)
+        return value
+
+    def process_item(self, item):
+        shard, offset, size = item
+        handle = self._get_handle(shard)
+        handle.seek(offset)
+        return self._decode(pickle.loads(handle.read(size)))
+
+    def _worker_indices(self, rng):
+        shards = {}
+        for i, item in enumerate(self.items):
+            shards.setdefault(item[0], []).append(i)
+        shards = [shards[s] for s in sorted(shards)]
+        if rng is not None:
+            shards = [shards[i] for i in rng.permutation(len(shards))]
+
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is None:
+            return [i for indices in shards for i in indices]
+
+        worker_id, num_workers = worker_info.id, worker_info.num_workers
+        if len(shards) >= num_workers:
+            shards = shards[worker_id::num_workers]
+            return [i for indices in shards for i in indices]
+        return [i for indices in shards for i in indices[worker_id::num_workers]]
+
+    def __iter__(self):
+        rng = None
+        if self.shuffle_buffer:
+            seed = self.seed
+            if seed is None:
+                # every worker has to shuffle the shards the same way, so the
+                # base seed of the DataLoader (shared by all workers) is used
+                worker_info = torch.utils.data.get_worker_info()
+                seed = (
+                    np.random.SeedSequence().entropy if worker_info is None
+                    else worker_info.seed - worker_info.id)
+            rng = np.random.default_rng([seed, self.epoch])
+
+        buffer = []
+        for i in self._worker_indices(rng):
+            if rng is None:
+                yield self[i]
+                continue
+            buffer.append(self[i])
+            if len(buffer) >= self.shuffle_buffer:
+                j = rng.integers(len(buffer))
+                buffer[j], buffer[-1] = buffer[-1], buffer[j]
+                yield buffer.pop()
+        while buffer:
+            yield buffer.pop(rng.integers(len(buffer)))
@@ -0,0 +1,351 @@
+"""
+Dataset-wide statistics, computed in a single (optionally parallel) pass over a
+dataset, for normalizing the inputs of a model ahead of time. See
+:func:`compute_statistics`.
+"""
+import os
+
+import numpy as np
+import torch
+import tqdm
+import yaml
+try:
+    from yaml import CLoader as Loader, CDumper as Dumper
+except ImportError:
+    from yaml import Loader, Dumper
+
+from . import transforms as tfm
+from .base_dataset import _no_collate
+
+STATISTICS_FILE = 'statistics.yml'
+
+
+class RunningMoments(object):
+    """
+    Running count, mean and variance of a stream of values, along the first axis
+    of the values that are added (Welford's algorithm). Two sets of running moments
+    (e.g. computed by different workers) can be merged exactly with :func:`merge`.
+
+    Args:
+        count (int, optional): Number of values so far. Defaults to 0.
+        mean (np.ndarray or float, optional): Mean of the values so far. Defaults
+          to 0.
+        m2 (np.ndarray or float, optional): Sum of squared differences from the mean
+          of the values so far. Defaults to 0.
+    """
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.m2 = np.asarray(m2, dtype=np.float64)
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Makes running moments from an array of values, along its first axis.
+
+        Args:
+            values (np.ndarray): Values, with shape ``(n, ...)``.
+
+        Returns:
+            RunningMoments: Moments of ``values``.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        return cls(values.shape[0], mean, m2)
+
+    def update(self, values):
+        """
+        Adds an array of values (along its first axis) to the running moments.
+
+        Args:
+            values (np.ndarray): Values, with shape ``(n, ...)``.
+        """
+        self.merge(RunningMoments.from_values(values))
+
+    def merge(self, other):
+        """
+        Merges another set of running moments into this one, as if all of the
+        values of ``other`` had been added to this one.
+
+        Args:
+            other (RunningMoments): Moments to merge into this one.
+        """
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / count)
+        self.count = count
+
+    @property
+    def variance(self):
+        """Variance (population) of the values so far."""
+        if self.count == 0:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / self.count
+
+    @property
+    def std(self):
+        """Standard deviation (population) of the values so far."""
+        return np.sqrt(self.variance)
+
+    def to_dict(self):
+        return {
+            'count': int(self.count),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, moments):
+        return cls(moments['count'], moments['mean'], moments['m2'])
+
+
+class DatasetStatistics(object):
+    """
+    Statistics of a dataset, as computed by :func:`compute_statistics`:
+
+    - ``magnitude``: per-frequency moments of the (log) magnitude spectrogram of
+      the mixture (``mix_magnitude``), over every frame and channel of every item.
+    - ``loudness``: moments of the integrated loudness (LUFS) of each mixture.
+    - ``source_ratios``: moments of the energy of each source relative to the
+      energy of the mixture (in dB), for each source label (the part of the key
+      before ``'::'``).
+
+    Args:
+        magnitude (RunningMoments, optional): Moments of the magnitudes.
+        loudness (RunningMoments, optional): Moments of the loudness.
+        source_ratios (dict, optional): Moments of the energy ratio of each label.
+        to_db (bool, optional): Whether ``magnitude`` is of the magnitude in dB
+          (as made by ``ml.modules.AmplitudeToDB``). Defaults to True.
+    """
+    def __init__(self, magnitude=None, loudness=None, source_ratios=None, to_db=True):
+        self.magnitude = RunningMoments() if magnitude is None else magnitude
+        self.loudness = RunningMoments() if loudness is None else loudness
+        self.source_ratios = {} if source_ratios is None else source_ratios
+        self.to_db = to_db
+
+    def merge(self, other):
+        """
+        Merges the statistics of other items (e.g. computed by another worker)
+        into these.
+
+        Args:
+            other (DatasetStatistics): Statistics to merge into these.
+        """
+        self.magnitude.merge(other.magnitude)
+        self.loudness.merge(other.loudness)
+        for label, moments in other.source_ratios.items():
+            self.source_ratios.setdefault(label, RunningMoments()).merge(moments)
+
+    @property
+    def mean(self):
+        """Mean of the magnitudes over every frequency (float)."""
+        return float(self.magnitude.mean.mean())
+
+    @property
+    def variance(self):
+        """Variance of the magnitudes over every frequency (float)."""
+        per_frequency = self.magnitude.variance + self.magnitude.mean ** 2
+        return float(per_frequency.mean() - self.mean ** 2)
+
+    def load_into(self, module, layer='normalization'):
+        """
+        Loads the magnitude statistics into a normalization layer of a model, so
+        that it normalizes its input with the statistics of the dataset. Supported
+        layers are ``ml.modules.BatchNorm`` (its running mean and variance are set,
+        per frequency if it has one feature per frequency and over every
+        frequency otherwise) and ``ml.modules.ShiftAndScale`` (its shift and scale
+        are set to subtract the mean and divide by the standard deviation).
+
+        Note that a BatchNorm layer keeps updating its running statistics while
+        the model is in training mode, unless it was made with
+        ``track_running_stats=False`` or ``momentum=0``.
+
+        Args:
+            module (torch.nn.Module): Either the normalization layer, or a
+              ``SeparationModel`` that contains it.
+            layer (str, optional): Name of the normalization layer in the
+              ``SeparationModel``. Defaults to 'normalization'.
+
+        Raises:
+            ValueError: if the layer is not supported or its number of features
+              doesn't match the statistics.
+        """
+        # lazy load to keep `import nussl` fast
+        from ..ml.networks.modules import BatchNorm, ShiftAndScale
+
+        if hasattr(module, 'layers') and layer in module.layers:
+            module = module.layers[layer]
+
+        with torch.no_grad():
+            if isinstance(module, BatchNorm):
+                num_features = module.num_features
+                if num_features == 1:
+                    mean, variance = self.mean, self.variance
+                elif num_features == self.magnitude.mean.size:
+                    mean, variance = self.magnitude.mean, self.magnitude.variance
+                else:
+                    raise ValueError(
+                        f"BatchNorm has {num_features} features but the statistics "
+                        f"have {self.magnitude.mean.size} frequencies!")
+                batch_norm = module.batch_norm
+                batch_norm.running_mean.copy_(torch.as_tensor(mean))
+                batch_norm.running_var.copy_(torch.as_tensor(variance))
+            elif isinstance(module, ShiftAndScale):
+                std = np.sqrt(self.variance)
+                module.scale.fill_(1 / std)
+                module.shift.fill_(-self.mean / std)
+            else:
+                raise ValueError(
+                    f"Can't load statistics into {type(module).__name__}! Expected "
+                    f"BatchNorm or ShiftAndScale.")
+
+    def save(self, path):
+        """
+        Saves the statistics to a YAML file.
+
+        Args:
+            path (str): Path to save to.
+        """
+        statistics = {
+            'to_db': self.to_db,
+            'magnitude': self.magnitude.to_dict(),
+            'loudness': self.loudness.to_dict(),
+            'source_ratios': {
+                k: v.to_dict() for k, v in self.source_ratios.items()},
+        }
+        with open(path, 'w') as f:
+            yaml.dump(statistics, f, Dumper=Dumper)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads statistics saved with :func:`save`.
+
+        Args:
+            path (str): Path to load from.
+
+        Returns:
+            DatasetStatistics: The loaded statistics.
+        """
+        with open(path, 'r') as f:
+            statistics = yaml.load(f, Loader=Loader)
+        return cls(
+            magnitude=RunningMoments.from_dict(statistics['magnitude']),
+            loudness=RunningMoments.from_dict(statistics['loudness']),
+            source_ratios={
+                k: RunningMoments.from_dict(v)
+                for k, v in statistics['source_ratios'].items()
+            },
+            to_db=statistics['to_db'],
+        )
+
+
+def _energy(signal):
+    return float(np.sum(np.abs(signal.audio_data) ** 2))
+
+
+class _ItemStatistics(torch.utils.data.Dataset):
+    # statistics of each item, so that they can be computed by DataLoader workers
+    def __init__(self, dataset, to_db):
+        self.dataset = dataset
+        self.to_db = to_db
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, i):
+        data = self.dataset.process_item(self.dataset.items[i])
+        mix = data['mix']
+
+        # (nf, nt, nc) => (nt * nc, nf)
+        magnitude = np.abs(mix.stft())
+        magnitude = magnitude.reshape(magnitude.shape[0], -1).T
+        if self.to_db:
+            # same as ml.modules.AmplitudeToDB
+            magnitude = 20 * np.log10(np.maximum(magnitude, 1e-4))
+
+        loudness = RunningMoments()
+        if mix.signal_duration >= 0.4:
+            value = mix.loudness()
+            if np.isfinite(value):
+                loudness = RunningMoments.from_values([value])
+
+        source_ratios = {}
+        mix_energy = _energy(mix)
+        for key, source in data.get('sources', {}).items():
+            source_energy = _energy(source)
+            if mix_energy > 0 and source_energy > 0:
+                label = key.split('::')[0]
+                ratio = 10 * np.log10(source_energy / mix_energy)
+                source_ratios.setdefault(label, RunningMoments()).update([ratio])
+
+        return DatasetStatistics(
+            RunningMoments.from_values(magnitude), loudness, source_ratios, self.to_db)
+
+
+def _find_cache(transform):
+    transforms = (
+        transform.transforms if isinstance(transform, tfm.Compose) else [transform])
+    for t in transforms:
+        if isinstance(t, tfm.Cache):
+            return t
+    return None
+
+
+def compute_statistics(dataset, num_workers=0, to_db=True, path=None):
+    """
+    Computes statistics over every item of a dataset, in a single pass: the
+    per-frequency mean and variance of the (log) magnitude spectrogram of the
+    mixture, the loudness of the mixtures, and the energy of each source relative
+    to the mixture. Items are read with ``dataset.process_item`` (the transforms of
+    the dataset are not applied), with the STFT parameters of the dataset. The
+    statistics of each item are computed by ``num_workers`` DataLoader workers and
+    merged exactly (Welford's algorithm), so the result doesn't depend on the
+    number of workers.
+
+    The statistics are saved to ``path``. If ``path`` is None and the dataset has a
+    ``transforms.Cache``, they are saved next to the cached items, to
+    ``statistics.yml`` in the cache folder (clearing the cache also clears them).
+    Load them with ``DatasetStatistics.load`` and put them in a model with
+    ``DatasetStatistics.load_into``:
+
+    .. code-block:: python
+
+        stats = nussl.datasets.compute_statistics(dataset, num_workers=8)
+        model = nussl.ml.SeparationModel(
+            nussl.ml.networks.builders.build_recurrent_dpcl(...))
+        stats.load_into(model)
+
+    Args:
+        dataset (BaseDataset): Dataset to compute statistics of.
+        num_workers (int, optional): Number of worker processes. Defaults to 0
+          (items are processed in this process).
+        to_db (bool, optional): Whether to compute the statistics of the magnitude
+          spectrogram in dB, like ``ml.modules.AmplitudeToDB`` (which is the input
+          to the normalization layer of the models made by ``ml.networks.builders``).
+          Defaults to True.
+        path (str, optional): Path to save the statistics to. Defaults to None.
+
+    Returns:
+        DatasetStatistics: Statistics of the dataset.
+    """
+    dataloader = torch.utils.data.DataLoader(
+        _ItemStatistics(dataset, to_db), batch_size=None, num_workers=num_workers,
+        collate_fn=_no_collate)
+
+    statistics = DatasetStatistics(to_db=to_db)
+    for item_statistics in tqdm.tqdm(dataloader, desc='Computing statistics'):
+        statistics.merge(item_statistics)
+
+    if path is None:
+        cache = _find_cache(dataset.transform)
+        if cache is not None and os.path.isdir(cache.location):
+            path = os.path.join(cache.location, STATISTICS_FILE)
+    if path is not None:
+        statistics.save(path)
+
+    return statistics
@@ -1,13 +1,18 @@
 import os
+import json
+import time
 import shutil
 import logging
 import random
+import tracemalloc
+import multiprocessing.util
 from collections import OrderedDict
 
 import torch
 import zarr
 import numcodecs
 import numpy as np
+import scipy.signal
 from sklearn.preprocessing import OneHotEncoder
 try:
     from pretty_midi import PrettyMIDI
@@ -15,6 +20,8 @@ except ImportError:
     pass
 
 from .. import utils
+from .. import constants
+from .. import AudioSignal
 
 # This is for when you're running multiple
 # training threads
@@ -23,15 +30,66 @@ if hasattr(numcodecs, 'blosc'):
 
 
 def compute_ideal_binary_mask(source_magnitudes):
-    ibm = (
-            source_magnitudes == np.max(source_magnitudes, axis=-1, keepdims=True)
-    ).astype(float)
-
-    ibm = ibm / np.sum(ibm, axis=-1, keepdims=True)
-    ibm[ibm <= .5] = 0
+    is_max = source_magnitudes == np.max(source_magnitudes, axis=-1, keepdims=True)
+    # bins where several sources tie for the maximum are not assigned to any source
+    is_unique = np.sum(is_max, axis=-1, keepdims=True) == 1
+    ibm = np.logical_and(is_max, is_unique).astype(source_magnitudes.dtype)
     return ibm
 
 
+def compute_source_stfts(sources):
+    """
+    Computes the STFT of every AudioSignal in ``sources`` and returns them stacked in a
+    single complex array of shape ``(n_frequency_bins, n_hops, n_channels, n_sources)``.
+    If the sources share their length, number of channels, sample rate, STFTParams and
+    dtype (the usual case), their waveforms are stacked and all STFTs are computed in a
+    single vectorized call with ``scipy.signal.stft``, like ``AudioSignal.stft``. 
+    Otherwise, or if the STFT may be computed differently (``constants.USE_LIBROSA_STFT``
+    is set, or the sources override ``AudioSignal.stft``), each source is transformed 
+    with its own ``stft()`` and written into a preallocated buffer. Each source's ``stft_data`` is set to its slice of the
+    result, just like ``AudioSignal.stft()`` would.
+
+    Args:
+        sources (list): List of AudioSignal objects.
+
+    Returns:
+        np.ndarray: Complex valued STFTs of the sources, stacked along the last axis.
+    """
+    first = sources[0]
+    batchable = not constants.USE_LIBROSA_STFT and all(
+        type(s).stft is AudioSignal.stft and
+        s.signal_length == first.signal_length and
+        s.num_channels == first.num_channels and
+        s.sample_rate == first.sample_rate and
+        s.stft_params == first.stft_params and
+        s.dtype == first.dtype
+        for s in sources
+    )
+
+    if batchable:
+        stft_params = first.stft_params
+        window = first.get_window(stft_params.window_type, stft_params.window_length)
+        _, _, stft_data = scipy.signal.stft(
+            np.stack([s.audio_data for s in sources]), fs=first.sample_rate,
+            window=window, nperseg=stft_params.window_length,
+            noverlap=stft_params.window_length - stft_params.hop_length)
+        if first.dtype is not None:
+            stft_data = stft_data.astype(utils._complex_dtype(first.dtype), copy=False)
+        # (n_sources, n_channels, F, T) -> (F, T, n_channels, n_sources)
+        stft_data = stft_data.transpose((2, 3, 1, 0))
+        for i, s in enumerate(sources):
+            s.stft_data = stft_data[..., i]
+    else:
+        stft_data = None
+        for i, s in enumerate(sources):
+            _stft = s.stft()
+            if stft_data is None:
+                stft_data = np.empty(_stft.shape + (len(sources),), dtype=_stft.dtype)
+            stft_data[..., i] = _stft
+
+    return stft_data
+
+
 # Keys that correspond to the time-frequency representations after being passed through
 # the transforms here.
 time_frequency_keys = ['mix_magnitude', 'source_magnitudes', 'ideal_binary_mask', 'weights']
@@ -248,13 +306,9 @@ class MagnitudeSpectrumApproximation(object):
             sources[key] = _sources[key]
         data[self.source_key] = sources
 
-        source_magnitudes = []
-        for key in source_names:
-            s = sources[key]
-            s.stft()
-            source_magnitudes.append(s.magnitude_spectrogram_data)
-
-        source_magnitudes = np.stack(source_magnitudes, axis=-1)
+        source_stfts = compute_source_stfts([sources[k] for k in source_names])
+        source_magnitudes = np.empty(source_stfts.shape, dtype=source_stfts.real.dtype)
+        np.abs(source_stfts, out=source_magnitudes)
 
         data['ideal_binary_mask'] = compute_ideal_binary_mask(source_magnitudes)
         data['source_magnitudes'] = source_magnitudes
@@ -395,27 +449,19 @@ class PhaseSensitiveSpectrumApproximation(object):
             sources[key] = _sources[key]
         data[self.source_key] = sources
 
-        source_angles = []
-        source_magnitudes = []
-        for key in source_names:
-            s = sources[key]
-            _stft = s.stft()
-            source_magnitudes.append(np.abs(_stft))
-            source_angles.append(np.angle(_stft))
+        source_stfts = compute_source_stfts([sources[k] for k in source_names])
+        source_magnitudes = np.empty(source_stfts.shape, dtype=source_stfts.real.dtype)
+        np.abs(source_stfts, out=source_magnitudes)
+        phase_difference = np.angle(source_stfts)
+        phase_difference -= mix_angle[..., None]
 
-        source_magnitudes = np.stack(source_magnitudes, axis=-1)
-        source_angles = np.stack(source_angles, axis=-1)
         range_min = self.range_min
         range_max = self.range_max * mix_magnitude[..., None]
 
         # Section 3.1: https://arxiv.org/pdf/1909.08494.pdf
-        source_magnitudes = np.minimum(
-            np.maximum(
-                source_magnitudes * np.cos(source_angles - mix_angle[..., None]),
-                range_min
-            ),
-            range_max
-        )
+        source_magnitudes *= np.cos(phase_difference, out=phase_difference)
+        np.maximum(source_magnitudes, range_min, out=source_magnitudes)
+        np.minimum(source_magnitudes, range_max, out=source_magnitudes)
 
         data['ideal_binary_mask'] = compute_ideal_binary_mask(source_magnitudes)
         data['source_magnitudes'] = source_magnitudes
@@ -501,7 +547,8 @@ class GetExcerpt(object):
     is padded to the specified length. If it is longer, a random offset between
     ``(0, data_length - specified_length)`` is chosen. This function assumes that
     it is being passed data AFTER ToSeparationModel. Thus the time dimension is
-    on axis=1. 
+    on axis=1. To take the excerpt before the spectral transforms instead, see
+    :class:`GetAudioExcerpt` and ``Compose(..., excerpt_first=True)``.
     
     Args:
         excerpt_length (int): Specified length of transformed data in frames.
@@ -575,6 +622,103 @@ class GetExcerpt(object):
         return data
 
 
+class GetAudioExcerpt(object):
+    """
+    Time-domain counterpart of :class:`GetExcerpt`. Takes a dictionary containing
+    the mixture AudioSignal (``data[mix_key]``) and, optionally, a dictionary of source
+    AudioSignals (``data[source_key]``) and crops all of them to the region that will
+    produce an STFT of exactly ``excerpt_length`` frames. The crop starts on a hop
+    boundary chosen at random between frame ``0`` and frame 
+    ``n_frames - excerpt_length`` of the full STFT (the same offsets :class:`GetExcerpt`
+    chooses from), and the audio is zero-padded if it is too short.
+
+    Placing this transform *before* the spectral transforms (e.g.
+    :class:`PhaseSensitiveSpectrumApproximation`, :class:`ToSeparationModel`)
+    means only the excerpt is ever transformed, instead of computing the full-length
+    STFT and targets and then discarding most of it. The outputs have the same shapes
+    as with :class:`GetExcerpt` placed at the end of the pipeline. Interior frames are
+    identical to the matching frames of the full-length STFT. Only the first and last
+    frames differ, as they are computed against zero-padding instead of the
+    neighboring audio.
+
+    The crops are made with :func:`AudioSignal.make_region_view`, so no audio is
+    copied unless padding is needed. The STFTParams of the mixture are used for the 
+    frame computations.
+
+    Args:
+        excerpt_length (int): Specified length of transformed data in frames. The
+          excerpt, ``(excerpt_length - 1) * hop_length`` samples long, must be at least as
+          long as the STFT window.
+        mix_key (str, optional): The key to look for in data for the mixture AudioSignal. 
+          Defaults to 'mix'.
+        source_key (str, optional): The key to look for in the data containing the dict of
+          source AudioSignals. Defaults to 'sources'.
+    """
+
+    def __init__(self, excerpt_length, mix_key='mix', source_key='sources'):
+        if excerpt_length < 2:
+            raise TransformException("excerpt_length must be at least 2 frames!")
+        self.excerpt_length = excerpt_length
+        self.mix_key = mix_key
+        self.source_key = source_key
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}("
+            f"excerpt_length = {self.excerpt_length}, "
+            f"mix_key = {self.mix_key}, "
+            f"source_key = {self.source_key}"
+            f")"
+        )
+
+    @staticmethod
+    def _num_frames(signal_length, stft_params):
+        # number of frames AudioSignal.stft (scipy.signal.stft with zero boundaries
+        # and padding) produces for a signal of this length
+        window_length = stft_params.window_length
+        hop_length = stft_params.hop_length
+        padded_length = signal_length + 2 * (window_length // 2) - window_length
+        return -(-padded_length // hop_length) + 1
+
+    @staticmethod
+    def _crop(signal, start, end):
+        excerpt = signal.make_region_view(start, min(end, signal.signal_length))
+        if excerpt.signal_length < end - start:
+            excerpt.zero_pad(0, end - start - excerpt.signal_length)
+        return excerpt
+
+    def __call__(self, data):
+        if self.mix_key not in data:
+            raise TransformException(
+                f"Expected {self.mix_key} in dictionary "
+                f"passed to this Transform! Got {list(data.keys())}."
+            )
+
+        mixture = data[self.mix_key]
+        hop_length = mixture.stft_params.hop_length
+        if (self.excerpt_length - 1) * hop_length < mixture.stft_params.window_length:
+            raise TransformException(
+                f"An excerpt of {self.excerpt_length} frames is shorter than the STFT "
+                f"window ({mixture.stft_params})! Use GetExcerpt instead.")
+        num_frames = self._num_frames(mixture.signal_length, mixture.stft_params)
+
+        if num_frames >= self.excerpt_length:
+            offset = random.randint(0, num_frames - self.excerpt_length)
+        else:
+            offset = 0
+
+        start = offset * hop_length
+        end = start + (self.excerpt_length - 1) * hop_length
+
+        data[self.mix_key] = self._crop(mixture, start, end)
+        if self.source_key in data:
+            data[self.source_key] = type(data[self.source_key])(
+                (key, self._crop(signal, start, end))
+                for key, signal in data[self.source_key].items()
+            )
+        return data
+
+
 class Cache(object):
     """
     The Cache transform can be placed within a Compose transform. The data 
@@ -816,25 +960,306 @@ class ToPianoRool(object):
                 )
         return data
 
+class TransformProfiler(object):
+    """
+    Records where the time goes when making items: the wall time, the bytes 
+    allocated and the size of the output of every stage (``process_item``, each
+    transform in a :class:`Compose`, reading from a :class:`Cache`), aggregated 
+    across items. Pass it to :class:`Compose` or to a dataset (``profiler=...``), 
+    then look at :func:`table` or :func:`summary`, or log it to TensorBoard with
+    ``nussl.ml.train.add_tensorboard_handler(..., profiler=profiler)``.
+
+    When the dataset is loaded by DataLoader workers, each worker has its own copy
+    of the profiler. Give the profiler a ``folder`` and each process will write its 
+    statistics there every ``flush_every`` records, and once more when it exits; 
+    :func:`collect` merges them. Statistics left in ``folder`` by earlier runs are
+    deleted when the profiler is made.
+
+    .. code-block:: python
+
+        profiler = transforms.TransformProfiler(track_memory=True)
+        dataset = datasets.Scaper(folder, transform=tfm, profiler=profiler)
+        for i in range(10):
+            dataset[i]
+        print(profiler.table())
+
+    Args:
+        track_memory (bool, optional): Whether to record bytes allocated in each stage 
+          with ``tracemalloc``. This traces allocations made through Python (including
+          numpy arrays), but slows things down. Tracing is restarted at the start of
+          every stage, which clears anything else traced with ``tracemalloc``. 
+          Defaults to False.
+        folder (str, optional): Folder where each process writes its statistics so
+          that they can be aggregated across DataLoader workers. Defaults to None.
+        flush_every (int, optional): How many records to take between writes to
+          ``folder``. Defaults to 100.
+    """
+    FIELDS = ['time', 'allocated', 'output_bytes']
+
+    def __init__(self, track_memory=False, folder=None, flush_every=100):
+        self.track_memory = track_memory
+        self.folder = folder
+        self.flush_every = flush_every
+        self._flush_pid = None
+        self.reset()
+        if folder is not None and os.path.exists(folder):
+            for path in self._files():
+                os.remove(path)
+
+    def reset(self):
+        """Clears all of the recorded statistics."""
+        self.stats = OrderedDict()
+        self._num_records = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}("
+            f"track_memory = {self.track_memory}, "
+            f"folder = {self.folder}"
+            f")"
+        )
+
+    @staticmethod
+    def _nbytes(obj):
+        if isinstance(obj, np.ndarray):
+            return obj.nbytes
+        if torch.is_tensor(obj):
+            return obj.element_size() * obj.nelement()
+        if isinstance(obj, AudioSignal):
+            return sum(
+                x.nbytes for x in [obj.audio_data, obj.stft_data] if x is not None)
+        if isinstance(obj, dict):
+            return sum(TransformProfiler._nbytes(v) for v in obj.values())
+        if isinstance(obj, (list, tuple)):
+            return sum(TransformProfiler._nbytes(v) for v in obj)
+        return 0
+
+    def profile(self, name, func, *args, **kwargs):
+        """
+        Calls ``func(*args, **kwargs)`` and records its statistics under ``name``.
+
+        Args:
+            name (str): Name of the stage.
+            func (callable): Stage to run.
+
+        Returns:
+            The output of ``func``.
+        """
+        if self.track_memory:
+            # restarting tracing resets the peak to what the stage allocates
+            # (tracemalloc.reset_peak needs Python 3.9)
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        output = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        allocated = 0
+        if self.track_memory:
+            allocated = tracemalloc.get_traced_memory()[1]
+
+        self.record(name, elapsed, allocated, self._nbytes(output))
+        return output
+
+    def record(self, name, elapsed, allocated=0, output_bytes=0):
+        """
+        Adds one observation of a stage.
+
+        Args:
+            name (str): Name of the stage.
+            elapsed (float): Wall time taken, in seconds.
+            allocated (int, optional): Peak bytes allocated. Defaults to 0.
+            output_bytes (int, optional): Size of the output in bytes. Defaults to 0.
+        """
+        if name not in self.stats:
+            self.stats[name] = {'count': 0, **{f: 0 for f in self.FIELDS}}
+        stage = self.stats[name]
+        stage['count'] += 1
+        stage['time'] += elapsed
+        stage['allocated'] += allocated
+        stage['output_bytes'] += output_bytes
+
+        self._num_records += 1
+        if self.folder is not None:
+            if self._flush_pid != os.getpid():
+                # also written when this process (e.g. a DataLoader worker) exits, 
+                # so that the records since the last write aren't lost
+                self._flush_pid = os.getpid()
+                multiprocessing.util.Finalize(None, self.dump, exitpriority=0)
+            if self._num_records % self.flush_every == 0:
+                self.dump()
+
+    def merge(self, stats):
+        """
+        Adds the statistics of another profiler (or its ``stats`` dictionary) to
+        this one.
+        """
+        stats = stats.stats if isinstance(stats, TransformProfiler) else stats
+        for name, other in stats.items():
+            if name not in self.stats:
+                self.stats[name] = {'count': 0, **{f: 0 for f in self.FIELDS}}
+            for key in other:
+                self.stats[name][key] += other[key]
+        return self
+
+    def _path(self, pid=None):
+        pid = os.getpid() if pid is None else pid
+        return os.path.join(self.folder, f'transform_profile_{pid}.json')
+
+    def _files(self):
+        return [
+            os.path.join(self.folder, path) for path in sorted(os.listdir(self.folder))
+            if path.startswith('transform_profile_') and path.endswith('.json')
+        ]
+
+    def dump(self):
+        """
+        Writes the statistics of this process to ``folder``.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self._path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.stats, f)
+        os.replace(tmp_path, self._path())
+
+    def collect(self):
+        """
+        Aggregates the statistics of this process with those written to ``folder`` by
+        other processes (e.g. DataLoader workers).
+
+        Returns:
+            TransformProfiler: A new profiler containing the aggregated statistics.
+        """
+        collected = TransformProfiler(track_memory=self.track_memory)
+        collected.merge(self)
+        if self.folder is None or not os.path.exists(self.folder):
+            return collected
+
+        for path in self._files():
+            if path == self._path():
+                continue
+            with open(path, 'r') as f:
+                collected.merge(json.load(f, object_pairs_hook=OrderedDict))
+        return collected
+
+    def summary(self):
+        """
+        Per-stage summary of the statistics.
+
+        Returns:
+            OrderedDict: For every stage, the number of calls, the total and mean time 
+            (seconds), the mean bytes allocated and the mean output size (bytes).
+        """
+        summary = OrderedDict()
+        for name, stage in self.stats.items():
+            count = max(stage['count'], 1)
+            summary[name] = {
+                'count': stage['count'],
+                'total_time': stage['time'],
+                'mean_time': stage['time'] / count,
+                'mean_allocated': stage['allocated'] / count,
+                'mean_output_bytes': stage['output_bytes'] / count,
+            }
+        return summary
+
+    def table(self):
+        """
+        Formats :func:`summary` as a table.
+
+        Returns:
+            str: The table.
+        """
+        total_time = sum(stage['time'] for stage in self.stats.values()) or 1.0
+        width = max([len(name) for name in self.stats] + [5])
+        lines = [
+            f"{'stage':<{width}}  {'calls':>7}  {'mean (ms)':>10}  {'total (s)':>10}  "
+            f"{'% time':>7}  {'alloc (MB)':>11}  {'output (MB)':>11}"
+        ]
+        lines.append('-' * len(lines[0]))
+        for name, stage in self.summary().items():
+            lines.append(
+                f"{name:<{width}}  {stage['count']:>7d}  "
+                f"{stage['mean_time'] * 1e3:>10.3f}  {stage['total_time']:>10.3f}  "
+                f"{100 * stage['total_time'] / total_time:>7.1f}  "
+                f"{stage['mean_allocated'] / 1e6:>11.3f}  "
+                f"{stage['mean_output_bytes'] / 1e6:>11.3f}"
+            )
+        return '\n'.join(lines)
+
+
 class Compose(object):
     """Composes several transforms together. Inspired by torchvision implementation.
 
+    If ``excerpt_first`` is True and the transforms end in a :class:`GetExcerpt` on the
+    default time-frequency keys, that :class:`GetExcerpt` is replaced by an equivalent 
+    :class:`GetAudioExcerpt` at the start of the pipeline, so that the spectral 
+    transforms only ever see the excerpt. The outputs have the same shapes. This is 
+    not done if a :class:`Cache` comes before the :class:`GetExcerpt`, as the cache 
+    would then hold random excerpts instead of full items, or if the pipeline has a
+    :class:`GetAudio`, as its outputs (which the :class:`GetExcerpt` doesn't crop) 
+    would then be cropped too.
+
     Args:
         transforms (list of ``Transform`` objects): list of transforms to compose.
+        excerpt_first (bool, optional): Whether to move the excerpt stage to the
+          time domain, ahead of the other transforms. Defaults to False.
+        profiler (TransformProfiler, optional): If given, the time, memory and output
+          size of each transform are recorded in it. Defaults to None.
 
     Example:
         >>> transforms.Compose([
         >>>     transforms.MagnitudeSpectrumApproximation(),
         >>>     transforms.ToSeparationModel(),
-        >>> ])
+        >>>     transforms.GetExcerpt(400),
+        >>> ], excerpt_first=True)
     """
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, excerpt_first=False, profiler=None):
+        self.excerpt_first = excerpt_first
+        if excerpt_first:
+            transforms = self._move_excerpt_first(transforms)
         self.transforms = transforms
+        self.profiler = profiler
 
-    def __call__(self, data):
-        for t in self.transforms:
-            data = t(data)
+    @staticmethod
+    def _move_excerpt_first(transforms):
+        transforms = list(transforms)
+        if not transforms or not isinstance(transforms[-1], GetExcerpt):
+            return transforms
+
+        excerpt = transforms[-1]
+        if excerpt.time_frequency_keys != time_frequency_keys:
+            return transforms
+        # a cache would hold random excerpts instead of full items, and GetAudio 
+        # outputs would be cropped too, which the GetExcerpt doesn't do
+        if any(isinstance(t, (Cache, GetAudio)) for t in transforms):
+            return transforms
+
+        return [GetAudioExcerpt(excerpt.excerpt_length)] + transforms[:-1]
+
+    @property
+    def stage_names(self):
+        """
+        Names under which each transform is recorded by a :class:`TransformProfiler`:
+        the class name, numbered if the same transform appears more than once.
+        """
+        names = [t.__class__.__name__ for t in self.transforms]
+        return [
+            name if names.count(name) == 1 else f"{name}_{names[:i].count(name)}"
+            for i, name in enumerate(names)
+        ]
+
+    def __call__(self, data, profiler=None):
+        profiler = self.profiler if profiler is None else profiler
+        stage_names = self.stage_names if profiler is not None else None
+
+        for i, t in enumerate(self.transforms):
+            if profiler is not None:
+                data = profiler.profile(stage_names[i], t, data)
+            else:
+                data = t(data)
             if not isinstance(data, dict):
                 raise TransformException(
                     "The output of every transform must be a dictionary!")
@@ -25,13 +25,15 @@ Scale invariant BSSEval
 
 .. autofunction:: nussl.evaluation.scale_bss_eval
 
-BSSEvalV4 (museval)
--------------------
+BSSEvalV4
+---------
 
 .. autoclass:: nussl.evaluation.BSSEvalV4
     :members:
     :autosummary:
 
+.. autofunction:: nussl.evaluation.bss_eval_v4
+
 Precision and recall on masks
 -----------------------------
 
@@ -39,15 +41,39 @@ Precision and recall on masks
     :members:
     :autosummary:
 
+.. autofunction:: nussl.evaluation.mask_counts
+
 Aggregators
 -----------
 
 .. autofunction:: nussl.evaluation.aggregate_score_files
 
+.. autofunction:: nussl.evaluation.aggregate_columns
+
+Evaluation cache
+----------------
+
+.. autoclass:: nussl.evaluation.EvaluationCache
+    :members:
+    :autosummary:
+
+.. autofunction:: nussl.evaluation.evaluation_key
+
+Score storage
+-------------
+
+.. autoclass:: nussl.evaluation.ScoreStore
+    :members:
+    :autosummary:
+
 
 """
 
-from .report_card import aggregate_score_files, report_card, associate_metrics
+from .report_card import (
+    aggregate_score_files, aggregate_columns, report_card, associate_metrics, 
+    ScoreStore)
+from .evaluation_cache import EvaluationCache, evaluation_key
 from .evaluation_base import EvaluationBase
-from .bss_eval import BSSEvaluationBase, BSSEvalV4, BSSEvalScale, scale_bss_eval
-from .precision_recall_fscore import PrecisionRecallFScore
+from .bss_eval import (
+    BSSEvaluationBase, BSSEvalV4, BSSEvalScale, scale_bss_eval, bss_eval_v4)
+from .precision_recall_fscore import PrecisionRecallFScore, mask_counts
@@ -1,8 +1,19 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import product
+
 import numpy as np
-import museval
 
 from .evaluation_base import EvaluationBase
 
+BSS_EVAL_V4_KEYS = ['SDR', 'ISR', 'SIR', 'SAR']
+# maximum size of the spectra of the windows of the references that are
+# projected at once by bss_eval_v4
+MAX_WINDOW_BATCH_BYTES = 2 ** 28
+# size of the FFTs of the segments that correlations between long signals are
+# computed on
+SEGMENT_FFT_SIZE = 2 ** 16
+
 
 def _scale_bss_eval(references, estimate, idx, compute_sir_sar=True):
     """
@@ -121,6 +132,484 @@ def scale_bss_eval(references, estimate, mixture, idx,
     )
 
 
+def _framing(window, hop, length):
+    """
+    Windows of a signal of length ``length``, the same as the ones of
+    ``museval.metrics.Framing``.
+    """
+    if window < length:
+        num_windows = int(np.floor((length - window + hop) / hop))
+    else:
+        num_windows = 1
+
+    windows = []
+    for t in range(num_windows):
+        start = t * hop
+        if np.isnan(start) or np.isinf(start):
+            start = 0
+        stop = min(t * hop + window, length)
+        if np.isnan(stop) or np.isinf(stop):
+            stop = length
+        windows.append(slice(int(np.floor(start)), int(np.floor(stop))))
+    return windows
+
+
+@contextmanager
+def _segment_map(num_workers=0):
+    """
+    Context manager that gives a ``map`` function to evaluate segments of
+    signals with. If ``num_workers > 0``, the segments are evaluated by a pool of
+    ``num_workers`` processes, and by this process otherwise.
+
+    Args:
+        num_workers (int, optional): Number of worker processes. Defaults to 0.
+
+    Yields:
+        callable: A function like the builtin ``map``.
+    """
+    if not num_workers:
+        yield map
+        return
+    with ProcessPoolExecutor(num_workers) as executor:
+        yield executor.map
+
+
+def _split(values, num_chunks):
+    """Splits a list of values into at most ``num_chunks`` contiguous chunks."""
+    num_chunks = max(1, min(num_chunks, len(values)))
+    return [list(c) for c in np.array_split(np.arange(len(values)), num_chunks)
+            if len(c)]
+
+
+def _silent(sources):
+    """Whether each source (along the first axis) of (n_sources, n_channels, 
+    n_samples) is all zeros, after summing its channels."""
+    return np.all(sources.sum(axis=1) == 0, axis=-1)
+
+
+def _n_fft(length):
+    return int(2 ** np.ceil(np.log2(length)))
+
+
+def _safe_db(num, den):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = 10 * np.log10(num / np.where(den == 0, 1, den))
+    return np.where(den == 0, np.inf, ratio)
+
+
+def _energy(signal):
+    return np.sum(signal ** 2, axis=(-2, -1))
+
+
+def _solve(gram, correlations):
+    eps = np.finfo(float).eps
+    try:
+        return np.linalg.solve(gram + eps * np.eye(gram.shape[0]), correlations)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(gram, correlations, rcond=None)[0]
+
+
+def _segment_correlations(x, y, filters_len, n_fft):
+    """
+    Correlations ``sum_t x[p, t + k] y[q, t]`` at lags ``k`` from 
+    ``-(filters_len - 1)`` to ``filters_len - 1``, for signals ``y`` of shape
+    (Q, n_samples) and ``x`` of shape (P, n_samples + 2 * (filters_len - 1)),
+    with ``filters_len - 1`` samples of context on both sides. The signals are
+    cut into segments that are correlated with FFTs of size ``n_fft``.
+    """
+    L = filters_len
+    segment = n_fft - 2 * (L - 1)
+    correlations = np.zeros((x.shape[0], y.shape[0], 2 * L - 1))
+    for start in range(0, y.shape[-1], segment):
+        x_spectra = np.fft.rfft(x[:, start:start + segment + 2 * (L - 1)], n=n_fft)
+        y_spectra = np.conj(np.fft.rfft(y[:, start:start + segment], n=n_fft))
+        correlation = np.fft.irfft(
+            x_spectra[:, None] * y_spectra[None], n=n_fft)
+        correlations += correlation[..., :2 * L - 1]
+    return correlations
+
+
+def _correlations(references, estimates, filters_len, map_fn=map, num_tasks=1):
+    """
+    Gram matrix of the delayed versions (from 0 to ``filters_len - 1`` samples)
+    of every channel of every reference, of shape (n_sources * n_channels *
+    filters_len,) * 2, and the correlations of the delayed references with every
+    channel of every estimate, of shape (n_sources * n_channels * filters_len, 
+    n_estimates * n_channels). Both only need small lags of the correlations of
+    the signals, so these are computed on short segments (in parallel with 
+    ``map_fn``) and summed, instead of with FFTs of the length of the signals.
+    """
+    L = filters_len
+    n_samples = references.shape[-1]
+    x = references.reshape(-1, n_samples)
+    y = np.concatenate([x, estimates.reshape(-1, n_samples)])
+    padding = np.zeros((x.shape[0], L - 1))
+    x = np.concatenate([padding, x, padding], axis=-1)
+
+    n_fft = min(
+        max(SEGMENT_FFT_SIZE, _n_fft(8 * L)), _n_fft(n_samples + 2 * (L - 1)))
+    segment = n_fft - 2 * (L - 1)
+    starts = list(range(0, n_samples, segment))
+    chunks = [
+        (starts[c[0]], min(starts[c[-1]] + segment, n_samples))
+        for c in _split(starts, num_tasks)
+    ]
+    correlations = sum(map_fn(
+        _segment_correlations,
+        [x[:, start:stop + 2 * (L - 1)] for start, stop in chunks],
+        [y[:, start:stop] for start, stop in chunks],
+        [L] * len(chunks), [n_fft] * len(chunks)))
+
+    # correlations[p, q, k + L - 1] = sum_t x_p[t + k] y_q[t]
+    K = x.shape[0]
+    lags = np.arange(L)[None, :] - np.arange(L)[:, None] + L - 1
+    gram = correlations[:, :K][..., lags]
+    gram = gram.transpose(0, 2, 1, 3).reshape(K * L, K * L)
+    estimate_correlations = correlations[:, K:, L - 1 - np.arange(L)]
+    estimate_correlations = estimate_correlations.transpose(0, 2, 1).reshape(K * L, -1)
+    return gram, estimate_correlations
+
+
+def _distortion_filters(gram, correlations, n_channels, filters_len, needed, pairs):
+    """
+    Distortion filters of each estimate in ``needed`` onto all of the references
+    (``all_filters``) and onto the reference it is paired with in ``pairs``
+    (``pair_filters``), from the outputs of :func:`_correlations`.
+    """
+    shape = (-1, n_channels, filters_len, len(needed), n_channels)
+    solved = _solve(gram, correlations).reshape(shape)
+    all_filters = {e: solved[..., i, :] for i, e in enumerate(needed)}
+
+    pair_filters = {}
+    block = n_channels * filters_len
+    for j in sorted({j for j, _ in pairs}):
+        rows = slice(j * block, (j + 1) * block)
+        solved = _solve(gram[rows, rows], correlations[rows]).reshape(shape)
+        for i, e in enumerate(needed):
+            if (j, e) in pairs:
+                pair_filters[j, e] = solved[..., i, :]
+    return all_filters, pair_filters
+
+
+def _project(spectra, filters, n_fft, length):
+    """
+    Sum of the references filtered by the distortion filters, for a batch of 
+    windows of the references, given their spectra of shape (n_sources, batch,
+    n_channels, n_freq) and filters of shape (n_sources, n_channels, filters_len, 
+    n_channels).
+    """
+    n_sources, batch, n_channels = spectra.shape[:3]
+    projection = np.empty((batch, filters.shape[-1], length))
+    for c in range(filters.shape[-1]):
+        total = 0
+        for j, cj in product(range(n_sources), range(n_channels)):
+            total = total + spectra[j, :, cj] * np.fft.rfft(filters[j, cj, :, c], n=n_fft)
+        projection[:, c] = np.fft.irfft(total, n=n_fft)[:, :length]
+    return projection
+
+
+def _evaluate_windows(references, estimates, windows, window_length, all_filters,
+                      pair_filters, bsseval_sources_version):
+    """
+    Metrics of every pair in ``pair_filters`` for a batch of windows of the 
+    references (n_sources, n_channels, n_samples) and of the estimates in 
+    ``all_filters`` (in sorted order), as an array of shape (4, n_windows) for
+    each pair.
+    """
+    n_channels = references.shape[1]
+    filters_len = next(iter(all_filters.values())).shape[-2]
+    length = window_length + filters_len - 1
+    n_fft = _n_fft(length)
+
+    def _frames(signals):
+        frames = np.zeros((signals.shape[0], len(windows), n_channels, length))
+        for b, w in enumerate(windows):
+            frames[:, b, :, :w.stop - w.start] = signals[..., w]
+        return frames
+
+    references = _frames(references)
+    spectra = np.fft.rfft(references, n=n_fft)
+    estimates = dict(zip(sorted(all_filters), _frames(estimates)))
+    projections = {
+        e: _project(spectra, filters, n_fft, length)
+        for e, filters in all_filters.items()
+    }
+
+    metrics = {}
+    for (j, e), filters in pair_filters.items():
+        reference, estimate = references[j], estimates[e]
+        projection = projections[e]
+        pair_projection = _project(spectra[j:j + 1], filters, n_fft, length)
+
+        if bsseval_sources_version:
+            pair_energy = _energy(pair_projection)
+            sdr = _safe_db(pair_energy, _energy(estimate - pair_projection))
+            isr = np.full(len(windows), np.nan)
+            sir = _safe_db(pair_energy, _energy(projection - pair_projection))
+        else:
+            reference_energy = _energy(reference)
+            sdr = _safe_db(reference_energy, _energy(estimate - reference))
+            isr = _safe_db(reference_energy, _energy(pair_projection - reference))
+            sir = _safe_db(
+                _energy(pair_projection), _energy(projection - pair_projection))
+        sar = _safe_db(_energy(projection), _energy(estimate - projection))
+        metrics[j, e] = np.stack([sdr, isr, sir, sar])
+    return metrics
+
+
+def _evaluate_framewise(references, estimates, needed, pairs, filters_len,
+                        bsseval_sources_version):
+    """Metrics of a window with distortion filters computed on the window."""
+    gram, correlations = _correlations(references, estimates, filters_len)
+    all_filters, pair_filters = _distortion_filters(
+        gram, correlations, references.shape[1], filters_len, needed, pairs)
+    window = slice(0, references.shape[-1])
+    return _evaluate_windows(
+        references, estimates, [window], references.shape[-1], all_filters, 
+        pair_filters, bsseval_sources_version)
+
+
+class _BSSEvalV4Track(object):
+    """
+    BSS Eval v4 metrics of every pair of a reference and an estimate, with
+    everything that only depends on the references (their Gram matrix, and the
+    spectra of their windows) computed once and shared by all of the pairs. 
+    Metrics are computed for the pairs given to :func:`compute`, and 
+    :func:`scores` gets the scores of a candidate from them.
+
+    Args:
+        references (np.ndarray): References, of shape (n_samples, n_channels,
+          n_sources).
+        estimates (np.ndarray): Estimates, of shape (n_samples, n_channels,
+          n_estimates).
+        window, hop, filters_len, framewise_filters, bsseval_sources_version: 
+          See :func:`bss_eval_v4`.
+        map_fn (callable, optional): ``map`` function (e.g. from 
+          :func:`_segment_map`) to evaluate segments of the track with. Defaults 
+          to the builtin ``map``.
+        num_tasks (int, optional): Number of tasks to split the segments into.
+          Defaults to 1.
+    """
+    def __init__(self, references, estimates, window=2 * 44100, hop=1.5 * 44100,
+                 filters_len=512, framewise_filters=False,
+                 bsseval_sources_version=False, map_fn=map, num_tasks=1):
+        # (n_samples, n_channels, n_sources) => (n_sources, n_channels, n_samples)
+        self.references = np.transpose(references, (2, 1, 0)).astype(np.float64)
+        self.estimates = np.transpose(estimates, (2, 1, 0)).astype(np.float64)
+        if self.references.shape[1:] != self.estimates.shape[1:]:
+            raise ValueError(
+                f"The references and estimates should have the same number of "
+                f"samples and channels, but got {references.shape} and "
+                f"{estimates.shape}!")
+        if _silent(self.references).any():
+            raise ValueError(
+                "All the reference sources should be non-silent (not all-zeros)!")
+        if _silent(self.estimates).any():
+            raise ValueError(
+                "All the estimated sources should be non-silent (not all-zeros)!")
+
+        self.filters_len = filters_len
+        self.framewise_filters = framewise_filters
+        self.bsseval_sources_version = bsseval_sources_version
+        self.map_fn = map_fn
+        self.num_tasks = num_tasks
+
+        n_samples = self.references.shape[-1]
+        self.windows = _framing(window, hop, n_samples)
+        self.window_length = max(w.stop - w.start for w in self.windows)
+        self.reference_silent = np.array([
+            _silent(self.references[..., w]).any() for w in self.windows])
+        self.estimate_silent = np.stack([
+            _silent(self.estimates[..., w]) for w in self.windows], axis=-1)
+        self.metrics = {}
+
+    def _batches(self, windows):
+        """Splits windows into batches that are evaluated at once."""
+        n_sources, n_channels = self.references.shape[:2]
+        n_freq = _n_fft(self.window_length + self.filters_len - 1) // 2 + 1
+        batch_size = max(
+            1, MAX_WINDOW_BATCH_BYTES // (16 * n_sources * n_channels * n_freq))
+        num_batches = max(
+            self.num_tasks, int(np.ceil(len(windows) / batch_size)))
+        return [[windows[i] for i in c] for c in _split(windows, num_batches)]
+
+    def _segment(self, windows, needed):
+        """The references and estimates around a batch of windows, along with
+        the windows relative to the start of the segment."""
+        start = self.windows[windows[0]].start
+        stop = max(self.windows[t].stop for t in windows)
+        segment = slice(start, stop)
+        windows = [
+            slice(self.windows[t].start - start, self.windows[t].stop - start)
+            for t in windows
+        ]
+        return (
+            self.references[..., segment], self.estimates[needed][..., segment],
+            windows
+        )
+
+    def compute(self, pairs):
+        """
+        Computes the metrics of pairs of a reference and an estimate.
+
+        Args:
+            pairs (iterable): Pairs of indices ``(reference, estimate)``. Pairs
+              whose metrics were already computed are skipped.
+        """
+        pairs = {tuple(p) for p in pairs if tuple(p) not in self.metrics}
+        if not pairs:
+            return
+        needed = sorted({e for _, e in pairs})
+        metrics = {p: np.full((4, len(self.windows)), np.nan) for p in pairs}
+
+        # metrics of windows where any of the references is silent are NaN
+        windows = [t for t, silent in enumerate(self.reference_silent) if not silent]
+
+        if self.framewise_filters:
+            segments = [self._segment([t], needed) for t in windows]
+            outputs = self.map_fn(
+                _evaluate_framewise,
+                [s[0] for s in segments], [s[1] for s in segments],
+                *zip(*[(needed, pairs, self.filters_len,
+                        self.bsseval_sources_version)] * len(segments)))
+            batches = [[t] for t in windows]
+        elif windows:
+            gram, correlations = _correlations(
+                self.references, self.estimates[needed], self.filters_len,
+                map_fn=self.map_fn, num_tasks=self.num_tasks)
+            all_filters, pair_filters = _distortion_filters(
+                gram, correlations, self.references.shape[1], self.filters_len,
+                needed, pairs)
+            del gram, correlations
+
+            batches = self._batches(windows)
+            segments = [self._segment(b, needed) for b in batches]
+            outputs = self.map_fn(
+                _evaluate_windows,
+                *zip(*[
+                    (references, estimates, _windows, self.window_length, 
+                     all_filters, pair_filters, self.bsseval_sources_version)
+                    for references, estimates, _windows in segments
+                ]))
+        else:
+            batches, outputs = [], []
+
+        for batch, output in zip(batches, outputs):
+            for pair, values in output.items():
+                metrics[pair][:, batch] = values
+
+        self.metrics.update(metrics)
+
+    def scores(self, order, combo):
+        """
+        Scores of a candidate, where reference ``order[i]`` is matched to estimate
+        ``combo[i]``. The metrics of windows where any of the references or any
+        of the estimates in ``combo`` is silent are NaN.
+
+        Args:
+            order (list): Order of the references.
+            combo (list): Indices of the estimates.
+
+        Returns:
+            list: One dictionary with the metrics of each window for each pair.
+        """
+        pairs = list(zip(order, combo))
+        self.compute(pairs)
+        silent = self.reference_silent | self.estimate_silent[list(combo)].any(axis=0)
+
+        scores = []
+        for pair in pairs:
+            values = self.metrics[pair].copy()
+            values[:, silent] = np.nan
+            scores.append({
+                key: values[i].tolist() for i, key in enumerate(BSS_EVAL_V4_KEYS)
+            })
+        return scores
+
+
+def bss_eval_v4(references, estimates, window=2 * 44100, hop=1.5 * 44100,
+                filters_len=512, framewise_filters=False,
+                bsseval_sources_version=False, num_workers=0):
+    """
+    BSS Eval v4 [1], as implemented by ``museval.metrics.bss_eval`` (with 
+    ``compute_permutation=False``). Computes, for each pair of a reference and
+    an estimate (``references[..., j]`` and ``estimates[..., j]``) and each window:
+
+    - SDR: Source-to-distortion ratio. Higher is better.
+    - ISR: Source image-to-spatial distortion ratio. Higher is better.
+    - SIR: Source-to-interference ratio. Higher is better.
+    - SAR: Source-to-artifact ratio. Higher is better.
+
+    The estimates are decomposed with time-invariant distortion filters that are
+    computed on the whole signals (or on each window, if ``framewise_filters``). 
+    Unlike museval, the Gram matrix of the references and the spectra of their
+    windows are computed once and shared by all of the estimates, the filters for
+    all of the estimates are computed with a single solve, and the projections are
+    computed in the frequency domain for batches of windows at a time. The 
+    correlations that the filters are computed from are summed over short 
+    segments of the signals, so that the segments (and then the batches of 
+    windows) can be evaluated by ``num_workers`` processes.
+
+    References:
+
+    [1] Liutkus, A., Stöter, F. R., & Ito, N. (2018). The 2018 signal separation 
+        evaluation campaign. In International Conference on Latent Variable 
+        Analysis and Signal Separation (pp. 293-305). Springer.
+
+    Args:
+        references (np.ndarray): References, of shape (n_samples, n_channels, 
+          n_sources).
+        estimates (np.ndarray): Estimates, of the same shape.
+        window (int, optional): Size of each window, in samples. Use ``np.inf`` to
+          compute the metrics on the whole signals. Defaults to 2 * 44100.
+        hop (int, optional): Hop between windows, in samples. Defaults to 
+          1.5 * 44100.
+        filters_len (int, optional): Length of the distortion filters. Defaults
+          to 512.
+        framewise_filters (bool, optional): Whether to compute the distortion 
+          filters on each window (as in BSS Eval v3). Defaults to False.
+        bsseval_sources_version (bool, optional): Whether to compute the metrics
+          of ``bss_eval_sources`` instead of ``bss_eval_images`` (ISR is then 
+          NaN). Defaults to False.
+        num_workers (int, optional): Number of worker processes. Defaults to 0
+          (everything is computed in this process).
+
+    Returns:
+        tuple: SDR, ISR, SIR, SAR, each of shape (n_sources, n_windows).
+    """
+    with _segment_map(num_workers) as map_fn:
+        track = _BSSEvalV4Track(
+            references, estimates, window=window, hop=hop, filters_len=filters_len,
+            framewise_filters=framewise_filters,
+            bsseval_sources_version=bsseval_sources_version, map_fn=map_fn,
+            num_tasks=max(1, 4 * num_workers))
+        indices = list(range(references.shape[-1]))
+        scores = track.scores(indices, indices)
+    return tuple(
+        np.array([score[key] for score in scores]) for key in BSS_EVAL_V4_KEYS)
+
+
+def _scale_bss_eval_windows(references, estimates, mixture, windows, compute_sir_sar,
+                            skip_silent=True):
+    """
+    Metrics of :func:`scale_bss_eval` for every estimate, window and channel, as 
+    an array of shape (n_sources, 12, n_windows, n_channels). If ``skip_silent``,
+    metrics of channels of windows where any of the references is silent are NaN.
+    """
+    n_channels, n_sources = references.shape[-2:]
+    metrics = np.full((n_sources, 12, len(windows), n_channels), np.nan)
+    for t, w in enumerate(windows):
+        for ch in range(n_channels):
+            _references = references[w, ch, :]
+            if skip_silent and np.any(np.all(_references == 0, axis=0)):
+                continue
+            for j in range(n_sources):
+                metrics[j, :, t, ch] = scale_bss_eval(
+                    _references, estimates[w, ch, j], mixture[w, ch], j,
+                    compute_sir_sar=compute_sir_sar)
+    return metrics
+
+
 class BSSEvaluationBase(EvaluationBase):
     """
     Base class for all evaluation classes that are based on BSSEval metrics. This 
@@ -152,16 +641,39 @@ class BSSEvaluationBase(EvaluationBase):
           scores dict. Defaults to False.
         best_permutation_key (str): Which metric to use to decide which permutation of 
           the sources was best.
+        num_workers (int): Number of worker processes that segments of the signals
+          (e.g. windows) are evaluated by, during :func:`evaluate`. Defaults to 0
+          (everything is evaluated in this process).
         **kwargs (dict): Any additional arguments are passed on to evaluate_helper.
     """
     # TODO: Populate score in evaluation_helper() using self.keys.
     keys = ['SDR', 'ISR', 'SIR', 'SAR']
     def __init__(self, true_sources_list, estimated_sources_list, source_labels=None,
-                 compute_permutation=False, best_permutation_key="SDR", **kwargs):
+                 compute_permutation=False, best_permutation_key="SDR", num_workers=0,
+                 **kwargs):
         super().__init__(true_sources_list, estimated_sources_list, source_labels=source_labels,
                          compute_permutation=compute_permutation,
                          best_permutation_key=best_permutation_key,
                          **kwargs)
+        self.num_workers = num_workers
+        self.map_fn = map
+
+    @property
+    def num_tasks(self):
+        """Number of tasks that segments of the signals are split into."""
+        return max(1, 4 * self.num_workers)
+
+    def evaluate(self):
+        """
+        Runs :func:`EvaluationBase.evaluate`, with a pool of ``num_workers``
+        processes (in ``self.map_fn``) that subclasses evaluate segments of the 
+        signals with.
+        """
+        with _segment_map(self.num_workers) as self.map_fn:
+            try:
+                return super().evaluate()
+            finally:
+                self.map_fn = map
 
     def preprocess(self):
         """
@@ -183,30 +695,40 @@ class BSSEvaluationBase(EvaluationBase):
 
 
 class BSSEvalV4(BSSEvaluationBase):
+    """
+    BSS Eval v4 metrics (SDR, ISR, SIR, SAR on windows of the signals), as
+    computed by ``museval`` for SiSEC 2018, with :func:`bss_eval_v4`. Any 
+    keyword arguments (e.g. ``window``, ``hop``, ``filters_len``) are passed on 
+    to it. When evaluating several candidates (with ``compute_permutation``), 
+    the metrics of every pair of a reference and an estimate are computed once,
+    in a single pass, and shared by all of the candidates. With ``num_workers``,
+    segments of the signals and batches of windows are evaluated in parallel.
+    """
+    def preprocess(self):
+        references, estimates = super().preprocess()
+        self._track = None
+        return references, estimates
+
+    def evaluate_candidate(self, references, estimates, combo, order):
+        if getattr(self, '_track', None) is None:
+            self._track = _BSSEvalV4Track(
+                references, estimates, map_fn=self.map_fn, num_tasks=self.num_tasks,
+                **self.eval_args)
+            combos, orderings = self.get_candidates()
+            self._track.compute({
+                pair for c in combos for o in orderings for pair in zip(o, c)})
+        return self._track.scores(order, combo)
+
     def evaluate_helper(self, references, estimates, **kwargs):
         """
-        Implements evaluation using museval.metrics.bss_eval
+        Implements evaluation using :func:`bss_eval_v4`, which matches
+        ``museval.metrics.bss_eval``.
         """
-        # museval expects shape=(nsrc, nsampl, nchan)
-        # we have (nsampl, nchan, nsrc)
-        # so let's massage the data so it matches before feeding it in
-
-        references = np.transpose(references, (2, 0, 1))
-        estimates = np.transpose(estimates, (2, 0, 1))
-
-        sdr, isr, sir, sar, _ = museval.metrics.bss_eval(
-            references, estimates, compute_permutation=False, **kwargs)
-
-        scores = []
-        for j in range(references.shape[0]):
-            score = {
-                'SDR': sdr[j].tolist(), 
-                'ISR': isr[j].tolist(), 
-                'SIR': sir[j].tolist(), 
-                'SAR': sar[j].tolist(),
-            }
-            scores.append(score)
-        return scores
+        track = _BSSEvalV4Track(
+            references, estimates, map_fn=self.map_fn, num_tasks=self.num_tasks,
+            **kwargs)
+        indices = list(range(references.shape[-1]))
+        return track.scores(indices, indices)
 
 
 class BSSEvalScale(BSSEvaluationBase):
@@ -218,11 +740,12 @@ class BSSEvalScale(BSSEvaluationBase):
         'MIX-SI-SDR', 'MIX-SD-SDR', 'MIX-SNR',
     ]
     def __init__(self, true_sources_list, estimated_sources_list, source_labels=None,
-                 compute_permutation=False, best_permutation_key="SI-SDR", **kwargs):
+                 compute_permutation=False, best_permutation_key="SI-SDR", num_workers=0,
+                 **kwargs):
         super().__init__(true_sources_list, estimated_sources_list, source_labels=source_labels,
                          compute_permutation=compute_permutation,
                          best_permutation_key=best_permutation_key,
-                         **kwargs)
+                         num_workers=num_workers, **kwargs)
 
     def preprocess(self):
         """
@@ -239,7 +762,8 @@ class BSSEvalScale(BSSEvaluationBase):
 
         return references, estimates
 
-    def evaluate_helper(self, references, estimates, compute_sir_sar=True):
+    def evaluate_helper(self, references, estimates, compute_sir_sar=True, window=None,
+                        hop=None):
         """
         Implements evaluation using new BSSEval metrics [1]. This computes every
         metric described in [1], including:
@@ -261,6 +785,16 @@ class BSSEvalScale(BSSEvaluationBase):
         - SNRi: Improvement in SNR over using the mixture as the estimate. Higher is
           better.
 
+        If ``window`` is given, the metrics are computed on windows of the
+        signals (of ``window`` samples, every ``hop`` samples), which are evaluated 
+        in parallel if ``num_workers > 0``. Each metric is then a list of the 
+        metrics of each channel of each window (window-major), which the
+        aggregators in :mod:`nussl.evaluation.report_card` aggregate like any 
+        other list. Windows where any of the references is silent in a channel 
+        have NaN metrics in that channel. Without ``window``, each metric is the 
+        list of the metrics of each channel of the whole signals, as computed by
+        :func:`scale_bss_eval`, even if a reference is silent.
+
         Note:
 
         If `compute_sir_sar = False`, then you'll get `np.nan` for SI-SIR and 
@@ -273,57 +807,31 @@ class BSSEvalScale(BSSEvaluationBase):
         International Conference on Acoustics, Speech and Signal 
         Processing (ICASSP) (pp. 626-630). IEEE.
         """
-
-        sisdr, sisir, sisar, sdsdr, snr, srr = [], [], [], [], [], []
-        sisdri, sdsdri, snri, mix_sisdr, mix_sdsdr, mix_snr = [], [], [], [], [], []
-        for j in range(references.shape[-1]):
-            cSISDR, cSISIR, cSISAR, cSDSDR, cSNR, cSRR = [], [], [], [], [], []
-            cSISDRi, cSDSDRi, cSNRi, cMIXSISDR, cMIXSDSDR, cMIXSNR = [], [], [], [], [], []
-            for ch in range(references.shape[-2]):
-                output = scale_bss_eval(
-                        references[..., ch, :], estimates[..., ch, j], 
-                        self.mixture[..., ch], j, compute_sir_sar=compute_sir_sar
-                    )
-                _SISDR, _SISIR, _SISAR, _SDSDR, _SNR, _SRR, = output[:6]
-                _SISDRi, _SDSDRi, _SNRi, _MIXSISDR, _MIXSDSDR, _MIXSNR = output[6:]
-            
-                cSISDR.append(_SISDR)
-                cSISIR.append(_SISIR)
-                cSISAR.append(_SISAR)
-                cSDSDR.append(_SDSDR)
-                cSNR.append(_SNR)
-                cSRR.append(_SRR)
-                cSISDRi.append(_SISDRi)
-                cSDSDRi.append(_SDSDRi)
-                cSNRi.append(_SNRi)
-                cMIXSISDR.append(_MIXSISDR) 
-                cMIXSDSDR.append(_MIXSDSDR)
-                cMIXSNR.append(_MIXSNR)
-
-            sisdr.append(cSISDR)
-            sisir.append(cSISIR)
-            sisar.append(cSISAR)
-
-            sdsdr.append(cSDSDR)
-            snr.append(cSNR)
-            srr.append(cSRR)
-
-            sisdri.append(cSISDRi)
-            sdsdri.append(cSDSDRi)
-            snri.append(cSNRi)
-
-            mix_sisdr.append(cMIXSISDR)
-            mix_sdsdr.append(cMIXSDSDR)
-            mix_snr.append(cMIXSNR)
+        n_samples = references.shape[0]
+        if window is None:
+            windows = [slice(0, n_samples)]
+        else:
+            windows = _framing(window, window if hop is None else hop, n_samples)
+
+        chunks = [[windows[t] for t in c] for c in _split(windows, self.num_tasks)]
+        segments = [slice(c[0].start, c[-1].stop) for c in chunks]
+        outputs = self.map_fn(
+            _scale_bss_eval_windows,
+            [references[s] for s in segments], [estimates[s] for s in segments],
+            [self.mixture[s] for s in segments],
+            [[slice(w.start - s.start, w.stop - s.start) for w in c]
+             for c, s in zip(chunks, segments)],
+            [compute_sir_sar] * len(chunks),
+            # silent references only make the metrics NaN in windowed mode
+            [window is not None] * len(chunks))
+        # (n_sources, n_metrics, n_windows, n_channels)
+        metrics = np.concatenate(list(outputs), axis=2)
 
         scores = []
         for j in range(references.shape[-1]):
             score = {
-                'SI-SDR': sisdr[j], 'SI-SIR': sisir[j], 'SI-SAR': sisar[j],
-                'SD-SDR': sdsdr[j], 'SNR': snr[j], 'SRR': srr[j], 
-                'SI-SDRi': sisdri[j], 'SD-SDRi': sdsdri[j], 'SNRi': snri[j],
-                'MIX-SI-SDR': mix_sisdr[j], 'MIX-SD-SDR': mix_sdsdr[j],
-                'MIX-SNR': mix_snr[j],
+                key: metrics[j, i].reshape(-1).tolist()
+                for i, key in enumerate(BSSEvalScale.keys)
             }
             scores.append(score)
         return scores
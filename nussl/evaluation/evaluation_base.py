@@ -4,6 +4,7 @@ import numpy as np
 
 from .. import AudioSignal
 from ..core import utils
+from .evaluation_cache import EvaluationCache, evaluation_key
 
 
 class EvaluationBase(object):
@@ -35,11 +36,16 @@ class EvaluationBase(object):
             scores dict. Defaults to False.
         best_permutation_key (str): Which metric to use to decide which permutation of 
             the sources was best.
+        cache (EvaluationCache or str): Cache (or the folder of a cache) of evaluation
+            results. If given, :func:`evaluate` returns the stored results when the 
+            same references and estimates were evaluated before with the same settings,
+            and stores the results otherwise. Defaults to None (no caching).
         **kwargs (dict): Any additional keyword arguments are passed on to ``evaluate_helper``.
     """
 
     def __init__(self, true_sources_list, estimated_sources_list, source_labels=None, 
-                 compute_permutation=False, best_permutation_key=None, **kwargs):
+                 compute_permutation=False, best_permutation_key=None, cache=None,
+                 **kwargs):
         self.true_sources_list = self._verify_input_list(true_sources_list)
         self.estimated_sources_list = self._verify_input_list(estimated_sources_list)
         self.keys = None
@@ -63,6 +69,9 @@ class EvaluationBase(object):
         self.num_channels = self.true_sources_list[0].num_channels
         self.compute_permutation = compute_permutation
         self.best_permutation_key = best_permutation_key
+        if isinstance(cache, str):
+            cache = EvaluationCache(cache)
+        self.cache = cache
 
     @staticmethod
     def _verify_input_list(audio_signal_list):
@@ -176,6 +185,28 @@ class EvaluationBase(object):
 
         raise NotImplementedError('Must implement evaluate_helper in a subclass!')
 
+    def evaluate_candidate(self, references, estimates, combo, order):
+        """
+        Evaluates a single candidate from :func:`get_candidates`, by calling
+        ``evaluate_helper`` on the references in the order given by ``order`` and
+        the estimates chosen by ``combo``. Subclasses can override this to share
+        computations between the candidates (e.g. everything that only depends
+        on the references).
+
+        Args:
+            references (np.ndarray): All of the references, with shape
+                (..., n_channels, n_sources).
+            estimates (np.ndarray): All of the estimates, with shape
+                (..., n_channels, n_estimates).
+            combo (list): Indices of the estimates in this candidate.
+            order (list): Order of the references in this candidate.
+
+        Returns:
+            A list of dictionaries, as returned by ``evaluate_helper``.
+        """
+        return self.evaluate_helper(
+            references[..., order], estimates[..., combo], **self.eval_args)
+
     def evaluate(self):
         """
         This function encapsulates the main functionality of all evaluation classes.
@@ -185,10 +216,15 @@ class EvaluationBase(object):
             1. Preprocesses the data somehow into numpy arrays that get passed into your
                evaluation function.
             2. Gets all possible candidates that will be evaluated in your evaluation function.
-            3. For each candidate, runs the evaluation function (must be implemented in subclass).
+            3. For each candidate, runs the evaluation function (must be implemented in
+               subclass) through :func:`evaluate_candidate`.
             4. Finds the results from the best candidate.
             5. Returns a dictionary containing those results.
 
+        If the evaluator has a ``cache``, the results are looked up in it by the hash
+        of the preprocessed data (see :func:`evaluation_key`) after step 1, and
+        steps 2-4 are skipped if they are found.
+
         Steps 1 and 3 must be implemented by the subclass while the others are implemented
         by EvaluationBase.
         
@@ -197,6 +233,14 @@ class EvaluationBase(object):
 
         """
         references, estimates = self.preprocess()
+        key = None
+        if self.cache is not None:
+            key = evaluation_key(self, references, estimates)
+            results = self.cache.get(key)
+            if results is not None:
+                self._scores = results
+                return results
+
         combos, orderings = self.get_candidates()
         
         best_permutation_key = self.best_permutation_key
@@ -204,10 +248,9 @@ class EvaluationBase(object):
         metrics = []
 
         for k, combo in enumerate(combos):
-            _estimates = estimates[..., combo]
             for o, order in enumerate(orderings):
-                _scores = self.evaluate_helper(
-                    references[..., order], _estimates, **self.eval_args)
+                _scores = self.evaluate_candidate(
+                    references, estimates, combo, order)
 
                 if not best_permutation_key or best_permutation_key not in _scores[0]:
                     best_permutation_key = sorted(_scores[0].keys())[0]
@@ -229,6 +272,8 @@ class EvaluationBase(object):
         for i, o in enumerate(order):
             results[self.source_labels[o]] = score[i]
         self._scores = results
+        if key is not None:
+            self.cache.set(key, results)
 
         return results
 
@@ -0,0 +1,176 @@
+"""
+Content-addressed cache of evaluation results. Evaluating a set of estimates
+against a set of references always gives the same scores, so the results of
+:func:`EvaluationBase.evaluate` can be stored on disk, keyed by a hash of the
+preprocessed references and estimates, and reused whenever the same signals are
+evaluated again with the same evaluator and arguments (e.g. when re-scoring
+oracle baselines that haven't changed).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+CACHE_FILE_EXTENSION = '.pkl'
+
+
+def _update_hash(hasher, array):
+    array = np.ascontiguousarray(array)
+    hasher.update(f'{array.dtype.str}{array.shape}'.encode())
+    hasher.update(memoryview(array).cast('B'))
+
+
+def evaluation_key(evaluator, references, estimates):
+    """
+    Key of the results of an evaluator on a set of preprocessed references and
+    estimates: a hash of the contents of both arrays, along with the class of the
+    evaluator, its source labels, whether it computes the permutation (and by
+    which metric) and the arguments it passes to ``evaluate_helper``.
+
+    Args:
+        evaluator (EvaluationBase): Evaluator that computes the results.
+        references (np.ndarray): References, as returned by ``evaluator.preprocess``.
+        estimates (np.ndarray): Estimates, as returned by ``evaluator.preprocess``.
+
+    Returns:
+        str: Hexadecimal key of the results.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    settings = (
+        type(evaluator).__module__,
+        type(evaluator).__qualname__,
+        list(evaluator.source_labels),
+        bool(evaluator.compute_permutation),
+        evaluator.best_permutation_key,
+        sorted((k, repr(v)) for k, v in evaluator.eval_args.items()),
+    )
+    hasher.update(repr(settings).encode())
+    _update_hash(hasher, references)
+    _update_hash(hasher, estimates)
+    return hasher.hexdigest()
+
+
+class EvaluationCache(object):
+    """
+    On-disk store of evaluation results, keyed by :func:`evaluation_key`. Pass one
+    (or the path to its folder) as ``cache`` to any evaluator, and
+    :func:`EvaluationBase.evaluate` will return the stored results when the same
+    signals were evaluated before with the same settings, instead of computing
+    them again:
+
+    .. code-block:: python
+
+        cache = nussl.evaluation.EvaluationCache('eval-cache/', max_size=2 ** 30)
+        evaluator = nussl.evaluation.BSSEvalScale(
+            sources, estimates, compute_permutation=True, cache=cache)
+        scores = evaluator.evaluate()
+
+    Each result is pickled to its own file in ``location``, which can be shared by
+    several processes. Once the files take up more than ``max_size`` bytes, the
+    least recently used ones (by modification time, which is updated whenever a
+    result is read) are deleted until they take up at most ``max_size`` bytes.
+
+    Args:
+        location (str): Folder to store the results in. Created if it doesn't exist.
+        max_size (int, optional): Maximum size of the cache, in bytes. If None, the
+          cache grows without bound. Defaults to 2 ** 30 (1 GiB).
+    """
+    def __init__(self, location, max_size=2 ** 30):
+        self.location = location
+        self.max_size = max_size
+        os.makedirs(location, exist_ok=True)
+        self._size = sum(os.path.getsize(p) for p in self._files())
+
+    def _files(self):
+        with os.scandir(self.location) as entries:
+            return [
+                e.path for e in entries
+                if e.is_file() and e.name.endswith(CACHE_FILE_EXTENSION)
+            ]
+
+    def _path(self, key):
+        return os.path.join(self.location, key + CACHE_FILE_EXTENSION)
+
+    def get(self, key):
+        """
+        Gets the results stored under a key.
+
+        Args:
+            key (str): Key of the results.
+
+        Returns:
+            dict: The results, or None if there are none for this key.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                results = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return results
+
+    def set(self, key, results):
+        """
+        Stores results under a key, evicting the least recently used results if the
+        cache grows past ``max_size``.
+
+        Args:
+            key (str): Key of the results.
+            results (dict): Results to store.
+        """
+        data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_size is not None and len(data) > self.max_size:
+            return
+        path = self._path(key)
+        # written to a temporary file first, so readers never see a partial result
+        handle, tmp_path = tempfile.mkstemp(dir=self.location, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+        if os.path.exists(path):
+            self._size -= os.path.getsize(path)
+        os.replace(tmp_path, path)
+        self._size += len(data)
+
+        if self.max_size is not None and self._size > self.max_size:
+            self.evict(self.max_size)
+
+    def evict(self, max_size):
+        """
+        Deletes the least recently used results until the cache takes up at most
+        ``max_size`` bytes.
+
+        Args:
+            max_size (int): Size to shrink the cache to, in bytes.
+        """
+        files = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        size = sum(f[1] for f in files)
+        for _, file_size, path in files:
+            if size <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= file_size
+        self._size = size
+
+    def clear(self):
+        """Deletes every result in the cache."""
+        self.evict(0)
+
+    def __len__(self):
+        return len(self._files())
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
@@ -1,9 +1,71 @@
-import sklearn
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 from . import EvaluationBase
 from ..core.masks import BinaryMask
 
+# exact counts with float32 products (for BLAS) up to this many entries
+MAX_FLOAT32_COUNT = 2 ** 24
+
+
+def mask_counts(references, estimates):
+    """
+    Counts the true positives, false positives, false negatives and true negatives
+    of every estimated binary mask against every reference mask, for each channel.
+    The true positives of all pairs are computed in a single matrix multiply
+    between the masks, and the rest follow from the number of positives in each
+    mask.
+
+    The masks are multiplied as float32 (float64 past ``MAX_FLOAT32_COUNT`` 
+    entries, where float32 sums would no longer be exact) rather than counted on 
+    packed bits: numpy has no vectorized popcount for ``np.packbits`` output 
+    (before ``np.bitwise_count`` in numpy 2), so counting ``packed_reference & 
+    packed_estimate`` would take a lookup table over a Python loop on every pair 
+    of masks, which is slower than one BLAS call for all of the pairs.
+
+    Args:
+        references (np.ndarray): Reference masks, with shape 
+          (n_entries, n_channels, n_sources).
+        estimates (np.ndarray): Estimated masks, with shape
+          (n_entries, n_channels, n_estimates).
+
+    Returns:
+        tuple: Arrays of true positives, false positives, false negatives and true
+        negatives, each with shape (n_channels, n_sources, n_estimates).
+    """
+    references = np.asarray(references).astype(bool)
+    estimates = np.asarray(estimates).astype(bool)
+    n_entries = references.shape[0]
+    dtype = np.float32 if n_entries <= MAX_FLOAT32_COUNT else np.float64
+
+    # (n_entries, n_channels, n_sources) => (n_channels, n_sources, n_entries)
+    _references = np.transpose(references, (1, 2, 0)).astype(dtype)
+    _estimates = np.transpose(estimates, (1, 0, 2)).astype(dtype)
+    tp = np.rint(_references @ _estimates).astype(np.int64)
+
+    positives = references.sum(axis=0, dtype=np.int64)[..., :, None]
+    predicted = estimates.sum(axis=0, dtype=np.int64)[..., None, :]
+    fp = predicted - tp
+    fn = positives - tp
+    tn = n_entries - tp - fp - fn
+    return tp, fp, fn, tn
+
+
+def _divide(numerator, denominator):
+    # like sklearn, a metric is 0 where its denominator is 0
+    return np.divide(
+        numerator, denominator, out=np.zeros(numerator.shape), 
+        where=denominator > 0)
+
+
+def _metrics(tp, fp, fn, tn):
+    return {
+        'Accuracy': _divide(tp + tn, tp + fp + fn + tn),
+        'Precision': _divide(tp, tp + fp),
+        'Recall': _divide(tp, tp + fn),
+        'F1-Score': _divide(2 * tp, 2 * tp + fp + fn),
+    }
+
 
 class PrecisionRecallFScore(EvaluationBase):
     """
@@ -16,8 +78,11 @@ class PrecisionRecallFScore(EvaluationBase):
     Notes:
         * ``PrecisionRecallFScore`` can only be run using :ref:`binary_mask` objects. The constructor expects a list of 
         :ref:`binary_mask` objects for both the ground truth sources and the estimated sources.
-        * ``PrecisionRecallFScore`` does not calculate the correct permutation of the estimated and ground truth sources;
-        they are expected to be in the correct order when they are passed into ``PrecisionRecallFScore``.
+        * The counts of every pair of reference and estimated mask are computed in one pass (see
+        :func:`mask_counts`). With ``compute_permutation=True``, the best permutation is then found 
+        by solving an assignment problem on the metric of every pair, instead of trying every 
+        ordering of the estimates. Otherwise, the estimates are expected to be in the same order
+        as the ground truth sources.
 
     Args:
         true_sources_mask_list (list): List of :ref:`binary_mask` objects representing the ground truth sources.
@@ -37,6 +102,7 @@ class PrecisionRecallFScore(EvaluationBase):
                          compute_permutation=compute_permutation,
                          best_permutation_key=best_permutation_key, **kwargs)
         self.keys = ['Precision', 'Recall', 'Accuracy', 'F1-Score']
+        self._pair_metrics = None
 
     @staticmethod
     def _verify_input_list(mask_list):
@@ -63,8 +129,37 @@ class PrecisionRecallFScore(EvaluationBase):
              for x in self.estimated_sources_list],
             axis=-1
         )
+        self._pair_metrics = _metrics(*mask_counts(references, estimates))
         return references, estimates
 
+    def get_candidates(self):
+        """
+        With ``compute_permutation=True``, returns the single candidate that 
+        maximizes the mean of ``best_permutation_key`` over the sources, found with
+        ``scipy.optimize.linear_sum_assignment`` on the metrics of every pair of
+        reference and estimate (computed by :func:`preprocess`). Otherwise, the same
+        as :func:`EvaluationBase.get_candidates`. Like in 
+        :func:`EvaluationBase.evaluate`, the first metric (in sorted order) is used 
+        if ``best_permutation_key`` is not one of the metrics.
+        """
+        num_sources = len(self.true_sources_list)
+        num_estimates = len(self.estimated_sources_list)
+        if (not self.compute_permutation or self._pair_metrics is None
+                or num_estimates < num_sources):
+            return super().get_candidates()
+
+        key = self.best_permutation_key
+        if not key or key not in self._pair_metrics:
+            key = sorted(self._pair_metrics)[0]
+        # mean over the channels for every (reference, estimate) pair
+        values = self._pair_metrics[key].mean(axis=0)
+        references, estimates = linear_sum_assignment(values, maximize=True)
+
+        pairs = sorted(zip(estimates.tolist(), references.tolist()))
+        combo = tuple(e for e, _ in pairs)
+        order = tuple(j for _, j in pairs)
+        return [combo], [order]
+
     def evaluate_helper(self, references, estimates, **kwargs):
         """
         Determines the precision, recall, f-score, and accuracy of each :ref:`binary_mask` object in 
@@ -91,24 +186,20 @@ class PrecisionRecallFScore(EvaluationBase):
             and ``estimated_sources_mask_list``.
 
         """
+        metrics = _metrics(*mask_counts(references, estimates))
         scores = []
         for j in range(references.shape[-1]):
-            ch_metrics = {
-                'Accuracy': [], 'Precision': [], 'Recall': [], 'F1-Score': []
-            }
-            for ch in range(references.shape[-2]):
-                ch_metrics['Accuracy'].append(sklearn.metrics.accuracy_score(
-                    references[..., ch, j], estimates[..., ch, j]
-                ))
-                ch_metrics['Precision'].append(sklearn.metrics.precision_score(
-                    references[..., ch, j], estimates[..., ch, j]
-                ))
-                ch_metrics['Recall'].append(sklearn.metrics.recall_score(
-                    references[..., ch, j], estimates[..., ch, j]
-                ))
-                ch_metrics['F1-Score'].append(sklearn.metrics.f1_score(
-                    references[..., ch, j], estimates[..., ch, j]
-                ))
-            scores.append(ch_metrics)
-
+            scores.append({k: v[:, j, j].tolist() for k, v in metrics.items()})
         return scores
+
+    def evaluate_candidate(self, references, estimates, combo, order):
+        """
+        Looks up the scores of a candidate in the metrics of every pair of
+        reference and estimate, which are computed once by :func:`preprocess`.
+        """
+        if self._pair_metrics is None:
+            return super().evaluate_candidate(references, estimates, combo, order)
+        return [
+            {k: v[:, j, e].tolist() for k, v in self._pair_metrics.items()}
+            for j, e in zip(order, combo)
+        ]
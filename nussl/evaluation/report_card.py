@@ -5,12 +5,124 @@ import numpy as np
 import os
 import textwrap
 import copy
+import numcodecs
+import zarr
+
+COLUMN_DTYPES = {
+    'source': np.int32,
+    'file': np.int32,
+    'metric': np.int32,
+    'window': np.int32,
+    'value': np.float64,
+}
 
 
 def truncate(values, decs=2):
     return np.trunc(values*10**decs)/(10**decs)
 
 
+EXCLUDED_KEYS = ['combination', 'permutation', 'metadata']
+# aggregators that have an equivalent (that also skips NaNs) in pandas groupby
+GROUPBY_AGGREGATORS = {
+    np.nanmedian: 'median',
+    np.nanmean: 'mean',
+    np.nanmin: 'min',
+    np.nanmax: 'max',
+}
+
+
+class _ScoreColumns(object):
+    """
+    Scores flattened into columns: one row per value of every metric of every
+    source in every file, with the source, file and metric of each row stored as
+    codes into lists of the sources, files and metrics (in the order they were
+    first seen), along with the index of the value in its list (``window``).
+    """
+    def __init__(self, sources=(), files=(), metrics=()):
+        self.categories = {
+            'source': list(sources), 'file': list(files), 'metric': list(metrics)}
+        self.codes = {
+            k: {v: i for i, v in enumerate(c)} for k, c in self.categories.items()}
+        self.rows = {k: [] for k in ['source', 'file', 'metric', 'window', 'value']}
+
+    def _code(self, column, value):
+        codes = self.codes[column]
+        if value not in codes:
+            codes[value] = len(codes)
+            self.categories[column].append(value)
+        return codes[value]
+
+    def add(self, scores, file):
+        file = self._code('file', file)
+        for name, metrics in scores.items():
+            if name in EXCLUDED_KEYS:
+                continue
+            source = self._code('source', name)
+            for key, values in metrics.items():
+                values = np.atleast_1d(np.asarray(values, dtype=float))
+                n = len(values)
+                self.rows['source'].append(np.full(n, source, dtype=np.int32))
+                self.rows['file'].append(np.full(n, file, dtype=np.int32))
+                self.rows['metric'].append(
+                    np.full(n, self._code('metric', key), dtype=np.int32))
+                self.rows['window'].append(np.arange(n, dtype=np.int32))
+                self.rows['value'].append(values)
+
+    def columns(self):
+        return {
+            k: np.concatenate(v) if v else np.zeros(0, dtype=COLUMN_DTYPES[k])
+            for k, v in self.rows.items()
+        }
+
+
+def aggregate_columns(columns, sources, files, metrics, aggregator=np.nanmedian):
+    """
+    Aggregates scores stored as columns (see :class:`ScoreStore`) into the same 
+    Pandas dataframe as :func:`aggregate_score_files`: one row per source and 
+    file, with the values of each metric aggregated with ``aggregator``. The 
+    values are grouped with ``pandas.Series.groupby``, so common aggregators
+    (``np.nanmedian``, ``np.nanmean``, ``np.nanmin``, ``np.nanmax``) are 
+    computed in a single vectorized pass over the columns.
+
+    Args:
+        columns (dict): Arrays ``source``, ``file`` and ``metric`` (codes into 
+          ``sources``, ``files`` and ``metrics``) and ``value``.
+        sources (list): Names of the sources.
+        files (list): Names of the files.
+        metrics (list): Names of the metrics.
+        aggregator (callable, optional): How to aggregate results within a 
+          single track. Defaults to np.nanmedian.
+
+    Returns:
+        pd.DataFrame: Pandas dataframe containing the aggregated metrics.
+    """
+    n_files, n_metrics = len(files), len(metrics)
+    keys = (
+        columns['source'].astype(np.int64) * n_files + columns['file']
+    ) * n_metrics + columns['metric']
+
+    grouped = pd.Series(columns['value']).groupby(keys, sort=True)
+    if aggregator in GROUPBY_AGGREGATORS:
+        aggregated = grouped.agg(GROUPBY_AGGREGATORS[aggregator])
+    else:
+        aggregated = grouped.agg(lambda x: aggregator(x.values))
+
+    # one row per (source, file), one column per metric
+    keys = aggregated.index.values
+    rows, row_index = np.unique(keys // n_metrics, return_inverse=True)
+    metric_codes = np.unique(keys % n_metrics)
+    values = np.full((len(rows), n_metrics), np.nan)
+    values[row_index, keys % n_metrics] = aggregated.values
+
+    df = pd.DataFrame({
+        'source': np.array(sources, dtype=object)[rows // n_files],
+        'file': np.array(files, dtype=object)[rows % n_files],
+    })
+    for m in metric_codes:
+        df[metrics[m]] = values[:, m]
+    return df
+
+
 def aggregate_score_files(json_files, aggregator=np.nanmedian):
     """
     Takes a list of json files output by an Evaluation method in nussl
@@ -36,6 +148,10 @@ def aggregate_score_files(json_files, aggregator=np.nanmedian):
                random0.json  -2.440166  -1.884026   6.760966
                oracle1.json  12.409913  16.248470  14.725983
                random1.json   1.609577   1.958037  12.738970
+
+    To aggregate many score files (or to add them as they are written), add them
+    to a :class:`ScoreStore` instead, which keeps the scores in columns on disk
+    so that each file is only read once.
     
     Args:
         json_files (list): List of JSON files that will be parsed for metrics.
@@ -45,27 +161,182 @@ def aggregate_score_files(json_files, aggregator=np.nanmedian):
     Returns:
         pd.DataFrame: Pandas dataframe containing the aggregated metrics.
     """
-    metrics = {}
+    columns = _ScoreColumns()
     for json_file in json_files:
         with open(json_file, 'r') as f:
             data = json.load(f)
-        json_key = os.path.basename(json_file)
-        for name in data:
-            if name not in ['combination', 'permutation', 'metadata']:
-                if name not in metrics:
-                    metrics[name] = {}
-                if json_key not in metrics[name]:
-                    metrics[name][json_key] = {}
-                for key in data[name]:
-                    _data = aggregator(data[name][key])
-                    metrics[name][json_key][key] = _data
-    
-    df = pd.concat({
-        k: pd.DataFrame(v).T for k, v in metrics.items()
-    }, axis=0, names=['source', 'file'])
-    df.reset_index(inplace=True) 
-    
-    return df
+        columns.add(data, os.path.basename(json_file))
+    return aggregate_columns(
+        columns.columns(), aggregator=aggregator, **{
+            k + 's': v for k, v in columns.categories.items()})
+
+
+class ScoreStore(object):
+    """
+    Evaluation results stored as columns in a ``zarr`` group on disk, with one 
+    row per value of every metric of every source in every scored file. The 
+    columns are:
+
+    - ``source``: which source (e.g. ``vocals``) the value is for,
+    - ``file``: which file (e.g. the name of the JSON score file, or the name of
+      the track) the value is from,
+    - ``metric``: which metric (e.g. ``SI-SDR``) the value is,
+    - ``window``: index of the value in the list of values of the metric (e.g. 
+      the window for ``BSSEvalV4``, or the channel for ``BSSEvalScale``),
+    - ``value``: the value itself.
+
+    ``source``, ``file`` and ``metric`` are stored as integer codes into 
+    :attr:`sources`, :attr:`files` and :attr:`metrics`. Scores can be added 
+    as soon as each file has been evaluated (with :func:`add`), or from score 
+    files that were written to disk (with :func:`add_score_files`, which skips
+    files that are already in the store, so it can be called again as more
+    files are written). The store is aggregated (with :func:`to_frame`)
+    directly from the columns, without reading any of the score files again:
+
+    .. code-block:: python
+
+        store = nussl.evaluation.ScoreStore('scores.zarr')
+        for item in test_dataset:
+            ...
+            scores = evaluator.evaluate()
+            store.add(scores, item['mix'].file_name)
+
+        print(nussl.evaluation.report_card(store))
+
+    Rows are only visible once they are committed (the counts of rows and files
+    are written after the rows), so a store that was interrupted while adding 
+    scores can still be opened. Scores should only be added by one process at 
+    a time.
+
+    Args:
+        location (str): Path to the zarr group. Created if it does not exist.
+        chunk_size (int, optional): Number of rows in each chunk of the columns.
+          Defaults to 2 ** 14.
+    """
+    def __init__(self, location, chunk_size=2 ** 14):
+        self.location = location
+        self.group = zarr.open_group(location, mode='a')
+        for k, dtype in COLUMN_DTYPES.items():
+            if k not in self.group:
+                self.group.zeros(k, shape=(0,), chunks=(chunk_size,), dtype=dtype)
+        if 'files' not in self.group:
+            self.group.create_dataset(
+                'files', shape=(0,), chunks=(chunk_size,), dtype=object, 
+                object_codec=numcodecs.VLenUTF8())
+        if 'num_rows' not in self.group.attrs:
+            self.group.attrs.update({
+                'num_rows': 0, 'num_files': 0, 'sources': [], 'metrics': []})
+
+        # drop anything that was written after the last commit
+        attrs = self.group.attrs.asdict()
+        for k in COLUMN_DTYPES:
+            if self.group[k].shape[0] != attrs['num_rows']:
+                self.group[k].resize(attrs['num_rows'])
+        if self.group['files'].shape[0] != attrs['num_files']:
+            self.group['files'].resize(attrs['num_files'])
+
+        self.sources = list(attrs['sources'])
+        self.metrics = list(attrs['metrics'])
+        self.files = list(self.group['files'][:])
+        self._file_codes = {f: i for i, f in enumerate(self.files)}
+
+    def __len__(self):
+        return self.group.attrs['num_rows']
+
+    def __contains__(self, file):
+        return file in self._file_codes
+
+    def _append(self, columns):
+        new_files = columns.categories['file'][len(self.files):]
+        if not new_files:
+            return 0
+        for k, values in columns.columns().items():
+            self.group[k].append(values)
+        self.group['files'].append(np.array(new_files, dtype=object))
+
+        self.sources = columns.categories['source']
+        self.metrics = columns.categories['metric']
+        self.files = columns.categories['file']
+        self._file_codes = columns.codes['file']
+        self.group.attrs.update({
+            'num_rows': int(self.group['value'].shape[0]),
+            'num_files': len(self.files),
+            'sources': self.sources,
+            'metrics': self.metrics,
+        })
+        return len(new_files)
+
+    def _columns(self):
+        return _ScoreColumns(self.sources, self.files, self.metrics)
+
+    def add(self, scores, file):
+        """
+        Adds the scores of a file to the store, unless the file is already in 
+        the store.
+
+        Args:
+            scores (dict): Scores, as output by an Evaluation method in nussl (or
+              loaded from a JSON file it was saved to).
+            file (str): Name of the file that was scored.
+
+        Returns:
+            bool: Whether the scores were added.
+        """
+        if file in self:
+            return False
+        columns = self._columns()
+        columns.add(scores, file)
+        return bool(self._append(columns))
+
+    def add_score_files(self, json_files):
+        """
+        Adds the scores in JSON files written by an Evaluation method in nussl,
+        under the base name of each file (like :func:`aggregate_score_files`).
+        Files that are already in the store are skipped, and all of the new
+        files are appended at once.
+
+        Args:
+            json_files (list): List of JSON files that will be parsed for metrics.
+
+        Returns:
+            int: Number of files that were added.
+        """
+        columns = self._columns()
+        for json_file in json_files:
+            file = os.path.basename(json_file)
+            if file in columns.codes['file']:
+                continue
+            with open(json_file, 'r') as f:
+                data = json.load(f)
+            columns.add(data, file)
+        return self._append(columns)
+
+    def columns(self):
+        """
+        Reads the columns of the store.
+
+        Returns:
+            dict: ``source``, ``file``, ``metric``, ``window`` and ``value`` 
+            arrays.
+        """
+        return {k: self.group[k][:] for k in COLUMN_DTYPES}
+
+    def to_frame(self, aggregator=np.nanmedian):
+        """
+        Aggregates the scores into the same Pandas dataframe as 
+        :func:`aggregate_score_files`, which can be passed to 
+        :func:`report_card`. See :func:`aggregate_columns`.
+
+        Args:
+            aggregator (callable, optional): How to aggregate results within a 
+              single file. Defaults to np.nanmedian.
+
+        Returns:
+            pd.DataFrame: Pandas dataframe containing the aggregated metrics.
+        """
+        return aggregate_columns(
+            self.columns(), self.sources, self.files, self.metrics, 
+            aggregator=aggregator)
 
 
 def _get_mean_and_std(df, decs=2):
@@ -80,11 +351,11 @@ def _get_mean_and_std(df, decs=2):
 
     means = [
         f'{truncate(m, decs=decs):{4+decs}.{decs}f}' 
-        for m in np.array(df.mean()).T
+        for m in np.array(df[metrics[1:]].mean()).T
     ]
     stds = [
         f'{truncate(s, decs=decs):{3+decs}.{decs}f}' 
-        for s in np.array(df.std()).T
+        for s in np.array(df[metrics[1:]].std()).T
     ]
     data = [f'{m} +/- {s}' for m, s in zip(means, stds)]
     data.insert(0, df.shape[0])
@@ -104,7 +375,7 @@ def _get_medians(df, decs=2):
 
     data = [
         f'{truncate(m, decs=decs):{4+decs}.{decs}f}' 
-        for m in np.array(df.median()).T
+        for m in np.array(df[metrics[1:]].median()).T
     ]
     data.insert(0, df.shape[0])
     return metrics, data
@@ -221,8 +492,9 @@ def report_card(df, notes=None, report_each_source=True, decimals=2):
         8000 Hz sample rate.
     
     Args:
-        df (pandas.DataFrame): DataFrame containing the metrics computed during
-          evaluation.
+        df (pandas.DataFrame or ScoreStore): DataFrame containing the metrics 
+          computed during evaluation, or a :class:`ScoreStore` (which is 
+          aggregated with ``ScoreStore.to_frame``).
         notes (str, optional): Any additional notes you want to be printed at the
           bottom of the report card. Defaults to None.
         report_each_source (bool, optional): Whether or not to report the metrics
@@ -232,6 +504,8 @@ def report_card(df, notes=None, report_each_source=True, decimals=2):
     Returns:
         str: A report card for your experiment.
     """
+    if isinstance(df, ScoreStore):
+        df = df.to_frame()
     mean_report_card = _get_report_card(
         df, _get_mean_and_std, report_each_source=report_each_source, decs=decimals)
     median_report_card = _get_report_card(
@@ -269,14 +543,16 @@ def associate_metrics(separation_model, df, test_dataset):
     Args:
         separation_model (SeparationModel): A separation object that will have the metrics
             associated with it.
-        df (pandas.DataFrame): DataFrame containing the metrics computed during
-            evaluation.
+        df (pandas.DataFrame or ScoreStore): DataFrame containing the metrics computed 
+            during evaluation, or a :class:`ScoreStore`.
         test_dataset (BaseDataset): A dataset object used for the evaluation of the
             metrics.
 
     Returns:
         (SeparationBase)
     """
+    if isinstance(df, ScoreStore):
+        df = df.to_frame()
     excluded_columns = ['source', 'file']
     metrics = [x for x in list(df.columns) if x not in excluded_columns]
     results = {
@@ -110,6 +110,9 @@ class InstanceNorm(nn.Module):
     Returns:
         torch.Tensor: modified input data tensor with instance norm applied.
     """
+    # can't process a sequence in pieces, as it normalizes over time
+    streamable = False
+
 
     def __init__(self, num_features=1, feature_dim=2, **kwargs):
         super(InstanceNorm, self).__init__()
@@ -152,6 +155,9 @@ class GroupNorm(nn.Module):
     Returns:
         torch.Tensor: modified input data tensor with instance norm applied.
     """
+    # can't process a sequence in pieces, as it normalizes over time
+    streamable = False
+
 
     def __init__(self, num_features, num_groups=1, feature_dim=2, **kwargs):
         super().__init__()
@@ -232,6 +238,11 @@ class LayerNorm(nn.Module):
             data = data.transpose(-1, d).squeeze(-1)
         return data
 
+    @property
+    def streamable(self):
+        # a sequence can't be processed in pieces if it's normalized over time
+        return 1 not in self.feature_dims
+
 class MelProjection(nn.Module):
     """
     MelProjection takes as input a time-frequency representation (e.g. a spectrogram, or a mask) and outputs a mel
@@ -528,10 +539,17 @@ class RecurrentStack(nn.Module):
             doubles the hidden size.
         dropout: (float) Dropout between layers.
         rnn_type: (str) LSTM ('lstm') or GRU ('gru').
+
+    A unidirectional stack can also process a sequence in consecutive pieces 
+    (e.g. frame by frame, for online separation): after :func:`start_stream`, the
+    hidden state at the end of each call is carried over to the next call, so that
+    the outputs are the same as for the whole sequence at once.
     """
     def __init__(self, num_features, hidden_size, num_layers, bidirectional, dropout,
                  rnn_type='lstm', batch_first=True, init_forget=True):
         super(RecurrentStack, self).__init__()
+        self.streaming = False
+        self.state = None
         if rnn_type not in ['lstm', 'gru']:
             raise ValueError("rnn_type must be one of ['lstm', 'gru']!")
 
@@ -568,10 +586,43 @@ class RecurrentStack(nn.Module):
         """
         shape = data.shape
         data = data.reshape(shape[0], shape[1], -1)
-        self.rnn.flatten_parameters()
-        data = self.rnn(data)[0]
+        # dynamically quantized RNNs (see SeparationModel.quantize) have no
+        # flat weights
+        if hasattr(self.rnn, 'flatten_parameters'):
+            self.rnn.flatten_parameters()
+        if self.streaming:
+            data, state = self.rnn(data, self.state)
+            self.state = (
+                tuple(s.detach() for s in state) if isinstance(state, tuple)
+                else state.detach()
+            )
+        else:
+            data = self.rnn(data)[0]
         return data
 
+    @property
+    def streamable(self):
+        """Whether this stack can process a sequence in pieces (if it's unidirectional)."""
+        return not self.rnn.bidirectional
+
+    def start_stream(self):
+        """
+        Starts processing a sequence in pieces: from now on, the hidden state is 
+        carried over from each call to the next, starting from zeros.
+
+        Raises:
+            ValueError: if the stack is bidirectional.
+        """
+        if not self.streamable:
+            raise ValueError("A bidirectional RecurrentStack can't be streamed!")
+        self.streaming = True
+        self.state = None
+
+    def stop_stream(self):
+        """Stops carrying the hidden state over between calls, and clears it."""
+        self.streaming = False
+        self.state = None
+
 
 class ConvolutionalStack2D(nn.Module):
     """
@@ -604,6 +655,9 @@ class ConvolutionalStack2D(nn.Module):
     Raises:
         ValueError -- All the input lists must be the same length.
     """
+    # can't process a sequence in pieces, as its convolutions look ahead in time
+    streamable = False
+
     def __init__(self, in_channels, channels, dilations, filter_shapes, residuals,
                  batch_norm=True, use_checkpointing=False):
         for x in [dilations, filter_shapes, residuals]:
@@ -700,6 +754,10 @@ def _find_and_instantiate_module(module_name, module_args):
     return module
 
 class DualPathBlock(nn.Module):
+    # can't process a sequence in pieces, as it processes chunks of the
+    # sequence in both directions
+    streamable = False
+
     def __init__(self, n_features, hidden_size, 
                  intra_processor, inter_processor, 
                  **kwargs):
@@ -799,6 +857,10 @@ class DualPath(nn.Module):
           each layer. Defaults to False.
         kwargs: Keyword arguments to the layer class.
     """
+    # can't process a sequence in pieces, as it processes chunks of the
+    # sequence in both directions
+    streamable = False
+
     def __init__(self, num_layers, chunk_size, hop_size, in_features,
                  bottleneck_size, skip_connection=False, **kwargs):
         super().__init__()
@@ -1,3 +1,5 @@
+import warnings
+
 import nussl
 from torch import nn
 import torch
@@ -22,18 +24,20 @@ class FilterBank(nn.Module):
 
     - ``get_transform_filters``: This should produce a filter bank that can be
       applied to the audio signal, of shape ``(filter_length, num_filters)``. The
-      filter bank is applied by chunking the signal into overlapping segments
-      using ``nn.Unfold``, and performing a matrix multiplication of the chunks 
-      (after permuting the dimensions appropriately) with the filter bank.
+      filter bank is applied with a strided 1D convolution over the signal, 
+      which is the same as multiplying overlapping (windowed) segments of the
+      signal with the filter bank.
 
     - ``get_inverse_filters``: This should produce a filter bank that maps the
-      spectral representation back to the audio domain. This is done by first
-      permuting the dimensions of the spectral representations appropriately,
-      then matrix multiplying the spectral representation with the filter bank.
-      Finally, the signal is resynthesized via overlap-add using ``nn.Fold``.
+      spectral representation back to the audio domain, of shape 
+      ``(num_filters, filter_length)``. This is applied with a strided 1D
+      transposed convolution, which multiplies every frame with the filter bank
+      and resynthesizes the signal via overlap-add.
 
     Windowing is applied to the signal, according to ``window_type``, which
     can be any of the windows found in ``nussl.core.constants.ALL_WINDOWS``.
+    The window is folded into the convolution filters, which are cached (until
+    the filters change) if they don't require gradients.
 
     This can also be applied to multiple sources at once, if they are on the
     last axis after all of the feature dimensions. If the number of features
@@ -43,9 +47,28 @@ class FilterBank(nn.Module):
     to all of the sources. Before returning the data, the source dimension is 
     moved back to the last dimension.
 
+    A signal can also be processed in consecutive blocks of samples (e.g. for
+    online separation), after calling :func:`start_stream`. In the transform
+    direction, every frame that is complete is returned, and the remaining 
+    samples are kept for the next call. In the inverse direction, the frames are
+    overlap-added to what is left of the previous frames, and every sample that
+    no later frame overlaps is returned. The output is the same as for the whole
+    signal at once (except within ``filter_length // 2`` samples of its end, 
+    which are covered by more frames when streaming), but delayed: a sample is 
+    only returned once every frame that overlaps it is complete, which takes 
+    between ``filter_length - hop_length`` and ``filter_length - 1`` more samples 
+    (with no dilation). To get the end of the signal, give that many more samples
+    (e.g. zeros).
+
     In the forward pass, keyword arguments can also be passed through. These
-    keyword arguments get passed through to ``apply_filter`` and ``get_filters``,
-    in case these should be conditioned on something during the forward pass.
+    keyword arguments get passed through to ``get_filters``, in case these should
+    be conditioned on something during the forward pass.
+
+    Note:
+        ``apply_filter`` is deprecated and no longer called by ``transform`` or
+        ``inverse``, which apply the filters as a convolution. Subclasses that 
+        override it get a warning, and should override ``get_filters`` (or 
+        ``get_weight``, ``transform`` and ``inverse``) instead.
 
     Note:
         The output dimensionality may not always match what is given by 
@@ -62,7 +85,7 @@ class FilterBank(nn.Module):
             Defaults to None, half of filter_length.
         window_type (str, optional): Type of window to use. Defaults to 
             'sqrt_hann'.
-        dilation (int, optional): Dilation of nn.Unfold and nn.Fold. Could be
+        dilation (int, optional): Dilation of the convolutions. Could be
             useful for implementing dilated convolutional frontends. 
             Defaults to 1.
         direction (str, optional): In which direction to take the input data. 
@@ -95,6 +118,9 @@ class FilterBank(nn.Module):
         self.output_length = None
 
         self.register_buffer('window', self._get_window())
+        self._weight_cache = {}
+        self.streaming = False
+        self._reset_stream()
 
         self.transform_filters = self.get_transform_filters()
         self.inverse_filters = self.get_inverse_filters()
@@ -112,6 +138,15 @@ class FilterBank(nn.Module):
     def get_inverse_filters(self):
         raise NotImplementedError()
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'apply_filter' in cls.__dict__:
+            warnings.warn(
+                f"{cls.__name__} overrides FilterBank.apply_filter, which is "
+                f"deprecated and no longer called by transform or inverse. Override "
+                f"get_filters (or get_weight, transform and inverse) instead.",
+                FutureWarning, stacklevel=2)
+
     def get_filters(self):
         filters = (
             self.transform_filters
@@ -121,12 +156,134 @@ class FilterBank(nn.Module):
         return filters
     
     def apply_filter(self, data, **kwargs):
-        filters = self.get_filters(**kwargs)        
+        """
+        Deprecated: multiplies the windowed frames (or the spectral frames) in
+        ``data`` with the filters of the current direction, along dimension 2. 
+        ``transform`` and ``inverse`` no longer call this (see :func:`get_weight`).
+        """
+        warnings.warn(
+            "FilterBank.apply_filter is deprecated and no longer called by "
+            "transform or inverse.", FutureWarning, stacklevel=2)
+        filters = self.get_filters(**kwargs)
         data = data.transpose(-1, 2)
         data = data @ filters
         data = data.transpose(-1, 2)
-        return data   
-    
+        return data
+
+    def get_weight(self, **kwargs):
+        """
+        Gets the filters of the current direction as the weight of a 1D 
+        (transposed) convolution, of shape ``(num_filters, 1, filter_length)``,
+        with the window folded in. For the inverse, the filters are also scaled by
+        the sum of the window. The weight is cached if the filters don't require 
+        gradients, until the filters, the window or their device change.
+        """
+        filters = self.get_filters(**kwargs)
+        window = self.window.view(-1)
+        key = (
+            self.direction, filters.data_ptr(), filters._version,
+            window.data_ptr(), window._version, filters.device, filters.dtype
+        )
+        cacheable = not (filters.requires_grad or window.requires_grad)
+        cached_key, weight = self._weight_cache.get(self.direction, (None, None))
+        if cacheable and cached_key == key:
+            return weight
+
+        if self.direction == 'transform':
+            # (filter_length, num_filters) => (num_filters, 1, filter_length)
+            weight = (window.unsqueeze(-1) * filters).T.unsqueeze(1)
+        else:
+            # (num_filters, filter_length) => (num_filters, 1, filter_length)
+            weight = (filters * window * window.sum()).unsqueeze(1)
+        weight = weight.contiguous()
+
+        if cacheable:
+            self._weight_cache[self.direction] = (key, weight)
+        return weight
+
+    def _overlap_add_norm(self, num_frames, reference):
+        # overlap-add of the squared window, to normalize the resynthesis by
+        key = ('norm', num_frames, self.output_length, reference.device, 
+               reference.dtype, self.window.data_ptr(), self.window._version)
+        cached_key, norm = self._weight_cache.get('norm', (None, None))
+        if cached_key == key:
+            return norm
+
+        window = self.window.view(1, 1, -1).to(reference.dtype)
+        norm = nn.functional.conv_transpose1d(
+            reference.new_ones(1, 1, num_frames), window ** 2,
+            stride=self.hop_length, dilation=self.dilation)
+        norm = nn.functional.pad(norm, (0, self.output_length - norm.shape[-1]))
+        norm = torch.where(norm < 1e-10, torch.ones_like(norm), norm)
+        self._weight_cache['norm'] = (key, norm)
+        return norm
+
+    @property
+    def _span(self):
+        # number of samples in each frame
+        return self.dilation * (self.filter_length - 1) + 1
+
+    def _reset_stream(self):
+        self._stream_samples = None
+        self._stream_tail = None
+        self._stream_trim = self.filter_length // 2
+
+    def start_stream(self):
+        """
+        Starts processing a signal in consecutive blocks: from now on, samples and
+        frames are carried over from each call to the next (separately for each
+        direction).
+        """
+        self.streaming = True
+        self._reset_stream()
+
+    def stop_stream(self):
+        """Stops processing a signal in blocks, and clears what was carried over."""
+        self.streaming = False
+        self._reset_stream()
+
+    def _stream_frames(self, data):
+        # the samples left from the previous block (or the padding of the first 
+        # frame) followed by this block, up to the end of the last complete frame
+        if self._stream_samples is None:
+            padding = data.new_zeros(*data.shape[:-1], self.filter_length // 2)
+            data = torch.cat([padding, data], dim=-1)
+        else:
+            data = torch.cat([self._stream_samples, data], dim=-1)
+        num_frames = max(0, (data.shape[-1] - self._span) // self.hop_length + 1)
+        self._stream_samples = data[..., num_frames * self.hop_length:]
+        if num_frames == 0:
+            return data[..., :0]
+        return data[..., :(num_frames - 1) * self.hop_length + self._span]
+
+    def _stream_overlap_add(self, data, num_frames):
+        # adds what is left of the previous frames, and returns the samples that
+        # no later frame overlaps, normalized by the overlap-add of the window
+        window = self.window.view(1, 1, -1).to(data.dtype)
+        norm = nn.functional.conv_transpose1d(
+            data.new_ones(1, 1, num_frames), window ** 2,
+            stride=self.hop_length, dilation=self.dilation
+        ) if num_frames else data.new_zeros(1, 1, 0)
+
+        if self._stream_tail is not None:
+            tail, norm_tail = self._stream_tail
+            length = max(data.shape[-1], tail.shape[-1])
+            data = nn.functional.pad(data, (0, length - data.shape[-1]))
+            data = data + nn.functional.pad(tail, (0, length - tail.shape[-1]))
+            norm = nn.functional.pad(norm, (0, length - norm.shape[-1]))
+            norm = norm + nn.functional.pad(
+                norm_tail, (0, length - norm_tail.shape[-1]))
+
+        done = num_frames * self.hop_length
+        self._stream_tail = (data[..., done:], norm[..., done:])
+        data, norm = data[..., :done], norm[..., :done]
+        data = data / torch.where(norm < 1e-10, torch.ones_like(norm), norm)
+
+        # drop the padding of the first frame
+        trim = min(self._stream_trim, data.shape[-1])
+        self._stream_trim -= trim
+        return data[..., trim:]
+
     def transform(self, data, **kwargs):
         ndim = data.ndim
         if ndim > 3:
@@ -134,46 +291,41 @@ class FilterBank(nn.Module):
             # then fix it later
             num_sources = data.shape[-1]
             data = data.permute(0, -1, 1, 2)
-            data = data.reshape(-1, *data.shape[2:])
+            data = data.reshape(data.shape[0] * data.shape[1], *data.shape[2:])
 
-        self.original_length = data.shape[-1]
-        pad_extra = (
-            (-(data.shape[-1] - self.filter_length) % self.hop_length)
-            % self.filter_length
-        )
-        pad_tuple = (
-            self.filter_length // 2,
-            self.filter_length // 2 + pad_extra
-        )
-        data = nn.functional.pad(data, pad_tuple)
-        self.output_length = data.shape[-1]
+        if self.streaming:
+            data = self._stream_frames(data)
+        else:
+            self.original_length = data.shape[-1]
+            pad_extra = (
+                (-(data.shape[-1] - self.filter_length) % self.hop_length)
+                % self.filter_length
+            )
+            pad_tuple = (
+                self.filter_length // 2,
+                self.filter_length // 2 + pad_extra
+            )
+            data = nn.functional.pad(data, pad_tuple)
+            self.output_length = data.shape[-1]
         
         num_batch, num_audio_channels, num_samples = data.shape
 
-        unfold = nn.Unfold(
-            kernel_size=(1, self.filter_length), 
-            stride=(1, self.hop_length),
-            dilation=self.dilation,
-            padding=(0, 0)
-        )
-        data = data.reshape(
-            num_batch * num_audio_channels,
-            1, 1, num_samples
-        )
-        data = unfold(data)
-        data = data.view(
-            num_batch, num_audio_channels,
-            self.filter_length, -1
-        )
+        data = data.reshape(num_batch * num_audio_channels, 1, num_samples)
+        weight = self.get_weight(**kwargs)
+        if num_samples >= self._span:
+            data = nn.functional.conv1d(
+                data, weight, stride=self.hop_length, dilation=self.dilation)
+        else:
+            data = data.new_zeros(data.shape[0], weight.shape[0], 0)
+        # (batch, channels, features, frames) => (batch, frames, features, channels)
+        data = data.view(num_batch, num_audio_channels, *data.shape[1:])
         data = data.permute(0, 3, 2, 1)
-        data = data * self.window
-        data = self.apply_filter(data, **kwargs)
 
         if ndim > 3:
             # then we moved sources to the batch dimension
             # we need to move it back before returning
             data = data.reshape(
-                -1, num_sources, *data.shape[1:])
+                data.shape[0] // num_sources, num_sources, *data.shape[1:])
             data = data.permute(0, 2, 3, 4, 1)
         return data
     
@@ -184,46 +336,40 @@ class FilterBank(nn.Module):
             # then fix it later
             num_sources = data.shape[-1]
             data = data.permute(0, -1, 1, 2, 3)
-            data = data.reshape(-1, *data.shape[2:])
+            data = data.reshape(data.shape[0] * data.shape[1], *data.shape[2:])
         
-        data = self.apply_filter(data, **kwargs)
-
-        data *= self.window.sum()
-        data = data * self.window
-        
-        num_batch, sequence_length, num_features, num_audio_channels = (
+        num_batch, num_frames, num_features, num_audio_channels = (
             data.shape
         )
-        
+        # (batch, frames, features, channels) => (batch * channels, features, frames)
         data = data.permute(0, 3, 2, 1)
-        data = data.reshape(-1, data.shape[2], data.shape[3])
-
-        fold = nn.Fold(
-            (1, self.output_length),
-            kernel_size=(1, self.filter_length),
-            stride=(1, self.hop_length),
-            dilation=self.dilation,
-            padding=(0, 0),
-        )
-        norm = data.new_ones(data.shape)
-        norm *= self.window.view(1, -1, 1) ** 2
-        
-        data = fold(data)
-        norm = fold(norm)
-        norm[norm < 1e-10] = 1
-        data = data / norm
+        data = data.reshape(num_batch * num_audio_channels, num_features, num_frames)
+
+        weight = self.get_weight(**kwargs)
+        if num_frames > 0:
+            data = nn.functional.conv_transpose1d(
+                data, weight, stride=self.hop_length, dilation=self.dilation)
+        else:
+            data = data.new_zeros(data.shape[0], 1, 0)
 
-        data = data.reshape(num_batch, num_audio_channels, -1)
+        if self.streaming:
+            data = self._stream_overlap_add(data, num_frames)
+            data = data.reshape(num_batch, num_audio_channels, data.shape[-1])
+        else:
+            data = nn.functional.pad(data, (0, self.output_length - data.shape[-1]))
+            data = data / self._overlap_add_norm(num_frames, data)
+            data = data.reshape(num_batch, num_audio_channels, -1)
         
-        boundary = self.filter_length // 2
-        data = data[..., boundary:-boundary]
-        data = data[..., :self.original_length]
+            boundary = self.filter_length // 2
+            data = data[..., boundary:-boundary]
+            data = data[..., :self.original_length]
 
         if ndim > 4:
             # then we moved sources to the batch dimension
             # we need to move it back before returning
             data = data.reshape(
-                -1, num_sources, num_audio_channels, data.shape[-1])
+                data.shape[0] // num_sources, num_sources, num_audio_channels, 
+                data.shape[-1])
             data = data.permute(0, 2, 3, 1)
 
         return data
@@ -239,14 +385,15 @@ class FilterBank(nn.Module):
 
 class STFT(FilterBank):
     """
-    An implementation of STFT and iSTFT using nn.Unfold, nn.Fold, and matrix
-    multiplication with a Fourier basis.
+    An implementation of STFT and iSTFT using strided (transposed) 1D 
+    convolutions with a Fourier basis.
 
     The usual way to compute an STFT is to split the signal into overlapping
     chunks, multiply each chunk with a window function, and then 
     apply an FFT to each chunk individually. Here, instead of taking the 
     FFT with something like ``torch.fft``, we instead use the matrix
-    formulation of FFT. 
+    formulation of FFT, with the window folded into the Fourier basis, as the 
+    filters of a convolution. 
 
     To resynthesize the signal, we use inverse windowing and the pseudoinverse
     of the FFT matrix as our filterbank. We then use overlap/add and divide by
@@ -258,48 +405,44 @@ class STFT(FilterBank):
     half of this is what you would operate on (the magnitudes), while the
     second half you would keep around for reconstructing the signal later on.
     """
-    def apply_filter(self, data):
-        if self.direction == 'transform':
-            scale = torch.sqrt(1.0 / (self.window.sum() ** 2))
-            data = super().apply_filter(data)
-            data *= scale
-            
-            eps = 1e-8
-            cutoff = 1 + self.filter_length // 2
-            real_part = data[..., :cutoff, :]
-            imag_part = data[..., cutoff:, :]
-            real_part[real_part.abs() <= eps] = eps
-            imag_part[imag_part.abs() <= eps] = eps
-            
-            magnitude = torch.sqrt(
-                real_part ** 2 + imag_part ** 2)
-            phase = torch.atan2(imag_part, real_part)      
-            data = torch.cat([magnitude, phase], dim=2)
+    def transform(self, data, **kwargs):
+        data = super().transform(data, **kwargs)
+        data = data / self.window.sum()
 
-        elif self.direction == 'inverse':
-            cutoff = 1 + self.filter_length // 2
-            magnitude = data[..., :cutoff, :]
-            phase = data[..., cutoff:, :]
-            data = torch.cat(
-                [
-                    magnitude * torch.cos(phase), 
-                    magnitude * torch.sin(phase)
-                ],
-                dim=2
-            )
-            data = super().apply_filter(data)
-            
-        return data
+        eps = 1e-8
+        cutoff = 1 + self.filter_length // 2
+        real_part = data[:, :, :cutoff]
+        imag_part = data[:, :, cutoff:]
+        real_part = torch.where(
+            real_part.abs() <= eps, torch.full_like(real_part, eps), real_part)
+        imag_part = torch.where(
+            imag_part.abs() <= eps, torch.full_like(imag_part, eps), imag_part)
+
+        magnitude = torch.sqrt(
+            real_part ** 2 + imag_part ** 2)
+        phase = torch.atan2(imag_part, real_part)      
+        return torch.cat([magnitude, phase], dim=2)
+
+    def inverse(self, data, **kwargs):
+        cutoff = 1 + self.filter_length // 2
+        magnitude = data[:, :, :cutoff]
+        phase = data[:, :, cutoff:]
+        data = torch.cat(
+            [
+                magnitude * torch.cos(phase), 
+                magnitude * torch.sin(phase)
+            ],
+            dim=2
+        )
+        return super().inverse(data, **kwargs)
     
     def _get_fft_basis(self):
-        fourier_basis = torch.rfft(
-            torch.eye(self.filter_length), 
-            1, onesided=True
+        fourier_basis = torch.fft.rfft(
+            torch.eye(self.filter_length, dtype=torch.float64), dim=-1
         )
-        cutoff = 1 + self.filter_length // 2
         fourier_basis = torch.cat([
-            fourier_basis[:, :cutoff, 0],
-            fourier_basis[:, :cutoff, 1]
+            fourier_basis.real,
+            fourier_basis.imag
         ], dim=1)
         return fourier_basis.float()
     
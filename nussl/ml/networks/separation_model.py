@@ -1,4 +1,5 @@
 import os
+import copy
 import json
 import inspect
 
@@ -9,6 +10,9 @@ import numpy as np
 from . import modules
 from ... import __version__
 
+# layers that are replaced by their dynamically quantized versions
+QUANTIZED_MODULES = {nn.LSTM, nn.GRU, nn.Linear}
+
 
 class SeparationModel(nn.Module):
     """
@@ -38,6 +42,32 @@ class SeparationModel(nn.Module):
             in `config`.
         output: (list)
 
+    Models whose modules only look at the past (e.g. a unidirectional
+    ``RecurrentStack``, with ``BatchNorm`` for normalization) can also separate a 
+    signal online, a piece at a time, with :func:`start_stream` and :func:`stream`.
+    Recurrent stacks carry their hidden state over from each piece to the next,
+    and filter banks (e.g. ``STFT``) turn blocks of samples into complete frames
+    and back. For a model that takes a spectrogram, stream the STFT outside of
+    the model:
+
+    .. code-block:: python
+
+        stft = nussl.ml.networks.modules.STFT(512, hop_length=128)
+        stft.start_stream()
+        model.eval()
+        model.start_stream()
+        with torch.no_grad():
+            for block in blocks:  # (batch, channels, samples)
+                frames = stft(block, 'transform')
+                magnitude, phase = frames[:, :, :257], frames[:, :, 257:]
+                estimates = model.stream({'mix_magnitude': magnitude})['estimates']
+                phase = phase.unsqueeze(-1).expand_as(estimates)
+                audio = stft(torch.cat([estimates, phase], dim=2), 'inverse')
+        model.stop_stream()
+
+    For faster inference on the CPU, :func:`quantize` makes a copy of a trained
+    model whose recurrent and linear layers are quantized to 8-bit integers.
+
     See also:
         ml.register_module to register your custom modules with SeparationModel.
 
@@ -93,6 +123,8 @@ class SeparationModel(nn.Module):
         self.output_keys = config['output']
         self.config = config
         self.verbose = verbose
+        self.streaming = False
+        self.quantization = None
         self.metadata = {
             'config': config,
             'nussl_version': __version__
@@ -203,6 +235,83 @@ class SeparationModel(nn.Module):
                 
         return {o: output[o] for o in self.output_keys}
 
+    def start_stream(self):
+        """
+        Starts separating a signal a piece at a time with :func:`stream`. Resets
+        the state of every module that carries state from one piece to the next
+        (every module with a ``start_stream`` method).
+
+        Raises:
+            ValueError: if the model is in training mode, or if any of its modules
+              can't process a signal in pieces (modules with ``streamable`` set to
+              False, e.g. bidirectional recurrent stacks or instance norm).
+        """
+        if self.training:
+            raise ValueError(
+                "Put the model in evaluation mode with model.eval() before streaming!")
+        for name, module in self.named_modules():
+            if not getattr(module, 'streamable', True):
+                raise ValueError(
+                    f"Module {name} ({type(module).__name__}) can't process a signal "
+                    f"in pieces!")
+        for module in self.modules():
+            if module is not self and hasattr(module, 'start_stream'):
+                module.start_stream()
+        self.streaming = True
+
+    def stream(self, data):
+        """
+        Runs the model on the next piece of a signal (e.g. a block of frames or of
+        samples), after :func:`start_stream`. The outputs are the same as those of
+        :func:`forward` on the whole signal, for the corresponding piece (delayed
+        by up to a frame if the model turns samples into frames). If it does, every
+        block of samples should make at least one frame: it should have at least 
+        ``hop_length`` samples (and the first block, ``filter_length // 2``).
+
+        Args:
+            data: (dict) a dictionary containing the next piece of the input data.
+
+        Returns:
+            dict: The outputs of the model for this piece.
+        """
+        if not self.streaming:
+            raise ValueError("Call start_stream before streaming!")
+        return self(data)
+
+    def stop_stream(self):
+        """Stops streaming, and clears the state of all of the modules."""
+        for module in self.modules():
+            if module is not self and hasattr(module, 'stop_stream'):
+                module.stop_stream()
+        self.streaming = False
+
+    def quantize(self, dtype=torch.qint8):
+        """
+        Makes a copy of the model whose LSTM, GRU and linear layers (e.g. in
+        ``RecurrentStack``, ``Embedding`` and ``DualPathBlock``) are dynamically
+        quantized: their weights are stored as 8-bit integers, and their inputs
+        are quantized on the fly at every call. This makes inference on the CPU
+        faster, usually at a small cost in accuracy (which can be checked with
+        ``DeepMixin.compare_quantized``). The quantized model only runs on the
+        CPU, can't be trained, and is saved (with :func:`save`) along with the
+        type it was quantized to, so that ``DeepMixin.load_model`` can load it
+        without quantizing it again.
+
+        Args:
+            dtype: (torch.dtype) Type of the quantized weights, either
+              ``torch.qint8`` or ``torch.float16``. Defaults to ``torch.qint8``.
+
+        Returns:
+            SeparationModel: The quantized model, in evaluation mode.
+        """
+        if self.quantization is not None:
+            raise ValueError(f"Model is already quantized to {self.quantization}!")
+        model = copy.deepcopy(self).cpu().eval()
+        model = torch.quantization.quantize_dynamic(
+            model, QUANTIZED_MODULES, dtype=dtype, inplace=True)
+        model.quantization = str(dtype).split('.')[-1]
+        return model
+
     def save(self, location, metadata=None):
         """
         Saves a SeparationModel into a location into a dictionary with the
@@ -218,7 +327,8 @@ class SeparationModel(nn.Module):
         """
         save_dict = {
             'state_dict': self.state_dict(),
-            'config': json.dumps(self.config)
+            'config': json.dumps(self.config),
+            'quantization': self.quantization,
         }
 
         metadata = metadata if metadata else {}
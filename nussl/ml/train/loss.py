@@ -1,7 +1,21 @@
 from itertools import permutations, combinations
+import inspect
+import math
 
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 import torch
 import torch.nn as nn
+from torch.utils.checkpoint import checkpoint
+
+# use_reentrant was added in torch 1.11, and newer versions warn if it's not given
+_CHECKPOINT_KWARGS = (
+    {'use_reentrant': False} 
+    if 'use_reentrant' in inspect.signature(checkpoint).parameters else {})
+
+# pairwise invariant losses try every assignment of estimates to targets at once 
+# up to this many assignments, and solve the assignment problem otherwise
+MAX_EXHAUSTIVE_ASSIGNMENTS = 120
 
 class L1Loss(nn.L1Loss):
     DEFAULT_KEYS = {'estimates': 'input', 'source_magnitudes': 'target'}
@@ -83,10 +97,64 @@ class SISDRLoss(nn.Module):
         return -sdr
 
 
+def _chunk_grams(embedding, assignments, weights):
+    # unit norm rows, weighted: (V^T W^2 V, V^T W^2 Y, Y^T W^2 Y), with the 
+    # squared weights applied to one side of each product only
+    embedding = nn.functional.normalize(embedding, dim=-1, p=2)
+    assignments = nn.functional.normalize(assignments, dim=-1, p=2)
+    weights = weights ** 2
+    weighted_embedding = (weights * embedding).transpose(2, 1)
+    vTv = weighted_embedding @ embedding
+    vTy = weighted_embedding @ assignments
+    yTy = (weights * assignments).transpose(2, 1) @ assignments
+    return vTv, vTy, yTy
+
+
+def _weighted_grams(embedding, assignments, weights, chunk_size=None):
+    """
+    The low-rank products V^T V, V^T Y and Y^T Y of the deep clustering losses, 
+    where V and Y are the unit norm embedding and assignments (weighted): 
+    (batch, ..., D) and (batch, ..., C) => (batch, D, D), (batch, D, C), (batch, C, C).
+    :class:`DeepClusteringLoss` and :class:`WhitenedKMeansLoss` only depend on the 
+    embedding and assignments through these products.
+
+    If ``chunk_size`` is given, the products are accumulated over chunks of 
+    ``chunk_size`` time-frequency bins, and each chunk is recomputed in the backward
+    pass instead of saved, so memory doesn't grow with the length of the input (at
+    the cost of computing each chunk twice when training).
+    """
+    batch_size = embedding.shape[0]
+    embedding = embedding.reshape(batch_size, -1, embedding.shape[-1])
+    assignments = assignments.reshape(batch_size, -1, assignments.shape[-1])
+    weights = weights.reshape(batch_size, -1, 1)
+    num_bins = embedding.shape[1]
+
+    if chunk_size is None or chunk_size >= num_bins:
+        return _chunk_grams(embedding, assignments, weights)
+
+    grams = None
+    for start in range(0, num_bins, chunk_size):
+        chunk = [
+            x[:, start:start + chunk_size] for x in (embedding, assignments, weights)]
+        if torch.is_grad_enabled() and any(x.requires_grad for x in chunk):
+            _grams = checkpoint(_chunk_grams, *chunk, **_CHECKPOINT_KWARGS)
+        else:
+            _grams = _chunk_grams(*chunk)
+        grams = _grams if grams is None else [g + _g for g, _g in zip(grams, _grams)]
+    return tuple(grams)
+
+
 class DeepClusteringLoss(nn.Module):
     """
     Computes the deep clustering loss with weights. Equation (7) in [1].
 
+    With ``chunk_size``, the loss is computed in chunks of time-frequency bins
+    to save memory when training on long inputs (see :func:`_weighted_grams`).
+
+    Args:
+        chunk_size (int, optional): Number of time-frequency bins per chunk. If 
+          None, all of the bins are processed at once. Defaults to None.
+
     References:
 
     [1] Wang, Z. Q., Le Roux, J., & Hershey, J. R. (2018, April).
@@ -100,34 +168,19 @@ class DeepClusteringLoss(nn.Module):
         'weights': 'weights'
     }
 
-    def __init__(self):
+    def __init__(self, chunk_size=None):
         super(DeepClusteringLoss, self).__init__()
+        self.chunk_size = chunk_size
 
     def forward(self, embedding, assignments, weights):
         batch_size = embedding.shape[0]
-        embedding_size = embedding.shape[-1]
-        num_sources = assignments.shape[-1]
-
-        weights = weights.view(batch_size, -1, 1)
-
-        # make everything unit norm
-        embedding = embedding.reshape(batch_size, -1, embedding_size)
-        embedding = nn.functional.normalize(embedding, dim=-1, p=2)
-
-        assignments = assignments.view(batch_size, -1, num_sources)
-        assignments = nn.functional.normalize(assignments, dim=-1, p=2)
-
         norm = (((weights.reshape(batch_size, -1)) ** 2).sum(dim=1) ** 2) + 1e-8
 
-        assignments = weights * assignments
-        embedding = weights * embedding
-
-        vTv = ((embedding.transpose(2, 1) @ embedding) ** 2).reshape(
-            batch_size, -1).sum(dim=-1)
-        vTy = ((embedding.transpose(2, 1) @ assignments) ** 2).reshape(
-            batch_size, -1).sum(dim=-1)
-        yTy = ((assignments.transpose(2, 1) @ assignments) ** 2).reshape(
-            batch_size, -1).sum(dim=-1)
+        vTv, vTy, yTy = _weighted_grams(
+            embedding, assignments, weights, self.chunk_size)
+        vTv = (vTv ** 2).reshape(batch_size, -1).sum(dim=-1)
+        vTy = (vTy ** 2).reshape(batch_size, -1).sum(dim=-1)
+        yTy = (yTy ** 2).reshape(batch_size, -1).sum(dim=-1)
         loss = (vTv - 2 * vTy + yTy) / norm
         return loss.mean()
 
@@ -135,6 +188,13 @@ class WhitenedKMeansLoss(nn.Module):
     """
     Computes the whitened K-Means loss with weights. Equation (6) in [1].
 
+    With ``chunk_size``, the loss is computed in chunks of time-frequency bins
+    to save memory when training on long inputs (see :func:`_weighted_grams`).
+
+    Args:
+        chunk_size (int, optional): Number of time-frequency bins per chunk. If 
+          None, all of the bins are processed at once. Defaults to None.
+
     References:
 
     [1] Wang, Z. Q., Le Roux, J., & Hershey, J. R. (2018, April).
@@ -148,35 +208,23 @@ class WhitenedKMeansLoss(nn.Module):
         'weights': 'weights'
     }
 
-    def __init__(self):
+    def __init__(self, chunk_size=None):
         super(WhitenedKMeansLoss, self).__init__()
+        self.chunk_size = chunk_size
 
     def forward(self, embedding, assignments, weights):
         batch_size = embedding.shape[0]
         embedding_size = embedding.shape[-1]
         num_sources = assignments.shape[-1]
 
-        weights = weights.view(batch_size, -1, 1)
-
-        # make everything unit norm
-        embedding = embedding.reshape(batch_size, -1, embedding_size)
-        embedding = nn.functional.normalize(embedding, dim=-1, p=2)
-
-        assignments = assignments.view(batch_size, -1, num_sources)
-        assignments = nn.functional.normalize(assignments, dim=-1, p=2)
-
-        assignments = weights * assignments
-        embedding = weights * embedding
+        vTv, vTy, yTy = _weighted_grams(
+            embedding, assignments, weights, self.chunk_size)
 
         embedding_dim_identity = torch.eye(
             embedding_size, device=embedding.device).float()
         source_dim_identity = torch.eye(
             num_sources, device=embedding.device).float()
 
-        vTv = (embedding.transpose(2, 1) @ embedding)
-        vTy = (embedding.transpose(2, 1) @ assignments)
-        yTy = (assignments.transpose(2, 1) @ assignments)
-
         ivTv = torch.inverse(vTv + embedding_dim_identity)
         iyTy = torch.inverse(yTy + source_dim_identity)
 
@@ -192,6 +240,55 @@ class WhitenedKMeansLoss(nn.Module):
         loss = D - 2 * trace
         return loss / batch_size
 
+def _pairwise_losses(loss_function, estimates, targets):
+    """
+    Loss between every target and every estimate, averaged over everything but
+    the batch: (num_batch, ..., num_estimates) and (num_batch, ..., num_targets) 
+    => (num_batch, num_targets, num_estimates). The loss function must have 
+    reduction 'none'. It is called once per target, on all of the estimates.
+    """
+    num_batch = estimates.shape[0]
+    num_estimates = estimates.shape[-1]
+    num_targets = targets.shape[-1]
+    estimates = estimates.reshape(num_batch, -1, num_estimates)
+    targets = targets.reshape(num_batch, -1, num_targets)
+
+    losses = []
+    for j in range(num_targets):
+        _targets = targets[..., j:j + 1].expand_as(estimates)
+        loss = loss_function(estimates, _targets)
+        loss = loss.reshape(num_batch, -1, num_estimates).mean(dim=1)
+        losses.append(loss)
+    return torch.stack(losses, dim=1)
+
+
+def _matched_losses(losses):
+    """
+    Mean loss of the best assignment of estimates to targets, for each item in the
+    batch: (num_batch, num_targets, num_estimates) => (num_batch,). All of the
+    assignments are tried at once if there are few enough of them, otherwise
+    the assignment problem is solved (Hungarian algorithm) for each item.
+    """
+    num_batch, num_targets, num_estimates = losses.shape
+    # math.perm needs Python 3.8
+    num_assignments = (
+        math.factorial(num_estimates) // math.factorial(num_estimates - num_targets))
+    
+    if num_assignments <= MAX_EXHAUSTIVE_ASSIGNMENTS:
+        # (num_assignments, num_targets) => (num_batch, num_targets, num_assignments)
+        assignments = torch.tensor(
+            list(permutations(range(num_estimates), num_targets)), 
+            device=losses.device)
+        assignments = assignments.T.unsqueeze(0).expand(num_batch, -1, -1)
+        matched = losses.gather(-1, assignments).mean(dim=1)
+        return matched.min(dim=-1)[0]
+
+    _losses = losses.detach().cpu().numpy()
+    assignments = np.stack([linear_sum_assignment(l)[1] for l in _losses])
+    assignments = torch.from_numpy(assignments).to(losses.device)
+    return losses.gather(-1, assignments.unsqueeze(-1)).squeeze(-1).mean(dim=-1)
+
+
 class PermutationInvariantLoss(nn.Module):
     """
     Computes the Permutation Invariant Loss (PIT) [1] by permuting the estimated 
@@ -201,6 +298,23 @@ class PermutationInvariantLoss(nn.Module):
     For when you're trying to match the estimates to the sources but you don't 
     know the order in which your model outputs the estimates.
 
+    By default, the loss is computed for every permutation of the sources. With
+    ``pairwise=True``, the loss between every estimate and every source is 
+    computed once instead (for losses that are computed element-wise or per 
+    source, like ``L1Loss``, ``MSELoss`` or ``SISDRLoss``), and the best 
+    permutation of each item in the batch is found from that. This makes the loss
+    practical for many sources, as the permutations are only searched on the 
+    matrix of pairwise losses (or, beyond ``MAX_EXHAUSTIVE_ASSIGNMENTS`` of them, 
+    with the Hungarian algorithm). Note that for element-wise losses, the default
+    picks the best permutation separately for every element (e.g. time-frequency
+    bin), while ``pairwise=True`` picks it for every item in the batch.
+
+    Args:
+        loss_function (nn.Module): Loss to compute between estimates and sources, 
+          whose reduction is set to 'none'.
+        pairwise (bool, optional): Whether to compute the loss between every
+          estimate and source once and match them per item. Defaults to False.
+
     References:
     
     [1] Yu, Dong, Morten Kolbæk, Zheng-Hua Tan, and Jesper Jensen. 
@@ -210,13 +324,18 @@ class PermutationInvariantLoss(nn.Module):
     """
     DEFAULT_KEYS = {'estimates': 'estimates', 'source_magnitudes': 'targets'}
 
-    def __init__(self, loss_function):
+    def __init__(self, loss_function, pairwise=False):
         
         super(PermutationInvariantLoss, self).__init__()
         self.loss_function = loss_function
         self.loss_function.reduction = 'none'
+        self.pairwise = pairwise
         
     def forward(self, estimates, targets):
+        if self.pairwise:
+            losses = _pairwise_losses(self.loss_function, estimates, targets)
+            return torch.mean(_matched_losses(losses))
+
         num_batch = estimates.shape[0]
         num_sources = estimates.shape[-1]
         estimates = estimates.reshape(num_batch, -1, num_sources)
@@ -247,15 +366,30 @@ class CombinationInvariantLoss(nn.Module):
     know the order in which your model outputs the estimates AND you are 
     outputting more estimates then there are sources.
 
+    With ``pairwise=True``, the loss between every estimate and every source is
+    computed once, and the best subset and permutation of the estimates for each
+    item in the batch is found from that, like in 
+    :class:`PermutationInvariantLoss`.
+
+    Args:
+        loss_function (nn.Module): Loss to compute between estimates and sources, 
+          whose reduction is set to 'none'.
+        pairwise (bool, optional): Whether to compute the loss between every
+          estimate and source once and match them per item. Defaults to False.
     """
     DEFAULT_KEYS = {'estimates': 'estimates', 'source_magnitudes': 'targets'}
 
-    def __init__(self, loss_function):
+    def __init__(self, loss_function, pairwise=False):
         super(CombinationInvariantLoss, self).__init__()
         self.loss_function = loss_function
         self.loss_function.reduction = 'none'
+        self.pairwise = pairwise
         
     def forward(self, estimates, targets):
+        if self.pairwise:
+            losses = _pairwise_losses(self.loss_function, estimates, targets)
+            return torch.mean(_matched_losses(losses))
+
         num_batch = estimates.shape[0]
         num_target_sources = targets.shape[-1]
         num_estimate_sources = estimates.shape[-1]
@@ -371,7 +371,8 @@ def add_progress_bar_handler(*engines):
         ProgressBar().attach(engine, ['avg_loss'])
         
 
-def add_tensorboard_handler(tensorboard_folder, engine, every_iteration=False):
+def add_tensorboard_handler(tensorboard_folder, engine, every_iteration=False,
+                            profiler=None):
     """
     Every key in engine.state.epoch_history[-1] is logged to TensorBoard.
     
@@ -380,6 +381,9 @@ def add_tensorboard_handler(tensorboard_folder, engine, every_iteration=False):
         trainer (ignite.Engine): The engine to log.
         every_iteration (bool, optional): Whether to also log the values at every 
           iteration.
+        profiler (nussl.datasets.transforms.TransformProfiler, optional): If given, 
+          the per-stage statistics of the data pipeline (aggregated across DataLoader
+          workers) are also logged every epoch, under ``data/<stage>/...``.
     """
     writer = SummaryWriter(tensorboard_folder)
 
@@ -389,6 +393,12 @@ def add_tensorboard_handler(tensorboard_folder, engine, every_iteration=False):
             writer.add_scalar(
                 key, engine.state.epoch_history[key][-1], engine.state.epoch)
 
+        if profiler is not None:
+            for stage, summary in profiler.collect().summary().items():
+                for key in ['mean_time', 'mean_allocated', 'mean_output_bytes']:
+                    writer.add_scalar(
+                        f'data/{stage}/{key}', summary[key], engine.state.epoch)
+
     if every_iteration:
         @engine.on(Events.ITERATION_COMPLETED)
         def log_iteration_to_tensorboard(engine):
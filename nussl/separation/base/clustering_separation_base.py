@@ -46,6 +46,8 @@ class ClusteringSeparationBase(MaskSeparationBase):
         mask_type (str, optional): Masking approach to use. Passed up to MaskSeparationBase.
 
         mask_threshold (float, optional): Threshold for masking. Passed up to MaskSeparationBase.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
 
         **kwargs (dict, optional): Additional keyword arguments that are passed to the clustering
           object (one of KMeans, GaussianMixture, or MiniBatchKMeans).
@@ -57,7 +59,7 @@ class ClusteringSeparationBase(MaskSeparationBase):
     """
     def __init__(self, input_audio_signal, num_sources, clustering_type='KMeans', 
                  fit_clusterer=True, percentile=90, beta=5.0, mask_type='soft',
-                 mask_threshold=0.5, **kwargs):
+                 mask_threshold=0.5, mask_storage=None, **kwargs):
 
         if clustering_type not in dir(ml.cluster):
             raise SeparationException(
@@ -87,7 +89,8 @@ class ClusteringSeparationBase(MaskSeparationBase):
         super(ClusteringSeparationBase, self).__init__(
             input_audio_signal=input_audio_signal,
             mask_type=mask_type,
-            mask_threshold=mask_threshold
+            mask_threshold=mask_threshold,
+            mask_storage=mask_storage
         )
 
         self.metadata.update({
@@ -206,7 +209,7 @@ class ClusteringSeparationBase(MaskSeparationBase):
             if self.mask_type == self.MASKS['binary']:
                 mask_data = (
                     responsibilities[..., i] == responsibilities.max(axis=-1))
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
         
         return self.result_masks
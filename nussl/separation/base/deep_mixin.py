@@ -1,13 +1,18 @@
+import os
+import warnings
+
+import numpy as np
 import torch
 import yaml
 import json
 
 from ...ml import SeparationModel
 from ...datasets import transforms as tfm
-from ...core.migration import SafeModelLoader
+from .separation_base import SeparationException
 
 OMITTED_TRANSFORMS = (
     tfm.GetExcerpt,
+    tfm.GetAudioExcerpt,
     tfm.MagnitudeWeights,
     tfm.SumSources,
     tfm.Cache,
@@ -15,29 +20,105 @@ OMITTED_TRANSFORMS = (
 )
 
 
+def quantized_model_path(model_path, quantization='qint8'):
+    """
+    Path that ``DeepMixin.load_model`` saves the quantized version of the model at
+    ``model_path`` to (e.g. ``best.model.qint8.pth`` for ``best.model.pth``).
+
+    Args:
+        model_path (str): Path to the model.
+        quantization (str, optional): Type the model is quantized to. Defaults
+          to 'qint8'.
+
+    Returns:
+        str: Path to the quantized model.
+    """
+    root, ext = os.path.splitext(model_path)
+    return f'{root}.{quantization}{ext}'
+
+
+def _savable_metadata(metadata):
+    """
+    Undoes what ``SafeModelLoader`` does to the metadata of a model (filling in 
+    missing values with ``'UNAVAILABLE'`` and serializing the config), so that 
+    the metadata can be saved with a model and loaded by it again. Keys that 
+    ``SafeModelLoader`` doesn't know about were already dropped by it.
+    """
+    def _strip(value):
+        if isinstance(value, dict):
+            return {
+                k: _strip(v) for k, v in value.items()
+                if not (isinstance(v, str) and v == 'UNAVAILABLE')
+            }
+        return value
+
+    metadata = _strip(metadata)
+    metadata['config'] = json.loads(metadata['config'])
+    return metadata
+
+
 class DeepMixin:
-    def load_model(self, model_path, device='cpu'):
+    def load_model(self, model_path, device='cpu', quantize=False):
         """
         Loads the model at specified path `model_path`. Uses GPU if
         available.
 
+        With ``quantize=True``, the recurrent and linear layers of the model are
+        dynamically quantized to 8-bit integers (see ``SeparationModel.quantize``)
+        for faster inference on the CPU. The quantized model is saved next to the
+        original one (see :func:`quantized_model_path`) and loaded from there the
+        next time, as long as it is newer than the original. Models that were 
+        saved after being quantized are always loaded quantized. Quantized models
+        always run on the CPU, whatever ``device`` is.
+
         Args:
             model_path (str): path to model saved as SeparationModel.
             device (str or torch.Device): loads model on CPU or GPU. Defaults to
               'cuda'.
+            quantize (bool, optional): Whether to quantize the model. Defaults to
+              False.
 
         Returns:
             model (SeparationModel): Loaded model, nn.Module
             metadata (dict): metadata associated with model, used for making
             the input data into the model.
         """
+        # lazy load, the loader imports nussl.evaluation
+        from ...core.migration import SafeModelLoader
+
         safe_loader = SafeModelLoader()
+        quantized_path = quantized_model_path(model_path)
+        if (
+            quantize and os.path.exists(quantized_path) and
+            os.path.getmtime(quantized_path) >= os.path.getmtime(model_path)
+        ):
+            model_path = quantized_path
         model_dict = safe_loader.load(model_path, 'cpu')
         metadata = model_dict['metadata']
+        quantization = model_dict.get('quantization', None)
 
         model = SeparationModel(metadata['config'])
+        if quantization is not None:
+            # the structure of the quantized model, to load the quantized weights into
+            model = model.quantize(getattr(torch, quantization))
         model.load_state_dict(model_dict['state_dict'])
+
+        if quantize and quantization is None:
+            model = model.quantize()
+            # the loaded checkpoint, with the quantized weights
+            quantized_dict = dict(model_dict)
+            quantized_dict['metadata'] = _savable_metadata(metadata)
+            quantized_dict['state_dict'] = model.state_dict()
+            quantized_dict['quantization'] = model.quantization
+            try:
+                torch.save(quantized_dict, quantized_path)
+            except OSError as e:
+                warnings.warn(
+                    f"Couldn't save the quantized model to {quantized_path}: {e}")
+
         device = device if torch.cuda.is_available() else 'cpu'
+        if model.quantization is not None:
+            device = 'cpu'
 
         self.device = device
 
@@ -47,6 +128,71 @@ class DeepMixin:
         self.metadata.update(metadata)
         self.transform = self._get_transforms(metadata['train_dataset']['transforms'])
 
+    def compare_quantized(self, dataset, dtype=torch.qint8, num_items=None):
+        """
+        Checks how much quantizing the loaded (float) model changes the quality of
+        its separations. The mixture of each item of ``dataset`` is separated with
+        the model and with a quantized copy of it (see ``SeparationModel.quantize``),
+        and the SI-SDR of both sets of estimates against the sources of the item is
+        computed with ``BSSEvalScale`` (finding the best permutation of the 
+        estimates), and averaged over the sources.
+
+        Args:
+            dataset (BaseDataset): Dataset whose items have a ``mix`` and 
+              ``sources`` (i.e. without transforms), at the sample rate of the 
+              model.
+            dtype (torch.dtype, optional): Type to quantize the model to. Defaults
+              to ``torch.qint8``.
+            num_items (int, optional): Number of items (from the start of the 
+              dataset) to compare on. If None, every item is used. Defaults to None.
+
+        Returns:
+            dict: The SI-SDR of every item with the float model (``float``) and
+            with the quantized model (``quantized``), as arrays, and the mean
+            difference between the two (``difference``, quantized minus float).
+
+        Raises:
+            SeparationException: if the loaded model is already quantized.
+        """
+        from ...evaluation import BSSEvalScale
+
+        if self.model.quantization is not None:
+            raise SeparationException(
+                "The loaded model is already quantized! Load the float model "
+                "to compare it with its quantized version.")
+
+        models = {
+            'float': (self.model, self.device),
+            'quantized': (self.model.quantize(dtype), 'cpu'),
+        }
+        float_model, float_device = models['float']
+        audio_signal = self.audio_signal
+        num_items = len(dataset) if num_items is None else min(num_items, len(dataset))
+
+        scores = {key: [] for key in models}
+        try:
+            for i in range(num_items):
+                item = dataset[i]
+                sources = list(item['sources'].values())
+                for key, (model, device) in models.items():
+                    self.model, self.device = model, device
+                    self.audio_signal = item['mix']
+                    estimates = self()
+                    evaluator = BSSEvalScale(
+                        sources, estimates, compute_permutation=True)
+                    results = evaluator.evaluate()
+                    scores[key].append(np.mean([
+                        results[label]['SI-SDR'] 
+                        for label in evaluator.source_labels
+                    ]))
+        finally:
+            self.model, self.device = float_model, float_device
+            self.audio_signal = audio_signal
+
+        scores = {key: np.array(value) for key, value in scores.items()}
+        scores['difference'] = float(np.mean(scores['quantized'] - scores['float']))
+        return scores
+
     @staticmethod
     def _get_transforms(loaded_tfm):
         """
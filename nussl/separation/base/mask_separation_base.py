@@ -32,6 +32,11 @@ class MaskSeparationBase(SeparationBase):
           binary or soft masks. See :attr:`mask_type` property for details.
         mask_threshold: (float) Value between [0.0, 1.0] to convert a soft mask 
           to a binary mask. See :attr:`mask_threshold` property for details.
+        mask_storage: (str) Compact in-memory representation for the masks in
+          :attr:`result_masks` (``'packed'`` for binary masks, ``'float16'`` or 
+          ``'uint8'`` for soft masks). Every mask-based separator takes it as a keyword
+          argument, and it can also be set after initialization. Defaults to ``None``
+          (plain arrays).
     """
     
     MASKS = {
@@ -39,11 +44,13 @@ class MaskSeparationBase(SeparationBase):
         'soft': masks.SoftMask
     }
 
-    def __init__(self, input_audio_signal, mask_type='soft', mask_threshold=0.5):
+    def __init__(self, input_audio_signal, mask_type='soft', mask_threshold=0.5,
+                 mask_storage=None):
         super().__init__(input_audio_signal=input_audio_signal)
 
         self.mask_type = mask_type
         self.mask_threshold = mask_threshold
+        self.mask_storage = mask_storage
         self.result_masks = []
 
         self.metadata.update({
@@ -136,6 +143,39 @@ class MaskSeparationBase(SeparationBase):
         else:
             raise error
 
+    @property
+    def mask_storage(self):
+        """
+        Compact in-memory representation of the masks made by this algorithm. Must be
+        one of ``mask_type.STORAGE_TYPES``: ``'packed'`` for 
+        :class:`separation.masks.binary_mask.BinaryMask`, ``'float16'`` or ``'uint8'`` for 
+        :class:`separation.masks.soft_mask.SoftMask`, or ``None`` for plain arrays.
+
+        Raises:
+            ValueError if not valid for :attr:`mask_type`.
+        """
+        return self._mask_storage
+
+    @mask_storage.setter
+    def mask_storage(self, value):
+        if value not in self.mask_type.STORAGE_TYPES:
+            raise ValueError(
+                f"Invalid mask storage for {self.mask_type.__name__}! Got {value} but "
+                f"valid options are {self.mask_type.STORAGE_TYPES}.")
+        self._mask_storage = value
+
+    def make_mask(self, mask_data):
+        """
+        Creates a new mask of this object's type (and storage) from an array.
+
+        Args:
+            mask_data (np.ndarray): mask data
+
+        Returns:
+            A subclass of `MaskBase` containing ``mask_data``.
+        """
+        return self.mask_type(mask_data, storage=self.mask_storage)
+
     @property
     def mask_threshold(self):
         """        
@@ -173,7 +213,7 @@ class MaskSeparationBase(SeparationBase):
         Returns:
             A subclass of `MaskBase` containing 0s.
         """
-        return self.mask_type.zeros(shape)
+        return self.mask_type.zeros(shape, storage=self.mask_storage)
 
     def ones_mask(self, shape):
         """
@@ -185,7 +225,7 @@ class MaskSeparationBase(SeparationBase):
         Returns:
             A subclass of `MaskBase` containing 1s.
         """
-        return self.mask_type.ones(shape)
+        return self.mask_type.ones(shape, storage=self.mask_storage)
 
     def _preprocess_audio_signal(self):
         """
@@ -13,10 +13,15 @@ class HighLowPassFilter(MaskSeparationBase):
         input_audio_signal (AudioSignal): Signal to separate.
         high_pass_cutoff_hz (float): Cutoff in Hz. Will be rounded off 
         mask_type (str, optional): Mask type. Defaults to 'binary'.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
     """
 
-    def __init__(self, input_audio_signal, high_pass_cutoff_hz, mask_type='binary'):
-        super().__init__(input_audio_signal=input_audio_signal, mask_type=mask_type)
+    def __init__(self, input_audio_signal, high_pass_cutoff_hz, mask_type='binary',
+                 mask_storage=None):
+        super().__init__(
+            input_audio_signal=input_audio_signal, mask_type=mask_type,
+            mask_storage=mask_storage)
         self.high_pass_cutoff_hz = high_pass_cutoff_hz
 
     def run(self):
@@ -27,7 +32,10 @@ class HighLowPassFilter(MaskSeparationBase):
 
         # Make masks
         low_pass_mask = self.ones_mask(self.stft.shape)
-        low_pass_mask.mask[closest_freq_bin:, ...] = 0
+        mask_data = low_pass_mask.mask
+        mask_data[closest_freq_bin:, ...] = 0
+        # write back, as the mask may be kept in a compact storage
+        low_pass_mask.mask = mask_data
         high_pass_mask = low_pass_mask.invert_mask()
         self.result_masks = [low_pass_mask, high_pass_mask]
 
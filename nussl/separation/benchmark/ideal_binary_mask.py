@@ -11,10 +11,12 @@ class IdealBinaryMask(MaskSeparationBase):
         input_audio_signal (AudioSignal): Signal to separate.
         sources (list): List of audio signal objects that correspond to the sources.
         mask_type (str, optional): Mask type. Defaults to 'binary'.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
     """
 
     def __init__(self, input_audio_signal, sources, mask_type='binary',
-                 mask_threshold=.5):
+                 mask_threshold=.5, mask_storage=None):
         if isinstance(sources, list):
             sources = {i: sources[i] for i in range(len(sources))}
         elif not isinstance(sources, dict):
@@ -23,7 +25,7 @@ class IdealBinaryMask(MaskSeparationBase):
         self.sources = sources
         super().__init__(
             input_audio_signal=input_audio_signal, mask_type=mask_type,
-            mask_threshold=mask_threshold)
+            mask_threshold=mask_threshold, mask_storage=mask_storage)
 
     def run(self):
         # Set up dictionary to pass to the transform.    
@@ -38,7 +40,7 @@ class IdealBinaryMask(MaskSeparationBase):
         masks = []
 
         for i in range(ibm.shape[-1]):
-            mask = self.mask_type(ibm[..., i])
+            mask = self.make_mask(ibm[..., i])
             masks.append(mask)
 
         self.result_masks = masks
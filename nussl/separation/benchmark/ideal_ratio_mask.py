@@ -14,12 +14,14 @@ class IdealRatioMask(MaskSeparationBase):
           (magnitude spectrum approximation). Generally 'psa' does better.
         mask_type (str, optional): Mask type. Defaults to 'soft'.
         mask_threshold (float, optional): Masking threshold. Defaults to 0.5. 
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
         kwargs (dict): Extra keyword arguments are passed to the transform classes at
           initialization.
     """
 
     def __init__(self, input_audio_signal, sources, approach='psa', mask_type='soft',
-                 mask_threshold=.5, **kwargs):
+                 mask_threshold=.5, mask_storage=None, **kwargs):
 
         if isinstance(sources, list):
             sources = {i: sources[i] for i in range(len(sources))}
@@ -38,7 +40,7 @@ class IdealRatioMask(MaskSeparationBase):
 
         super().__init__(
             input_audio_signal=input_audio_signal, mask_type=mask_type,
-            mask_threshold=mask_threshold)
+            mask_threshold=mask_threshold, mask_storage=mask_storage)
 
     def run(self):
         # Set up dictionary to pass to the transform.    
@@ -55,7 +57,7 @@ class IdealRatioMask(MaskSeparationBase):
         )
 
         for i in range(mask_data.shape[-1]):            
-            mask = self.mask_type(mask_data[..., i])
+            mask = self.make_mask(mask_data[..., i])
             masks.append(mask)
 
         self.result_masks = masks
@@ -17,11 +17,13 @@ class WienerFilter(MaskSeparationBase):
           filter.
         mask_type (str, optional): Mask type. Defaults to 'soft'.
         mask_threshold (float, optional): Threshold for masking binary. Defaults to 0.5.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
         kwargs (dict): Additional keyword arguments to `norbert.wiener`.
     """
 
     def __init__(self, input_audio_signal, estimates, iterations=1, mask_type='soft',  
-                 mask_threshold=.5, **kwargs):
+                 mask_threshold=.5, mask_storage=None, **kwargs):
         if not isinstance(estimates, list):
             raise SeparationException("estimates must be a list!")
 
@@ -32,7 +34,7 @@ class WienerFilter(MaskSeparationBase):
         super().__init__(
             input_audio_signal=input_audio_signal, 
             mask_type=mask_type,
-            mask_threshold=mask_threshold)
+            mask_threshold=mask_threshold, mask_storage=mask_storage)
 
     def run(self):
         source_magnitudes = np.stack([
@@ -52,7 +54,7 @@ class WienerFilter(MaskSeparationBase):
             mask_data = _masks[..., i]
             if self.mask_type == self.MASKS['binary']:
                 mask_data = _masks[..., i] == np.max(_masks, axis=-1)            
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
         
         return self.result_masks
@@ -66,6 +66,8 @@ class EnsembleClustering(ClusteringSeparationBase):
         mask_type (str, optional): Masking approach to use. Passed up to MaskSeparationBase.
 
         mask_threshold (float, optional): Threshold for masking. Passed up to MaskSeparationBase.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
 
         **kwargs (dict, optional): Additional keyword arguments that are passed to the clustering
           object (one of KMeans, GaussianMixture, or MiniBatchKMeans).
@@ -98,11 +100,13 @@ class EnsembleClustering(ClusteringSeparationBase):
     def __init__(self, input_audio_signal, num_sources, separators, weights=None, 
                  returns=None, num_cascades=1, extracted_feature='masks', 
                  clustering_type='KMeans', fit_clusterer=True, percentile=90,
-                 beta=5.0, mask_type='soft', mask_threshold=0.5, **kwargs):
+                 beta=5.0, mask_type='soft', mask_threshold=0.5, mask_storage=None,
+                 **kwargs):
         super().__init__(
             input_audio_signal, num_sources, clustering_type=clustering_type, 
             percentile=percentile, fit_clusterer=fit_clusterer, beta=beta, 
-            mask_type=mask_type, mask_threshold=mask_threshold, **kwargs)
+            mask_type=mask_type, mask_threshold=mask_threshold,
+            mask_storage=mask_storage, **kwargs)
 
         self.separators = separators
         self.num_cascades = num_cascades
@@ -191,9 +195,10 @@ class EnsembleClustering(ClusteringSeparationBase):
 
     @staticmethod
     def _extract_features_from_masks(masks):
-        features = []
-        for m in masks:
-            mask_data = m.mask
-            features.append(mask_data)
-        features = np.stack(features, axis=-1)
+        # fill a preallocated array one mask at a time, so that masks kept in a compact
+        # storage are only ever decompressed one at a time
+        dtype = np.result_type(*[m.dtype for m in masks])
+        features = np.empty(masks[0].shape + (len(masks),), dtype=dtype)
+        for i, m in enumerate(masks):
+            features[..., i] = m.mask
         return features
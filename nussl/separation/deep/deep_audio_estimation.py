@@ -18,13 +18,16 @@ class DeepAudioEstimation(DeepMixin, SeparationBase):
         extra_data: A dictionary containing any additional data that will 
           be merged with the output dictionary.
         device (str, optional): Device to put the model on. Defaults to 'cpu'.
+        quantize (bool, optional): Whether to load the model with its recurrent and
+          linear layers quantized to 8-bit integers, for faster inference on the 
+          CPU (see ``DeepMixin.load_model``). Defaults to False.
         **kwargs (dict): Keyword arguments for MaskSeparationBase.
     """
     def __init__(self, input_audio_signal, model_path=None, device='cpu', 
-                 extra_data=None, **kwargs):
+                 extra_data=None, quantize=False, **kwargs):
         super().__init__(input_audio_signal, **kwargs)
         if model_path is not None:
-            self.load_model(model_path, device=device)
+            self.load_model(model_path, device=device, quantize=quantize)
         self.model_output = None
         self.extra_data = extra_data
         # audio channel dimension in an audio model
@@ -22,6 +22,9 @@ class DeepClustering(DeepMixin, ClusteringSeparationBase):
         device (str, optional): Device to put the model on. Defaults to 'cpu'.
         extra_data (dict, optional): Any extra data that is to be passed at runtime
           to the SeparationModel.
+        quantize (bool, optional): Whether to load the model with its recurrent and
+          linear layers quantized to 8-bit integers, for faster inference on the 
+          CPU (see ``DeepMixin.load_model``). Defaults to False.
         **kwargs (dict): Keyword arguments for ClusteringSeparationBase and the 
           clustering object used for clustering (one of KMeans, GaussianMixture,
           MiniBatchKmeans).
@@ -30,10 +33,10 @@ class DeepClustering(DeepMixin, ClusteringSeparationBase):
         SeparationException: If 'embedding' isn't in the output of the model.
     """
     def __init__(self, input_audio_signal, num_sources, model_path=None,
-                 device='cpu', extra_data=None, **kwargs):
+                 device='cpu', extra_data=None, quantize=False, **kwargs):
         super().__init__(input_audio_signal, num_sources, **kwargs)
         if model_path is not None:
-            self.load_model(model_path, device=device)
+            self.load_model(model_path, device=device, quantize=quantize)
         # audio channel dimension in a dpcl model
         self.channel_dim = -1
         self.extra_data = extra_data
@@ -21,13 +21,16 @@ class DeepMaskEstimation(DeepMixin, MaskSeparationBase):
           be merged with the output dictionary. This can come from a dataset,
           or contain a query, etc.
         device (str, optional): Device to put the model on. Defaults to 'cpu'.
+        quantize (bool, optional): Whether to load the model with its recurrent and
+          linear layers quantized to 8-bit integers, for faster inference on the 
+          CPU (see ``DeepMixin.load_model``). Defaults to False.
         **kwargs (dict): Keyword arguments for MaskSeparationBase.
     """
     def __init__(self, input_audio_signal, model_path=None, device='cpu', 
-                 extra_data=None, **kwargs):
+                 extra_data=None, quantize=False, **kwargs):
         super().__init__(input_audio_signal, **kwargs)
         if model_path is not None:
-            self.load_model(model_path, device=device)
+            self.load_model(model_path, device=device, quantize=quantize)
         self.model_output = None
         self.extra_data = extra_data
         # audio channel dimension in a mask estimation model
@@ -60,7 +63,7 @@ class DeepMaskEstimation(DeepMixin, MaskSeparationBase):
             mask_data = masks[..., i]
             if self.mask_type == self.MASKS['binary']:
                 mask_data = masks[..., i] == masks.max(axis=-1)
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
         
         return self.result_masks
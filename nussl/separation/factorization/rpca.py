@@ -23,14 +23,16 @@ class RPCA(MaskSeparationBase):
           Defaults to 1e-7.
         mask_type (str, optional): Type of mask to use. Defaults to 'soft'.
         mask_threshold (float, optional): Threshold for mask. Defaults to 0.5.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
     """
 
     def __init__(self, input_audio_signal, high_pass_cutoff=100, num_iterations=100, 
-                 epsilon=1e-7, mask_type='soft', mask_threshold=0.5):
+                 epsilon=1e-7, mask_type='soft', mask_threshold=0.5, mask_storage=None):
         super().__init__(
             input_audio_signal=input_audio_signal, 
             mask_type=mask_type,
-            mask_threshold=mask_threshold)
+            mask_threshold=mask_threshold, mask_storage=mask_storage)
         self.high_pass_cutoff = high_pass_cutoff
 
         self.epsilon = epsilon
@@ -74,7 +76,7 @@ class RPCA(MaskSeparationBase):
             elif i == 1:
                 mask_data = np.minimum(mask_data, high_pass_masks[i].mask)
             
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
 
         return self.result_masks
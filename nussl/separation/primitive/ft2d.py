@@ -68,17 +68,20 @@ class FT2D(MaskSeparationBase):
         mask_type (str, optional): Mask type. Defaults to 'soft'.
 
         mask_threshold (float, optional): Masking threshold. Defaults to 0.5.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
 
     """
 
     def __init__(self, input_audio_signal, neighborhood_size=(1, 25), high_pass_cutoff=100.0,
                  quadrants_to_keep=(0, 1, 2, 3), filter_approach='local_std', use_bg_2dft=True,
-                 mask_type='soft', mask_threshold=0.5):
+                 mask_type='soft', mask_threshold=0.5, mask_storage=None):
 
         super().__init__(
             input_audio_signal=input_audio_signal,
             mask_type=mask_type,
-            mask_threshold=mask_threshold
+            mask_threshold=mask_threshold,
+            mask_storage=mask_storage
         )
 
         self.neighborhood_size = neighborhood_size
@@ -129,7 +132,7 @@ class FT2D(MaskSeparationBase):
             elif i == 1:
                 mask_data = np.minimum(mask_data, high_pass_masks[i].mask)
 
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
 
         return self.result_masks
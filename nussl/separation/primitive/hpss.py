@@ -28,14 +28,17 @@ class HPSS(MaskSeparationBase):
         mask_type (str, optional): Mask type. Defaults to 'soft'.
 
         mask_threshold (float, optional): Masking threshold. Defaults to 0.5.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
 
     """
     def __init__(self, input_audio_signal, kernel_size=31, mask_type='soft',
-                 mask_threshold=0.5):
+                 mask_threshold=0.5, mask_storage=None):
         super().__init__(
             input_audio_signal=input_audio_signal, 
             mask_type=mask_type,
-            mask_threshold=mask_threshold
+            mask_threshold=mask_threshold,
+            mask_storage=mask_storage
         )
 
         self.kernel_size = kernel_size
@@ -64,7 +67,7 @@ class HPSS(MaskSeparationBase):
             mask_data = _masks[..., i]
             if self.mask_type == self.MASKS['binary']:
                 mask_data = _masks[..., i] == np.max(_masks, axis=-1)
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
 
         return self.result_masks
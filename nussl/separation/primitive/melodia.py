@@ -180,12 +180,16 @@ class Melodia(MaskSeparationBase):
         mask_type (optional, str): Type of mask to use.
 
         mask_threshold (optional, float): Threshold for mask to convert to binary.
+
+        mask_storage (optional, str): Compact in-memory representation for the
+          masks (see MaskSeparationBase).
     """
 
     def __init__(self, input_audio_signal, high_pass_cutoff=100, minimum_frequency=55.0,
                  maximum_frequency=1760.0, voicing_tolerance=0.2, minimum_peak_salience=0.0,
                  compression=0.5, num_overtones=40, apply_vowel_filter=False, smooth_length=5, 
-                 add_lower_octave=False, mask_type='soft', mask_threshold=0.5):
+                 add_lower_octave=False, mask_type='soft', mask_threshold=0.5,
+                 mask_storage=None):
         # lazy load vamp to check if it exists
         from ... import vamp_imported
 
@@ -199,7 +203,8 @@ class Melodia(MaskSeparationBase):
         super().__init__(
             input_audio_signal=input_audio_signal,
             mask_type=mask_type,
-            mask_threshold=mask_threshold
+            mask_threshold=mask_threshold,
+            mask_storage=mask_storage
         )
 
         self.high_pass_cutoff = high_pass_cutoff
@@ -396,7 +401,7 @@ class Melodia(MaskSeparationBase):
             elif i == 1:
                 mask_data = np.minimum(mask_data, high_pass_masks[i].mask)
 
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
 
         return self.result_masks
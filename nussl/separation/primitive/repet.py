@@ -43,17 +43,19 @@ class Repet(MaskSeparationBase):
         mask_type (str, optional): Mask type. Defaults to 'soft'.
 
         mask_threshold (float, optional): Masking threshold. Defaults to 0.5.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
 
     """
 
     def __init__(self, input_audio_signal, min_period=None, max_period=None,
                  period=None, high_pass_cutoff=100.0, mask_type='soft',
-                 mask_threshold=0.5):
+                 mask_threshold=0.5, mask_storage=None):
 
         super().__init__(
             input_audio_signal=input_audio_signal,
             mask_type=mask_type,
-            mask_threshold=mask_threshold)
+            mask_threshold=mask_threshold, mask_storage=mask_storage)
 
         # Check input parameters
         if (min_period or max_period) and period:
@@ -112,7 +114,7 @@ class Repet(MaskSeparationBase):
             elif i == 1:
                 mask_data = np.minimum(mask_data, high_pass_masks[i].mask)
 
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
 
         return self.result_masks
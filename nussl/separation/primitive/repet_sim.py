@@ -35,15 +35,18 @@ class RepetSim(MaskSeparationBase):
         mask_type (str, optional): Mask type to use.. Defaults to 'soft'.
         mask_threshold (float, optional): Threshold for mask converting to binary. 
           Defaults to 0.5.
+        mask_storage (str, optional): Compact in-memory representation for the
+          masks (see MaskSeparationBase). Defaults to None.
     """
 
     def __init__(self, input_audio_signal, similarity_threshold=0, 
                  min_distance_between_frames=1, max_repeating_frames=100, 
-                 high_pass_cutoff=100, mask_type='soft', mask_threshold=0.5):
+                 high_pass_cutoff=100, mask_type='soft', mask_threshold=0.5,
+                 mask_storage=None):
         super().__init__(
             input_audio_signal=input_audio_signal, 
             mask_type=mask_type,
-            mask_threshold=mask_threshold)
+            mask_threshold=mask_threshold, mask_storage=mask_storage)
 
         self.high_pass_cutoff = high_pass_cutoff
         self.similarity_threshold = similarity_threshold
@@ -92,7 +95,7 @@ class RepetSim(MaskSeparationBase):
             elif i == 1:
                 mask_data = np.minimum(mask_data, high_pass_masks[i].mask)
             
-            mask = self.mask_type(mask_data)
+            mask = self.make_mask(mask_data)
             self.result_masks.append(mask)
 
         return self.result_masks
@@ -145,18 +148,18 @@ class RepetSim(MaskSeparationBase):
         Returns:
             similarity_indices (list of lists): similarity indices for all time frames
         """
-        similarity_indices = []
-        for i in range(self.audio_signal.stft_length):
-            cur_indices = utils.find_peak_indices(
-                self.similarity_matrix[i, :], self.max_repeating_frames,
-                min_dist=self.min_distance_between_frames,
-                threshold=self.similarity_threshold)
-
-            # the first peak is always itself so we throw it out
-            # we also want only self.max_repeating_frames peaks
-            # so +1 for 0-based, and +1 for the first peak we threw out
-            cur_indices = cur_indices[1:self.max_repeating_frames + 2]
-            similarity_indices.append(cur_indices)
+        similarity_indices = utils.find_peak_indices_batch(
+            self.similarity_matrix[:self.audio_signal.stft_length], 
+            self.max_repeating_frames, min_dist=self.min_distance_between_frames,
+            threshold=self.similarity_threshold)
+
+        # the first peak is always itself so we throw it out
+        # we also want only self.max_repeating_frames peaks
+        # so +1 for 0-based, and +1 for the first peak we threw out
+        similarity_indices = [
+            cur_indices[1:self.max_repeating_frames + 2] 
+            for cur_indices in similarity_indices
+        ]
 
         return similarity_indices
 
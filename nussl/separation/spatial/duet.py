@@ -59,6 +59,11 @@ class Duet(MaskSeparationBase):
         p (int): Weight the histogram with the symmetric attenuation estimator.
 
         q (int): Weight the histogram with the delay estimato
+
+        mask_type (str): Type of mask to use. Defaults to 'binary'.
+
+        mask_storage (str): Compact in-memory representation for the masks (see
+          MaskSeparationBase).
         
     Notes:
 
@@ -106,10 +111,10 @@ class Duet(MaskSeparationBase):
                  attenuation_min=-3, attenuation_max=3, num_attenuation_bins=50,
                  delay_min=-3, delay_max=3, num_delay_bins=50,
                  peak_threshold=0.0, attenuation_min_distance=5, delay_min_distance=5, 
-                 p=1, q=0, mask_type='binary'):
+                 p=1, q=0, mask_type='binary', mask_storage=None):
         super().__init__(
             input_audio_signal=input_audio_signal,
-            mask_type=mask_type)
+            mask_type=mask_type, mask_storage=mask_storage)
 
         self.num_sources = num_sources
         self.attenuation_min = attenuation_min
@@ -325,7 +330,7 @@ class Duet(MaskSeparationBase):
             score = np.abs(self.atn_peak[i] * phase * self.stft_ch0 - self.stft_ch1) ** 2 / (1 + self.atn_peak[i] ** 2)
             mask = (score < best_so_far)
             mask_array[mask] = True
-            background_mask = self.mask_type(np.array(mask_array))
+            background_mask = self.make_mask(np.array(mask_array))
             self.result_masks.append(background_mask)
             self.result_masks[0].mask = np.logical_xor(self.result_masks[i].mask, self.result_masks[0].mask)
             best_so_far[mask] = score[mask]
@@ -21,6 +21,7 @@ setup(
         'Natural Language :: English',
         'Operating System :: OS Independent',
         'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
         'Topic :: Artistic Software',
         'Topic :: Multimedia',
         'Topic :: Multimedia :: Sound/Audio',
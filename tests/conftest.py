@@ -13,6 +13,7 @@ from nussl import datasets
 import numpy as np
 import torch
 import json
+import soundfile
 
 
 def _unzip(path_to_zip, target_path):
@@ -91,6 +92,22 @@ def mix_source_folder(toy_datasets):
         yield _dir
 
 
+@pytest.fixture
+def variable_length_folder():
+    sample_rate = 8000
+    rng = np.random.RandomState(0)
+    durations = rng.uniform(0.1, 2.0, size=23)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for folder in ['mix', 's1', 's2']:
+            os.makedirs(os.path.join(tmpdir, folder))
+        for i, duration in enumerate(durations):
+            num_samples = int(duration * sample_rate)
+            for folder in ['mix', 's1', 's2']:
+                soundfile.write(os.path.join(tmpdir, folder, f'{i:02d}.wav'),
+                                rng.rand(num_samples) - .5, sample_rate)
+        yield tmpdir
+
+
 @pytest.fixture(scope="module")
 def scaper_folder(toy_datasets):
     wsj_sources = toy_datasets['babywsj_oW0F0H9.zip']
@@ -266,6 +266,42 @@ def test_peak_normalize():
 
     assert sig.audio_data.max() == 1.0
 
+def test_dtype_policy():
+    num_samples = nussl.constants.DEFAULT_SAMPLE_RATE  # 1 second
+    int_data = (np.random.randn(2, num_samples) * 1000).astype('int16')
+
+    sig = nussl.AudioSignal(audio_data_array=int_data)
+    assert sig.dtype is None
+    assert sig.audio_data.dtype == np.float64
+    assert sig.stft().dtype == np.complex128
+
+    sig = nussl.AudioSignal(audio_data_array=int_data, dtype='float32')
+    assert sig.audio_data.dtype == np.float32
+    assert sig.stft().dtype == np.complex64
+    assert sig.istft().dtype == np.float32
+
+    mask = nussl.core.masks.SoftMask(np.random.rand(*sig.stft_data.shape))
+    assert sig.apply_mask(mask).stft_data.dtype == np.complex64
+
+    sig.dtype = 'float64'
+    assert sig.audio_data.dtype == np.float64
+    assert sig.stft_data.dtype == np.complex128
+
+    nussl.constants.DEFAULT_DTYPE = 'float32'
+    try:
+        sig = nussl.AudioSignal(audio_data_array=np.random.randn(num_samples))
+        assert sig.audio_data.dtype == np.float32
+        assert sig.stft().dtype == np.complex64
+
+        sig = nussl.AudioSignal(
+            audio_data_array=np.random.randn(num_samples), dtype='float64')
+        assert sig.audio_data.dtype == np.float64
+    finally:
+        nussl.constants.DEFAULT_DTYPE = None
+
+    pytest.raises(ValueError, nussl.AudioSignal, dtype='int16')
+
+
 def test_to_mono():
     """
     Test functionality and correctness of AudioSignal.to_mono() function.
@@ -377,6 +413,58 @@ def test_active_region(benchmark_audio):
     assert a.active_region_is_default
 
 
+def test_region_view():
+    audio_data = np.random.randn(2, length)
+    signal = nussl.AudioSignal(audio_data_array=audio_data)
+    start, end = sr, 2 * sr
+    region = nussl.AudioSignal(audio_data_array=audio_data[:, start:end].copy())
+
+    view = signal.make_region_view(start, end)
+    assert view.is_view
+    assert not signal.is_view
+    assert view.signal_length == end - start
+    assert np.shares_memory(view.audio_data, signal.audio_data)
+
+    assert np.allclose(view.stft(), region.stft())
+    assert np.allclose(view.istft(overwrite=False), region.istft(overwrite=False))
+    assert np.allclose(view.rms(), region.rms())
+    assert np.allclose(view.to_mono(overwrite=False).audio_data, region.to_mono(overwrite=False).audio_data)
+    assert np.allclose((view + view).audio_data, 2 * region.audio_data)
+    assert np.allclose((view - view).audio_data, 0)
+
+    nested = view.make_region_view(10, 20)
+    assert np.array_equal(nested.audio_data, audio_data[:, start + 10:start + 20])
+
+    # mutation detaches the view from the shared buffer
+    view.zero_pad(10, 10)
+    assert not view.is_view
+    assert view.signal_length == end - start + 20
+    assert signal.signal_length == length
+    assert np.array_equal(signal.audio_data, audio_data)
+
+    view = signal.make_region_view(start, end)
+    view.apply_gain(2)
+    assert not view.is_view
+    assert np.array_equal(signal.audio_data, audio_data)
+
+    # setting the region of a view never exposes the rest of the shared buffer
+    view = signal.make_region_view(start, end)
+    view.set_active_region_to_default()
+    assert not view.is_view
+    assert np.array_equal(view.audio_data, region.audio_data)
+    view.audio_data[:] = 0
+    assert np.array_equal(signal.audio_data, audio_data)
+
+    view = signal.make_region_view(start, end)
+    view.set_active_region(10, 20)
+    assert not view.is_view
+    assert np.array_equal(view.audio_data, audio_data[:, start + 10:start + 20])
+    view.set_active_region_to_default()
+    assert view.signal_length == end - start
+
+    pytest.raises(AudioSignalException, nussl.AudioSignal().make_region_view, 0, 10)
+
+
 def test_audio_signal_copy(benchmark_audio):
     for key, path in benchmark_audio.items():
         signal = nussl.AudioSignal(path)
@@ -170,6 +170,117 @@ def test_mask_arithmetic():
     assert r1 != r2
 
 
+def test_mask_dtype():
+    m1 = np.random.rand(1025, 400, 1)
+    s1 = SoftMask(m1, dtype='float32')
+    assert s1.dtype == np.float32
+    assert (s1 + s1).dtype == np.float32
+    assert (s1 * 2).dtype == np.float32
+    assert s1.invert_mask().dtype == np.float32
+
+    assert SoftMask(mask_shape=(10, 10), dtype='float32').dtype == np.float32
+    assert SoftMask.ones((10, 10), dtype='float32').dtype == np.float32
+    assert BinaryMask.zeros((10, 10), dtype='float32').dtype == bool
+    assert SoftMask(m1).dtype == np.float64
+
+    pytest.raises(ValueError, SoftMask, m1, dtype='int16')
+
+
+def test_packed_binary_mask():
+    mask_data = np.random.rand(1025, 400, 2) > .5
+    other_data = np.random.rand(1025, 400, 2) > .5
+
+    packed = BinaryMask(mask_data, storage='packed')
+    assert packed.storage == 'packed'
+    assert packed.nbytes == mask_data.nbytes // 8
+    assert packed.shape == mask_data.shape
+    assert packed.num_channels == 2
+    assert packed.dtype == bool
+    assert np.array_equal(packed.mask, mask_data)
+    assert np.array_equal(packed.get_channel(1), mask_data[..., 1])
+    assert packed == BinaryMask(mask_data)
+
+    inverted = packed.invert_mask()
+    assert inverted.storage == 'packed'
+    assert np.array_equal(inverted.mask, np.logical_not(mask_data))
+
+    summed = packed + BinaryMask(other_data, storage='packed')
+    assert summed.storage == 'packed'
+    assert np.array_equal(summed.mask, mask_data | other_data)
+    assert np.array_equal((packed + other_data).mask, mask_data | other_data)
+
+    packed.mask = other_data
+    assert np.array_equal(packed.mask, other_data)
+
+    # writes to the decompressed copy would be lost, so they fail
+    with pytest.raises(ValueError):
+        packed.mask[0, 0, 0] = True
+    with pytest.raises(ValueError):
+        packed.get_channel(0)[0, 0] = True
+
+    pytest.raises(ValueError, BinaryMask, mask_data, storage='uint8')
+    pytest.raises(ValueError, SoftMask, mask_data.astype(float), storage='packed')
+
+
+@pytest.mark.parametrize("storage,tol", [('float16', 1e-3), ('uint8', 1 / 255)])
+def test_compact_soft_mask(storage, tol, monkeypatch):
+    m1 = np.random.rand(1025, 400, 2)
+    m2 = np.random.rand(1025, 400, 2)
+    s1 = SoftMask(m1, storage=storage)
+    s2 = SoftMask(m2, storage=storage)
+
+    assert s1.storage == storage
+    assert s1.nbytes < m1.nbytes
+    assert s1.shape == m1.shape
+    assert np.allclose(s1.mask, m1, atol=tol)
+    assert np.allclose(s1.get_channel(1), m1[..., 1], atol=tol)
+
+    assert np.allclose((s1 * 2).mask, m1 * 2, atol=2 * tol)
+    assert np.allclose((s1 / 2).mask, m1 / 2, atol=tol)
+    assert np.allclose((s1 + s2).mask, m1 + m2, atol=2 * tol)
+    assert np.allclose((s1 - s2).mask, m1 - m2, atol=2 * tol)
+    assert (s1 + s2).storage == storage
+    assert np.allclose(s1.invert_mask().mask, 1 - m1, atol=tol)
+    # negative factors flip the quantization range, so the mask is quantized again
+    assert np.allclose((s1 * -1).mask, -m1, atol=tol)
+    assert np.allclose((s1 * -0.5 + s2).mask, m2 - m1 / 2, atol=2 * tol)
+
+    # decompressed in the precision of the mask
+    assert s1.mask.dtype == np.float64
+    s3 = SoftMask(m1, storage=storage, dtype='float32')
+    assert s3.mask.dtype == np.float32
+    assert s3.get_channel(0).dtype == np.float32
+
+    # the dtype is known without decompressing, and the features of an ensemble
+    # decompress each mask once
+    decompressed = []
+    _decompress = SoftMask._decompress
+
+    def counting_decompress(self, ch=None):
+        decompressed.append(ch)
+        return _decompress(self, ch)
+    monkeypatch.setattr(SoftMask, '_decompress', counting_decompress)
+    assert s3.dtype == np.float32 and s1.dtype == np.float64
+    assert not decompressed
+    features = nussl.separation.composite.EnsembleClustering.\
+        _extract_features_from_masks([s1, s3])
+    assert features.dtype == np.float64
+    assert decompressed == [None, None]
+    monkeypatch.undo()
+
+    # writes to the decompressed copy would be lost, so they fail
+    with pytest.raises(ValueError):
+        s1.mask[0, 0, 0] = 0.5
+
+    binary = s1.mask_to_binary(0.5)
+    assert np.mean(binary.mask == (m1 > 0.5)) > .99
+
+    stft = nussl.utils.complex_randn(m1.shape)
+    signal = nussl.AudioSignal(stft=stft)
+    masked = signal.apply_mask(s1)
+    assert np.allclose(masked.stft_data, stft * m1, atol=4 * tol)
+
+
 def test_masks_sum_to_mix(benchmark_audio):
     for key, path in benchmark_audio.items():
         signal = nussl.AudioSignal(path)
@@ -46,3 +46,25 @@ def test_delay_audio_signal(mix_and_sources):
     pytest.raises(ValueError, nussl.mixing.delay_audio_signal, mix, [0, 0, 0])
     pytest.raises(ValueError, nussl.mixing.delay_audio_signal, mix, [0, -10, 0])
     pytest.raises(ValueError, nussl.mixing.delay_audio_signal, mix, [0, .1, 2.0])
+
+
+def test_pan_and_delay_audio_batched():
+    np.random.seed(0)
+    audio = np.random.randn(8, 1, 1000)
+    angles = np.random.uniform(-45, 45, size=8)
+    delays = np.random.randint(0, 100, size=(8, 2))
+
+    panned = nussl.mixing.pan_audio(audio, angles)
+    delayed = nussl.mixing.delay_audio(panned, delays)
+    assert panned.shape == delayed.shape == (8, 2, 1000)
+
+    for i in range(8):
+        signal = nussl.AudioSignal(audio_data_array=audio[i], sample_rate=8000)
+        signal = nussl.mixing.pan_audio_signal(signal, angles[i])
+        assert np.allclose(panned[i], signal.audio_data)
+        signal = nussl.mixing.delay_audio_signal(signal, delays[i].tolist())
+        assert np.allclose(delayed[i], signal.audio_data)
+
+    pytest.raises(ValueError, nussl.mixing.pan_audio, audio, [0, 50])
+    pytest.raises(ValueError, nussl.mixing.delay_audio, audio, -1)
+    pytest.raises(ValueError, nussl.mixing.delay_audio, audio, 1.5)
@@ -63,10 +63,16 @@ def test_musdb_fail_to_import(monkeypatch):
 
     def reimport_nussl():
         importlib.reload(nussl)
+        return nussl.musdb
 
+    musdb = vars(nussl).pop('musdb', None)
     monkeypatch.setattr(builtins, '__import__', mocked_import)
     pytest.warns(UserWarning, reimport_nussl)
+    assert nussl.musdb is None
     monkeypatch.undo()
+    vars(nussl).pop('musdb')
+    if musdb is not None:
+        nussl.musdb = musdb
 
 def test_play_audio():
     audio_signal = nussl.AudioSignal(
@@ -84,6 +84,34 @@ def test_utils_find_peak_indices():
         ValueError, nussl.utils.find_peak_indices, np.ones((10, 10, 10)), 3, min_dist=0)
 
 
+def test_utils_find_peak_indices_batch():
+    np.random.seed(0)
+    batch = np.random.rand(50, 100)
+    peaks = nussl.utils.find_peak_indices_batch(batch, 5, min_dist=3, threshold=0.2)
+    assert len(peaks) == 50
+    for row, row_peaks in zip(batch, peaks):
+        assert row_peaks == nussl.utils.find_peak_indices(
+            row, 5, min_dist=3, threshold=0.2)
+        assert all(abs(a - b) > 3 for a in row_peaks for b in row_peaks if a != b)
+
+    # fractional distances (e.g. seconds converted to hops)
+    peaks = nussl.utils.find_peak_indices_batch(batch, 5, min_dist=2.5)
+    for row, row_peaks in zip(batch, peaks):
+        assert row_peaks == nussl.utils.find_peak_indices(row, 5, min_dist=2.5)
+
+    # rows run out of peaks at different times
+    batch = np.zeros((2, 10))
+    batch[0, [1, 5, 9]] = 1
+    batch[1, 5] = 1
+    peaks = nussl.utils.find_peak_indices_batch(batch, 3, min_dist=1)
+    assert peaks == [[1, 5, 9], [5]]
+
+    pytest.raises(
+        ValueError, nussl.utils.find_peak_indices_batch, np.ones(10), 3)
+    pytest.raises(
+        ValueError, nussl.utils.find_peak_indices_batch, batch, 3, threshold=1.1)
+
+
 def test_utils_complex_randn():
     mat = nussl.utils.complex_randn((100, 100))
     assert (mat.shape == (100, 100))
@@ -317,3 +317,129 @@ def test_dataset_base_with_caching(benchmark_audio, monkeypatch):
                 for key, val in _output.items():
                     if torch.is_tensor(val):
                         assert val.shape[0] == L
+
+
+class RandomDataset(BaseDataset):
+    def get_items(self, folder):
+        return list(range(8))
+
+    def process_item(self, item):
+        sources = {
+            k: self._load_audio_from_array(np.random.randn(1, 8000), 8000)
+            for k in ['s1', 's2']
+        }
+        return {'mix': sum(sources.values()), 'sources': sources}
+
+
+def test_dataset_base_profiler():
+    tfm = transforms.Compose([
+        transforms.MagnitudeSpectrumApproximation(),
+        transforms.ToSeparationModel(),
+    ])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profiler = transforms.TransformProfiler(folder=tmpdir, flush_every=1)
+        dataset = RandomDataset('none', transform=tfm, profiler=profiler)
+        for i in range(len(dataset)):
+            dataset[i]
+
+        stats = profiler.stats
+        assert list(stats.keys()) == [
+            'process_item', 'MagnitudeSpectrumApproximation', 'ToSeparationModel']
+        assert all(stats[k]['count'] == len(dataset) for k in stats)
+
+        # each DataLoader worker writes its own statistics to the folder
+        profiler.reset()
+        dataloader = torch.utils.data.DataLoader(
+            dataset, batch_size=2, num_workers=2)
+        for _ in dataloader:
+            pass
+        assert not profiler.stats
+
+        collected = profiler.collect()
+        assert all(collected.stats[k]['count'] == len(dataset) for k in stats)
+
+        dataset = RandomDataset(
+            'none', transform=transforms.MagnitudeSpectrumApproximation(),
+            profiler=transforms.TransformProfiler())
+        dataset[0]
+        assert list(dataset.profiler.stats.keys()) == [
+            'process_item', 'MagnitudeSpectrumApproximation']
+
+
+def test_dataset_base_filter_items_by_info(variable_length_folder, monkeypatch):
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder)
+    durations = {
+        item: dataset.process_item(item)['mix'].signal_duration
+        for item in dataset.items
+    }
+    expected = [item for item in dataset.items if durations[item] >= 1.0]
+
+    # item info is read from the headers, nothing is loaded
+    def fail(self, item):
+        raise RuntimeError()
+    monkeypatch.setattr(nussl.datasets.MixSourceFolder, 'process_item', fail)
+
+    def remove_short_audio(self, item):
+        return self.item_info(item)['duration'] >= 1.0
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = os.path.join(tmpdir, 'filter.yml')
+        for num_workers in [0, 2]:
+            dataset.items = dataset.get_items(variable_length_folder)
+            dataset._item_info = {}
+            dataset.filter_items_by_condition(
+                remove_short_audio, num_workers=num_workers)
+            assert dataset.items == expected
+            # info read by the workers is kept
+            assert len(dataset._item_info) == len(durations)
+            info = dataset.item_info(expected[0])
+            assert np.allclose(info['duration'], durations[expected[0]])
+            assert info['num_channels'] == 1
+            assert info['sample_rate'] == 8000
+
+        dataset.items = dataset.get_items(variable_length_folder)
+        dataset.filter_items_by_condition(remove_short_audio, cache_path=cache_path)
+        assert dataset.items == expected
+        assert os.path.exists(cache_path)
+
+        # results are read from the cache
+        dataset.items = dataset.get_items(variable_length_folder)
+        dataset.filter_items_by_condition(fail, cache_path=cache_path)
+        assert dataset.items == expected
+
+
+class _ObjectItem:
+    # compared by identity, so copies sent back by workers are different keys
+    def __init__(self, duration):
+        self.duration = duration
+
+    def __str__(self):
+        return f'item_{self.duration}'
+
+
+class ObjectItemDataset(BaseDataset):
+    def get_items(self, folder):
+        return [_ObjectItem(d) for d in range(8)]
+
+    def process_item(self, item):
+        mix = self._load_audio_from_array(np.zeros((1, 8000)), 8000)
+        return {'mix': mix, 'sources': {'s1': mix}}
+
+    def get_item_info(self, item):
+        return {'duration': item.duration, 'num_channels': 1, 'sample_rate': 8000}
+
+
+def test_dataset_base_filter_items_object_items():
+    def remove_short_items(self, item):
+        return self.item_info(item)['duration'] >= 3
+
+    for num_workers in [0, 2]:
+        dataset = ObjectItemDataset('none')
+        items = dataset.items
+        dataset.filter_items_by_condition(
+            remove_short_items, num_workers=num_workers)
+        assert dataset.items == items[3:]
+        # item info is kept under the dataset's own items
+        assert len(dataset._item_info) == len(items)
+        assert all(item in dataset._item_info for item in items)
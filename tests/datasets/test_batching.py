@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+import torch
+
+import nussl
+from nussl.datasets import BucketBatchSampler, pad_collate
+
+
+def test_dataset_get_durations(variable_length_folder, monkeypatch):
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder)
+    durations = dataset.get_durations()
+    expected = [
+        dataset.process_item(item)['mix'].signal_duration for item in dataset.items]
+    assert np.allclose(durations, expected)
+
+    # durations are read once and kept
+    def fail(self, item):
+        raise RuntimeError()
+    monkeypatch.setattr(nussl.datasets.MixSourceFolder, 'get_item_duration', fail)
+    dataset.items = dataset.items[::2]
+    assert np.allclose(dataset.get_durations(), expected[::2])
+
+    # get_item_duration can still be overridden on its own
+    monkeypatch.setattr(nussl.datasets.MixSourceFolder, 'get_item_info', fail)
+    monkeypatch.setattr(
+        nussl.datasets.MixSourceFolder, 'get_item_duration', lambda self, item: 1.0)
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder)
+    assert dataset.get_durations() == [1.0] * len(dataset)
+
+    monkeypatch.undo()
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder, make_mix=True)
+    info = dataset.item_info(dataset.items[0])
+    assert info == nussl.datasets.BaseDataset.get_item_info(dataset, dataset.items[0])
+    assert np.allclose(info['duration'], expected[0])
+
+
+def test_bucket_batch_sampler(variable_length_folder):
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder)
+    durations = np.array(dataset.get_durations())
+    order = np.argsort(durations)
+
+    sampler = BucketBatchSampler(dataset, batch_size=4, num_buckets=3, seed=0)
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(sum(batches, [])) == list(range(len(dataset)))
+    for batch in batches:
+        assert len(batch) <= 4
+        ranks = [np.where(order == i)[0][0] for i in batch]
+        buckets = {r * 3 // len(dataset) for r in ranks}
+        assert len(buckets) == 1
+
+    # same seed and epoch, same batches
+    assert batches == list(BucketBatchSampler(
+        dataset, batch_size=4, num_buckets=3, seed=0))
+    sampler.set_epoch(1)
+    assert batches != list(sampler)
+
+    # padding is much less than with random batches
+    def padding(batches):
+        return sum(durations[b].max() * len(b) - durations[b].sum() for b in batches)
+    random_batches = np.array_split(np.random.permutation(len(dataset)), len(batches))
+    assert padding(batches) < padding(random_batches)
+
+    sampler = BucketBatchSampler(dataset, batch_size=4, num_buckets=3, drop_last=True)
+    assert all(len(b) == 4 for b in sampler)
+    assert len(list(sampler)) == len(sampler)
+
+    sampler = BucketBatchSampler(dataset, batch_size=4, shuffle=False, num_buckets=1)
+    batches = list(sampler)
+    assert sum(batches, []) == order.tolist()
+
+    sampler = BucketBatchSampler(dataset, batch_size=8, max_duration=4.0, seed=0)
+    for epoch in range(5):
+        sampler.set_epoch(epoch)
+        batches = list(sampler)
+        assert len(batches) == len(sampler)
+        assert sorted(sum(batches, [])) == list(range(len(dataset)))
+        for batch in batches:
+            assert len(batch) == 1 or durations[batch].max() * len(batch) <= 4.0
+    sampler = BucketBatchSampler(dataset, batch_size=8, max_duration=4.0)
+    assert all(len(list(sampler)) == len(sampler) for _ in range(5))
+
+    # batches that max_duration cut short are kept with drop_last, but not those 
+    # that are short because the bucket ran out of items
+    sampler = BucketBatchSampler(
+        list(range(4)), batch_size=8, num_buckets=1, max_duration=2.0, 
+        drop_last=True, durations=[1.0] * 4)
+    assert sorted(len(b) for b in sampler) == [2, 2]
+    sampler = BucketBatchSampler(
+        list(range(3)), batch_size=8, num_buckets=1, max_duration=2.0, 
+        drop_last=True, durations=[1.0] * 3)
+    assert [len(b) for b in sampler] == [2] and len(sampler) == 1
+
+    pytest.raises(ValueError, BucketBatchSampler, dataset, batch_size=0)
+    pytest.raises(ValueError, BucketBatchSampler, dataset, 4, num_buckets=0)
+    pytest.raises(ValueError, BucketBatchSampler, dataset, 4, durations=[1.0])
+
+
+def test_pad_collate(variable_length_folder):
+    tfm = nussl.datasets.transforms.Compose([
+        nussl.datasets.transforms.PhaseSensitiveSpectrumApproximation(),
+        nussl.datasets.transforms.GetAudio(),
+        nussl.datasets.transforms.ToSeparationModel(),
+    ])
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder, transform=tfm)
+    sampler = BucketBatchSampler(dataset, batch_size=4, seed=0)
+    dataloader = torch.utils.data.DataLoader(
+        dataset, batch_sampler=sampler, collate_fn=pad_collate)
+
+    for batch_indices, batch in zip(sampler, dataloader):
+        items = [dataset[i] for i in batch_indices]
+        assert batch['index'].tolist() == batch_indices
+        for key in ['mix_magnitude', 'source_magnitudes', 'mix_audio', 'source_audio']:
+            lengths = [item[key].shape for item in items]
+            max_shape = tuple(max(d) for d in zip(*lengths))
+            assert batch[key].shape == (len(items), *max_shape)
+            assert batch[f'{key}_lengths'].dtype == torch.long
+            assert batch[f'{key}_lengths'].tolist() == [list(s) for s in lengths]
+            for i, item in enumerate(items):
+                region = tuple(slice(0, d) for d in item[key].shape)
+                assert torch.allclose(batch[key][i][region], item[key])
+                assert batch[key][i].abs().sum() == pytest.approx(
+                    item[key].abs().sum().item(), rel=1e-5)
+
+    batch = pad_collate([
+        {'x': np.ones((2, 3)), 'y': 1}, {'x': np.ones((2, 3)), 'y': 2}])
+    assert batch['x'].shape == (2, 2, 3)
+    assert batch['y'].tolist() == [1, 2]
+    assert batch['x_lengths'].tolist() == [[2, 3], [2, 3]]
+    assert 'y_lengths' not in batch
+    pytest.raises(ValueError, pad_collate, [
+        {'x': torch.ones(2, 3)}, {'x': torch.ones(2)}])
@@ -9,6 +9,7 @@ from yaml import Dumper
 from nussl.datasets.base_dataset import DataSetException
 from nussl.datasets import transforms
 import tempfile
+import json
 import shutil
 
 
@@ -35,6 +36,88 @@ def test_dataset_hook_musdb18(musdb_tracks):
         assert k.split('::')[0] in data['metadata']['labels']
 
 
+
+class _FakeMUSDBTrack:
+    def __init__(self, name, num_samples=4410, rate=44100):
+        self.name = name
+        self.subset = 'train'
+        self.rate = rate
+        self.sources = {
+            k: type('Source', (), {'stem_id': i + 1})
+            for i, k in enumerate(['drums', 'bass', 'other', 'vocals'])
+        }
+        # float64, like the stems decoded by musdb
+        self._stems = np.random.rand(5, num_samples, 2)
+        self.num_decodes = 0
+
+    @property
+    def stems(self):
+        self.num_decodes += 1
+        return self._stems
+
+    @property
+    def audio(self):
+        self.num_decodes += 1
+        return self._stems[0]
+
+
+def test_dataset_hook_musdb18_decoded_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = os.path.join(tmpdir, 'musdb')
+        cache = os.path.join(tmpdir, 'cache')
+        track = _FakeMUSDBTrack('track')
+
+        dataset = nussl.datasets.MUSDB18(folder=folder)
+        dataset.musdb = [track]
+        dataset.items = [0]
+        expected = dataset[0]
+
+        dataset = nussl.datasets.MUSDB18(folder=folder, decoded_cache=cache)
+        dataset.musdb = [track]
+        dataset.items = [0]
+
+        track.num_decodes = 0
+        for _ in range(3):
+            data = dataset[0]
+            assert np.allclose(data['mix'].audio_data, expected['mix'].audio_data)
+            for k, v in expected['sources'].items():
+                assert np.allclose(data['sources'][k].audio_data, v.audio_data)
+                assert data['sources'][k].path_to_input_file == v.path_to_input_file
+            assert list(data['sources']) == list(expected['sources'])
+            # the same precision with and without the cache
+            assert data['mix'].audio_data.dtype == expected['mix'].audio_data.dtype
+        assert track.num_decodes == 1
+
+        dataset = nussl.datasets.MUSDB18(
+            folder=folder, decoded_cache=cache, dtype='float32')
+        dataset.musdb = [track]
+        dataset.items = [0]
+        assert dataset[0]['mix'].audio_data.dtype == np.float32
+        assert os.path.exists(os.path.join(cache, 'train', 'track', 'vocals.f32'))
+
+        dataset = nussl.datasets.MUSDB18(
+            folder=folder, decoded_cache=cache, excerpt_duration=0.01)
+        dataset.musdb = [track]
+        dataset.items = [0]
+        data = dataset[0]
+        assert data['mix'].signal_length == 441
+        mix = expected['mix'].audio_data
+        offset = np.where(np.all(np.isclose(
+            mix[:, :, None], data['mix'].audio_data[:, :1, None]), axis=0))[0][0]
+        for k, v in expected['sources'].items():
+            assert np.allclose(
+                data['sources'][k].audio_data, v.audio_data[:, offset:offset + 441])
+        assert track.num_decodes == 1
+
+        dataset = nussl.datasets.MUSDB18(folder=folder, excerpt_duration=1.0)
+        dataset.musdb = [track]
+        dataset.items = [0]
+        assert dataset[0]['mix'].signal_length == 4410
+
+        pytest.raises(DataSetException, nussl.datasets.MUSDB18, 
+                      folder=folder, excerpt_duration=0)
+
+
 def test_dataset_hook_mix_source_folder(mix_source_folder):
     dataset = nussl.datasets.MixSourceFolder(mix_source_folder)
     data = dataset[0]
@@ -357,6 +440,180 @@ def test_dataset_hook_fuss(scaper_folder):
         fuss = nussl.datasets.FUSS(tmpdir)
 
 
+
+def _make_scaper_jams(folder, n_mixtures=4, sample_rate=8000, duration=1, fuss=False):
+    # makes JAMS files with scaper (without rendering the audio, which needs SoX)
+    # and writes the audio they point to directly
+    import scaper
+    import soundfile as sf
+    import warnings
+
+    fg_path = os.path.join(folder, 'fg')
+    for label in ['cat', 'dog']:
+        os.makedirs(os.path.join(fg_path, label))
+        sf.write(os.path.join(fg_path, label, '0.wav'),
+                 np.random.rand(sample_rate * duration), sample_rate)
+
+    output_dir = os.path.join(folder, 'out')
+    os.makedirs(output_dir)
+    for i in range(n_mixtures):
+        sc = scaper.Scaper(duration, fg_path, fg_path, random_state=i)
+        sc.sr = sample_rate
+        for _ in range(2):
+            sc.add_event(
+                label=('choose', []), source_file=('choose', []),
+                source_time=('const', 0), event_time=('const', 0),
+                event_duration=('const', duration), snr=('const', 0),
+                pitch_shift=None, time_stretch=None)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            jam = sc._instantiate(disable_instantiation_warnings=True)
+        ann = jam.annotations.search(namespace='scaper')[0]
+
+        mix_path = os.path.join(output_dir, f'{i}.wav')
+        source_paths = [
+            os.path.join(output_dir, f'{i}_events', f'event{j}.wav') for j in range(2)]
+        os.makedirs(os.path.join(output_dir, f'{i}_events'))
+        sources = np.random.rand(2, sample_rate * duration)
+        for source, path in zip(sources, source_paths):
+            sf.write(path, source, sample_rate)
+        sf.write(mix_path, sources.sum(axis=0), sample_rate)
+
+        if fuss:
+            # FUSS paths are relative to some other machine
+            mix_path = mix_path.replace(output_dir, '/some/other/machine')
+            source_paths = [
+                p.replace(output_dir, '/some/other/machine') for p in source_paths]
+        ann.sandbox.scaper.update(
+            soundscape_audio_path=mix_path, isolated_events_audio_path=source_paths)
+        jam.save(os.path.join(output_dir, f'{i}.jams'))
+    return output_dir
+
+
+def test_dataset_hook_scaper_annotation_cache(monkeypatch):
+    import jams
+    num_loads = []
+    jams_load = jams.load
+
+    def counting_load(*args, **kwargs):
+        num_loads.append(args[0])
+        return jams_load(*args, **kwargs)
+    monkeypatch.setattr(jams, 'load', counting_load)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = _make_scaper_jams(tmpdir)
+        index_path = os.path.join(folder, '.nussl_annotations.json')
+
+        expected = nussl.datasets.Scaper(folder)
+        expected = [expected[i] for i in range(len(expected))]
+        expected_jams = nussl.datasets.Scaper(folder, load_jam=True)
+        expected_jams = [expected_jams[i] for i in range(len(expected_jams))]
+        assert expected[0]['metadata']['scaper']['event_labels'] == [
+            e.value['label'] for e in 
+            expected_jams[0]['metadata']['scaper'].annotations[0]]
+        assert not os.path.exists(index_path)
+
+        num_loads.clear()
+        dataset = nussl.datasets.Scaper(folder, annotation_cache=True)
+        assert len(num_loads) == 4
+        assert os.path.exists(index_path)
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        assert sorted(index['annotations']) == [
+            os.path.abspath(os.path.join(folder, item)) for item in dataset.items]
+        assert 'jam' not in index['annotations'][
+            os.path.abspath(os.path.join(folder, '0.jams'))]
+
+        for _ in range(2):
+            num_loads.clear()
+            dataset = nussl.datasets.Scaper(folder, annotation_cache=True)
+            for i in range(len(dataset)):
+                data = dataset[i]
+                assert list(data['sources']) == list(expected[i]['sources'])
+                for k in data['sources']:
+                    assert np.allclose(data['sources'][k].audio_data,
+                                       expected[i]['sources'][k].audio_data)
+                assert np.allclose(data['mix'].audio_data, expected[i]['mix'].audio_data)
+                assert data['metadata']['labels'] == expected[i]['metadata']['labels']
+                assert data['metadata']['scaper'] == expected[i]['metadata']['scaper']
+            assert dataset.item_info(dataset.items[0])['duration'] == 1.0
+            # items are loaded from the index alone
+            assert len(num_loads) == 0
+
+        # the JAMS objects are only read on request
+        dataset = nussl.datasets.Scaper(folder, annotation_cache=True, load_jam=True)
+        for i in range(len(dataset)):
+            num_loads.clear()
+            data = dataset[i]
+            assert num_loads == [os.path.join(folder, dataset.items[i])]
+            assert data['metadata']['scaper'] == expected_jams[i]['metadata']['scaper']
+
+        # modified files are parsed again
+        jam = jams.load(os.path.join(folder, '1.jams'))
+        jam.file_metadata.title = 'modified'
+        jam.save(os.path.join(folder, '1.jams'))
+        stat = os.stat(os.path.join(folder, '1.jams'))
+        os.utime(os.path.join(folder, '1.jams'), 
+                 ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        num_loads.clear()
+        dataset = nussl.datasets.Scaper(folder, annotation_cache=True)
+        assert num_loads == [os.path.abspath(os.path.join(folder, '1.jams'))]
+        dataset = nussl.datasets.Scaper(folder, annotation_cache=True, load_jam=True)
+        assert dataset[1]['metadata']['scaper'].file_metadata.title == 'modified'
+
+        # an index that can't be read is rebuilt
+        with open(index_path, 'wb') as f:
+            f.write(b'\x80\x04not json')
+        num_loads.clear()
+        dataset = nussl.datasets.Scaper(folder, annotation_cache=True)
+        assert len(num_loads) == 4
+
+        # the index can be kept elsewhere, and shared by folders with the same
+        # file names
+        other = os.path.join(tmpdir, 'other')
+        shutil.copytree(folder, other)
+        os.remove(os.path.join(other, '.nussl_annotations.json'))
+        jam = jams.load(os.path.join(other, '0.jams'))
+        jam.file_metadata.title = 'other'
+        jam.save(os.path.join(other, '0.jams'))
+
+        cache_path = os.path.join(tmpdir, 'index.json')
+        for _ in range(2):
+            dataset = nussl.datasets.Scaper(
+                folder, annotation_cache=cache_path, load_jam=True)
+            other_dataset = nussl.datasets.Scaper(
+                other, annotation_cache=cache_path, load_jam=True)
+            assert dataset[0]['metadata']['scaper'].file_metadata.title != 'other'
+            assert other_dataset[0]['metadata']['scaper'].file_metadata.title == 'other'
+        with open(cache_path, 'r') as f:
+            assert len(json.load(f)['annotations']) == 8
+
+        # other arguments to BaseDataset can still be passed by position
+        tfm = transforms.MagnitudeSpectrumApproximation()
+        dataset = nussl.datasets.Scaper(folder, tfm, annotation_cache=True)
+        assert dataset.transform is tfm
+
+
+def test_dataset_hook_fuss_annotation_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = _make_scaper_jams(tmpdir, fuss=True, sample_rate=16000)
+        os.rename(folder, os.path.join(tmpdir, 'train'))
+
+        expected = nussl.datasets.FUSS(tmpdir)[0]
+        for _ in range(2):
+            dataset = nussl.datasets.FUSS(tmpdir, annotation_cache=True)
+            data = dataset[0]
+            assert data['mix'].path_to_input_file == os.path.join(
+                tmpdir, 'train', '0.wav')
+            assert data['metadata']['scaper'] == expected['metadata']['scaper']
+            assert data['metadata']['scaper']['mix_path'] == os.path.join(
+                tmpdir, 'train', '0.wav')
+            assert np.allclose(data['mix'].audio_data, expected['mix'].audio_data)
+            for k in expected['sources']:
+                assert np.allclose(data['sources'][k].audio_data,
+                                   expected['sources'][k].audio_data)
+
+
 def test_dataset_hook_on_the_fly():
     def make_sine_wave(freq, sample_rate, duration):
         dt = 1 / sample_rate
@@ -409,3 +666,109 @@ def test_dataset_hook_on_the_fly():
         return {'mix': 'no sources in this dict'}
     pytest.raises(DataSetException, nussl.datasets.OnTheFly,
                   bad_dict_sources_closure, 10)
+
+
+def test_dataset_hook_on_the_fly_batched():
+    sample_rate = 8000
+    n_sources = 2
+    np.random.seed(0)
+    signals = [
+        nussl.AudioSignal(
+            audio_data_array=np.random.randn(1, length), sample_rate=sample_rate)
+        for length in [4000, 8000, 12000, 1000]
+    ]
+    pool = nussl.datasets.SourcePool(signals, labels=['a', 'b', 'c', 'd'])
+    assert len(pool) == 4
+    assert pool.audio_data.shape == (1, 25000)
+
+    rng = np.random.default_rng(0)
+    excerpts, indices = pool.sample(rng, 20, 2000)
+    assert excerpts.shape == (20, 1, 2000)
+    for excerpt, idx in zip(excerpts, indices):
+        source = signals[idx].audio_data[0]
+        if idx == 3:
+            assert np.allclose(excerpt[0, :1000], source)
+            assert np.allclose(excerpt[0, 1000:], 0)
+        else:
+            # excerpt is a contiguous chunk of the source
+            start = np.argmin(np.abs(source - excerpt[0, 0]))
+            assert np.allclose(source[start:start + 2000], excerpt[0])
+
+    pytest.raises(DataSetException, nussl.datasets.SourcePool, [])
+    pytest.raises(DataSetException, nussl.datasets.SourcePool, [
+        signals[0], nussl.AudioSignal(
+            audio_data_array=np.random.randn(2, 100), sample_rate=sample_rate)])
+
+    calls = []
+
+    def make_mixes(dataset, indices):
+        calls.append(indices)
+        n = len(indices)
+        sources = {}
+        for i in range(n_sources):
+            audio, _ = pool.sample(dataset.rng, n, sample_rate // 2)
+            gain = dataset.rng.uniform(0.5, 1.0, size=(n, 1, 1))
+            angle = dataset.rng.uniform(-45, 45, size=n)
+            delays = dataset.rng.integers(0, 10, size=(n, 2))
+            sources[f's{i}'] = nussl.mixing.delay_audio(
+                nussl.mixing.pan_audio(gain * audio, angle), delays)
+        return {
+            'mix': sum(sources.values()),
+            'sources': sources,
+            'metadata': [{'index': i} for i in indices],
+        }
+
+    pytest.raises(DataSetException, nussl.datasets.OnTheFly,
+                  make_mixes, 10, batch_size=4)
+
+    dataset = nussl.datasets.OnTheFly(
+        make_mixes, 10, batch_size=4, seed=0, sample_rate=sample_rate)
+    assert len(dataset) == 10
+
+    # the first batch is made when the dataset is set up and then reused
+    items = [dataset[i] for i in range(len(dataset))]
+    assert calls == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    for i, item in enumerate(items):
+        assert item['metadata'] == {'index': i}
+        assert item['mix'].num_channels == 2
+        assert item['mix'].signal_length == sample_rate // 2
+        assert np.allclose(
+            item['mix'].audio_data, 
+            sum(item['sources'].values()).audio_data)
+
+    # deterministic, no matter the order items are generated in
+    other = nussl.datasets.OnTheFly(
+        make_mixes, 10, batch_size=4, seed=0, sample_rate=sample_rate)
+    for i in [9, 2, 5]:
+        assert np.allclose(other[i]['mix'].audio_data, items[i]['mix'].audio_data)
+
+    other = nussl.datasets.OnTheFly(
+        make_mixes, 10, batch_size=4, seed=1, sample_rate=sample_rate)
+    assert not np.allclose(other[0]['mix'].audio_data, items[0]['mix'].audio_data)
+
+    # a GeneratedBatchSampler shuffles the generated batches without splitting them
+    sampler = nussl.datasets.GeneratedBatchSampler(dataset, seed=0)
+    assert len(sampler) == 3
+    batches = list(sampler)
+    assert sorted(sorted(b) for b in batches) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    sampler.set_epoch(1)
+    assert list(sampler) != batches
+    assert len(nussl.datasets.GeneratedBatchSampler(dataset, drop_last=True)) == 2
+    assert list(nussl.datasets.GeneratedBatchSampler(dataset, shuffle=False)) == [
+        [0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    pytest.raises(ValueError, nussl.datasets.GeneratedBatchSampler, list(range(10)))
+
+    other = nussl.datasets.OnTheFly(
+        make_mixes, 10, batch_size=4, seed=0, sample_rate=sample_rate)
+    del calls[:]
+    for batch in nussl.datasets.GeneratedBatchSampler(other, seed=0):
+        for i in batch:
+            assert np.allclose(
+                other[i]['mix'].audio_data, items[i]['mix'].audio_data)
+    # at most one call per batch (the first batch may still be kept from set up)
+    assert len(calls) <= 3
+
+    def bad_batch_closure(dataset, indices):
+        return {'mix': np.zeros((1, 1, 100)), 'sources': {}}
+    pytest.raises(DataSetException, nussl.datasets.OnTheFly,
+                  bad_batch_closure, 10, batch_size=4, sample_rate=sample_rate)
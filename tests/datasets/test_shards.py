@@ -0,0 +1,134 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+import torch
+import yaml
+
+import nussl
+from nussl.datasets import ShardedDataset, write_shards, transforms
+from nussl.datasets.base_dataset import DataSetException
+
+
+def _check_same(data, expected):
+    assert np.allclose(data['mix'].audio_data, expected['mix'].audio_data)
+    assert data['mix'].sample_rate == expected['mix'].sample_rate
+    assert data['mix'].path_to_input_file == expected['mix'].path_to_input_file
+    assert list(data['sources']) == list(expected['sources'])
+    for k in expected['sources']:
+        assert np.allclose(
+            data['sources'][k].audio_data, expected['sources'][k].audio_data)
+    assert data['metadata'] == expected['metadata']
+
+
+def test_sharded_dataset(variable_length_folder):
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pytest.raises(DataSetException, ShardedDataset, tmpdir)
+
+        shards = write_shards(dataset, tmpdir, max_shard_size=200000)
+        assert len(shards) > 2
+        assert all(os.path.exists(s) for s in shards)
+
+        sharded = ShardedDataset(tmpdir)
+        assert len(sharded) == len(dataset)
+        for i in range(len(dataset)):
+            _check_same(sharded[i], dataset[i])
+        assert np.allclose(sharded.get_durations(), dataset.get_durations())
+        assert sharded.item_info(sharded.items[0]) == pytest.approx(
+            dataset.item_info(dataset.items[0]))
+
+        # indexes without a version only have the duration of each item
+        index_path = os.path.join(tmpdir, 'shards.yml')
+        with open(index_path, 'r') as f:
+            index = yaml.safe_load(f)
+        assert index.pop('version') == 2
+        for s in index['shards']:
+            s['items'] = [record[:3] for record in s['items']]
+        with open(index_path, 'w') as f:
+            yaml.safe_dump(index, f)
+        old = ShardedDataset(tmpdir)
+        assert np.allclose(old.get_durations(), dataset.get_durations())
+        assert old.item_info(old.items[0]) == pytest.approx(
+            dataset.item_info(dataset.items[0]))
+        _check_same(old[0], dataset[0])
+        old.close()
+
+        index['version'] = 100
+        with open(index_path, 'w') as f:
+            yaml.safe_dump(index, f)
+        pytest.raises(DataSetException, ShardedDataset, tmpdir)
+        shards = write_shards(dataset, tmpdir, max_shard_size=200000)
+
+        # sequential reading gives the items in order
+        for i, data in enumerate(sharded):
+            _check_same(data, dataset[i])
+
+        # written in parallel, the shards are the same
+        with tempfile.TemporaryDirectory() as other_dir:
+            write_shards(dataset, other_dir, max_shard_size=200000, num_workers=2)
+            for s in shards:
+                other = os.path.join(other_dir, os.path.basename(s))
+                with open(s, 'rb') as f, open(other, 'rb') as g:
+                    assert f.read() == g.read()
+
+        # transforms and audio settings are applied as usual
+        tfm = transforms.Compose([
+            transforms.MagnitudeSpectrumApproximation(),
+            transforms.ToSeparationModel(),
+        ])
+        stft_params = nussl.STFTParams(
+            window_length=512, hop_length=128, window_type='sqrt_hann')
+        sharded = ShardedDataset(tmpdir, transform=tfm, stft_params=stft_params)
+        data = sharded[3]
+        assert data['index'] == 3
+        assert data['mix_magnitude'].shape[1] == 257
+        assert sharded.process_item(sharded.items[0])['mix'].stft_params == stft_params
+
+        # shuffled streaming with several workers gives every item once
+        sharded = ShardedDataset(tmpdir, shuffle_buffer=4, seed=0)
+        for num_workers in [0, 2, 5]:
+            dataloader = torch.utils.data.DataLoader(
+                sharded, batch_size=None, num_workers=num_workers,
+                collate_fn=lambda x: x)
+            paths = [d['mix'].path_to_input_file for d in dataloader]
+            assert sorted(paths) == sorted(
+                dataset[i]['mix'].path_to_input_file for i in range(len(dataset)))
+        order = [d['mix'].path_to_input_file for d in sharded]
+        assert order != sorted(order)
+        assert order == [d['mix'].path_to_input_file for d in sharded]
+        sharded.set_epoch(1)
+        assert order != [d['mix'].path_to_input_file for d in sharded]
+
+        # shards are closed on close and at the end of a with block
+        handles = list(sharded._handles.values())
+        assert handles
+        sharded.close()
+        assert all(h.closed for h in handles) and not sharded._handles
+        with ShardedDataset(tmpdir) as sharded:
+            _check_same(sharded[0], dataset[0])
+            handles = list(sharded._handles.values())
+        assert all(h.closed for h in handles)
+
+
+class _TupleItems(nussl.datasets.MixSourceFolder):
+    def process_item(self, item):
+        data = super().process_item(item)
+        data['pair'] = (data['sources']['s1'], [data['sources']['s2'], 'label'])
+        return data
+
+
+def test_sharded_dataset_tuples(variable_length_folder):
+    dataset = _TupleItems(variable_length_folder)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_shards(dataset, tmpdir)
+        with ShardedDataset(tmpdir) as sharded:
+            pair = sharded[0]['pair']
+        expected = dataset[0]['pair']
+        assert isinstance(pair, tuple) and isinstance(pair[1], list)
+        assert isinstance(pair[0], nussl.AudioSignal)
+        assert np.allclose(pair[0].audio_data, expected[0].audio_data)
+        assert np.allclose(pair[1][0].audio_data, expected[1][0].audio_data)
+        assert pair[1][1] == 'label'
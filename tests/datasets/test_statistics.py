@@ -0,0 +1,128 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+import torch
+
+import nussl
+from nussl.datasets import compute_statistics, DatasetStatistics, transforms
+from nussl.datasets.statistics import RunningMoments
+
+
+def test_running_moments():
+    values = np.random.randn(1000, 3) * 5 + 2
+    moments = RunningMoments()
+    for chunk in np.array_split(values, 7):
+        other = RunningMoments()
+        for part in np.array_split(chunk, 3):
+            other.update(part)
+        moments.merge(other)
+    moments.merge(RunningMoments())
+
+    assert moments.count == 1000
+    assert np.allclose(moments.mean, values.mean(axis=0))
+    assert np.allclose(moments.variance, values.var(axis=0))
+    assert np.allclose(moments.std, values.std(axis=0))
+    assert np.isnan(RunningMoments().variance)
+
+    loaded = RunningMoments.from_dict(moments.to_dict())
+    assert np.allclose(loaded.mean, moments.mean)
+    assert np.allclose(loaded.m2, moments.m2)
+
+
+def test_compute_statistics(variable_length_folder):
+    dataset = nussl.datasets.MixSourceFolder(variable_length_folder)
+    statistics = compute_statistics(dataset)
+
+    magnitudes, loudness, ratios = [], [], {'s1': [], 's2': []}
+    for item in dataset.items:
+        data = dataset.process_item(item)
+        mag = np.abs(data['mix'].stft())
+        magnitudes.append(20 * np.log10(np.maximum(
+            mag.reshape(mag.shape[0], -1).T, 1e-4)))
+        if data['mix'].signal_duration >= 0.4:
+            loudness.append(data['mix'].loudness())
+        for k, v in data['sources'].items():
+            ratios[k].append(10 * np.log10(
+                np.sum(v.audio_data ** 2) / np.sum(data['mix'].audio_data ** 2)))
+    magnitudes = np.concatenate(magnitudes)
+
+    assert np.allclose(statistics.magnitude.mean, magnitudes.mean(axis=0))
+    assert np.allclose(statistics.magnitude.variance, magnitudes.var(axis=0))
+    assert np.allclose(statistics.mean, magnitudes.mean())
+    assert np.allclose(statistics.variance, magnitudes.var())
+    assert np.allclose(statistics.loudness.mean, np.mean(loudness))
+    assert statistics.loudness.count == len(loudness)
+    # the mean ratios are close to 0 dB, so they are compared with an absolute
+    # tolerance
+    for k in ratios:
+        assert np.allclose(
+            statistics.source_ratios[k].mean, np.mean(ratios[k]), atol=1e-6)
+        assert np.allclose(
+            statistics.source_ratios[k].variance, np.var(ratios[k]), atol=1e-6)
+
+    # workers give the same result
+    parallel = compute_statistics(dataset, num_workers=2)
+    assert np.allclose(parallel.magnitude.mean, statistics.magnitude.mean)
+    assert np.allclose(parallel.magnitude.variance, statistics.magnitude.variance)
+
+    linear = compute_statistics(dataset, to_db=False)
+    assert not linear.to_db
+    assert np.all(linear.magnitude.mean >= 0)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # saved next to the cache
+        cache_location = os.path.join(tmpdir, 'cache')
+        tfm = transforms.Compose([
+            transforms.MagnitudeSpectrumApproximation(),
+            transforms.ToSeparationModel(),
+            transforms.Cache(cache_location, overwrite=True),
+        ])
+        dataset.transform = tfm
+        dataset.cache_populated = False
+        compute_statistics(dataset)
+        path = os.path.join(cache_location, 'statistics.yml')
+        assert os.path.exists(path)
+
+        loaded = DatasetStatistics.load(path)
+        assert np.allclose(loaded.magnitude.mean, statistics.magnitude.mean)
+        assert np.allclose(loaded.loudness.m2, statistics.loudness.m2)
+        assert set(loaded.source_ratios) == {'s1', 's2'}
+        assert loaded.to_db
+
+        other_path = os.path.join(tmpdir, 'stats.yml')
+        compute_statistics(dataset, path=other_path)
+        assert os.path.exists(other_path)
+
+
+def test_statistics_load_into():
+    num_frequencies = 129
+    magnitudes = np.random.randn(500, num_frequencies) * 3 + 10
+    statistics = DatasetStatistics(RunningMoments.from_values(magnitudes))
+
+    config = nussl.ml.networks.builders.build_recurrent_dpcl(
+        num_frequencies, 10, 1, True, 0.0, 5, 'sigmoid')
+    model = nussl.ml.SeparationModel(config)
+    statistics.load_into(model)
+    batch_norm = model.layers['normalization'].batch_norm
+    assert np.allclose(batch_norm.running_mean.item(), magnitudes.mean())
+    assert np.allclose(batch_norm.running_var.item(), magnitudes.var())
+
+    norm = nussl.ml.networks.modules.BatchNorm(num_features=num_frequencies)
+    statistics.load_into(norm)
+    norm.eval()
+    data = torch.from_numpy(magnitudes[None, :, :, None]).float()
+    output = norm(data).detach().numpy()
+    assert np.allclose(output.mean(axis=(0, 1, 3)), 0, atol=1e-4)
+    assert np.allclose(output.std(axis=(0, 1, 3)), 1, atol=1e-3)
+
+    shift_and_scale = nussl.ml.networks.modules.ShiftAndScale()
+    statistics.load_into(shift_and_scale)
+    output = shift_and_scale(data).detach().numpy()
+    assert np.allclose(output.mean(), 0, atol=1e-4)
+    assert np.allclose(output.std(), 1, atol=1e-3)
+
+    pytest.raises(ValueError, statistics.load_into,
+                  nussl.ml.networks.modules.BatchNorm(num_features=10))
+    pytest.raises(ValueError, statistics.load_into, torch.nn.Linear(2, 2))
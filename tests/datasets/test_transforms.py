@@ -6,6 +6,7 @@ from nussl import STFTParams, evaluation
 import numpy as np
 from nussl.core.masks import BinaryMask, SoftMask
 import itertools
+import random
 import copy
 import torch
 import tempfile
@@ -114,6 +115,60 @@ def test_transform_msa_psa(musdb_tracks):
             assert diff.mean() > 10
 
 
+def test_transform_compute_source_stfts(monkeypatch):
+    np.random.seed(0)
+    sources = [
+        nussl.AudioSignal(audio_data_array=np.random.randn(2, 8000), sample_rate=8000)
+        for _ in range(3)
+    ]
+    stfts = transforms.compute_source_stfts(sources)
+    assert stfts.shape == sources[0].stft_data.shape + (3,)
+
+    for i, s in enumerate(sources):
+        assert np.allclose(stfts[..., i], s.stft_data)
+        assert np.allclose(stfts[..., i], s.stft(overwrite=False))
+
+    # sources that can't be stacked are transformed one by one
+    sources[1].stft_params = STFTParams(window_length=256, hop_length=64, window_type='hann')
+    stfts = transforms.compute_source_stfts(sources)
+    for i, s in enumerate(sources):
+        assert np.allclose(stfts[..., i], s.stft(overwrite=False))
+
+    # with the librosa STFT or a custom stft, every source uses its own stft()
+    calls = []
+    audio_signal_stft = nussl.AudioSignal.stft
+
+    def counting_stft(self, *args, **kwargs):
+        calls.append(self)
+        return audio_signal_stft(self, *args, **kwargs)
+
+    class _Signal(nussl.AudioSignal):
+        stft = counting_stft
+
+    sources = [
+        _Signal(audio_data_array=np.random.randn(2, 8000), sample_rate=8000)
+        for _ in range(3)
+    ]
+    transforms.compute_source_stfts(sources)
+    assert calls == sources
+
+    calls.clear()
+    sources = [
+        nussl.AudioSignal(audio_data_array=np.random.randn(2, 8000), sample_rate=8000)
+        for _ in range(3)
+    ]
+    monkeypatch.setattr(nussl.core.constants, 'USE_LIBROSA_STFT', True)
+    monkeypatch.setattr(nussl.AudioSignal, 'stft', counting_stft)
+    stfts = transforms.compute_source_stfts(sources)
+    assert calls == sources
+    for i, s in enumerate(sources):
+        assert np.allclose(stfts[..., i], s.stft_data)
+    monkeypatch.undo()
+
+    ibm = transforms.compute_ideal_binary_mask(np.array([[1., 2., 0.], [1., 1., 0.]]))
+    assert np.array_equal(ibm, [[0., 1., 0.], [0., 0., 0.]])
+
+
 def test_transform_sum_sources(musdb_tracks):
     track = musdb_tracks[10]
     mix, sources = nussl.utils.musdb_track_to_audio_signals(track)
@@ -320,6 +375,176 @@ def test_transform_get_excerpt(musdb_tracks):
             data['source_audio'].sum(dim=-1), data['mix_audio'], atol=1e-3)
 
 
+def test_transform_get_audio_excerpt():
+    np.random.seed(0)
+
+    def make_item(length):
+        sources = {
+            k: nussl.AudioSignal(
+                audio_data_array=np.random.randn(1, length), sample_rate=16000)
+            for k in ['s2', 's1']
+        }
+        return {'mix': sum(sources.values()), 'sources': sources}
+
+    pytest.raises(TransformException, transforms.GetAudioExcerpt, 1)
+    pytest.raises(TransformException, transforms.GetAudioExcerpt(10), {})
+    pytest.raises(TransformException, transforms.GetAudioExcerpt(2), make_item(16000))
+    assert 'GetAudioExcerpt' in str(transforms.GetAudioExcerpt(10))
+
+    for length in [1000, 16000, 160000]:
+        for excerpt_length in [10, 100, 400]:
+            data = make_item(length)
+            mix = data['mix']
+            exc = transforms.GetAudioExcerpt(excerpt_length)
+            data = exc(data)
+            assert data['mix'].stft().shape[1] == excerpt_length
+            for key, source in data['sources'].items():
+                assert source.stft().shape[1] == excerpt_length
+            assert np.allclose(
+                sum(data['sources'].values()).audio_data, data['mix'].audio_data)
+            if length > excerpt_length * mix.stft_params.hop_length:
+                assert data['mix'].is_view
+                assert np.shares_memory(data['mix'].audio_data, mix.audio_data)
+
+    def make_pipeline(excerpt_first):
+        return transforms.Compose([
+            transforms.PhaseSensitiveSpectrumApproximation(),
+            transforms.MagnitudeWeights(),
+            transforms.ToSeparationModel(),
+            transforms.GetExcerpt(100),
+        ], excerpt_first=excerpt_first)
+
+    com = make_pipeline(True)
+    assert isinstance(com.transforms[0], transforms.GetAudioExcerpt)
+    assert not any(isinstance(t, transforms.GetExcerpt) for t in com.transforms)
+
+    item = make_item(160000)
+    for seed in range(3):
+        random.seed(seed)
+        full = make_pipeline(False)(copy.deepcopy(item))
+        random.seed(seed)
+        excerpt = make_pipeline(True)(copy.deepcopy(item))
+        for key in ['mix_magnitude', 'source_magnitudes', 'ideal_binary_mask', 'weights']:
+            assert full[key].shape == excerpt[key].shape
+        # only the frames at the edges see zero-padding instead of audio
+        assert torch.allclose(
+            full['mix_magnitude'][2:-2], excerpt['mix_magnitude'][2:-2], atol=1e-4)
+
+    # excerpts aren't moved ahead of a cache or for custom keys
+    with tempfile.TemporaryDirectory() as tmpdir:
+        com = transforms.Compose([
+            transforms.MagnitudeSpectrumApproximation(),
+            transforms.Cache(os.path.join(tmpdir, 'cache'), overwrite=True),
+            transforms.GetExcerpt(100),
+        ], excerpt_first=True)
+        assert isinstance(com.transforms[-1], transforms.GetExcerpt)
+
+    com = transforms.Compose([
+        transforms.GetAudio(),
+        transforms.GetExcerpt(100, tf_keys=['mix_audio']),
+    ], excerpt_first=True)
+    assert isinstance(com.transforms[-1], transforms.GetExcerpt)
+
+    # nor when the pipeline also returns audio, which GetExcerpt doesn't crop
+    def make_audio_pipeline(excerpt_first):
+        return transforms.Compose([
+            transforms.PhaseSensitiveSpectrumApproximation(),
+            transforms.GetAudio(),
+            transforms.ToSeparationModel(),
+            transforms.GetExcerpt(100),
+        ], excerpt_first=excerpt_first)
+
+    com = make_audio_pipeline(True)
+    assert isinstance(com.transforms[-1], transforms.GetExcerpt)
+    full = make_audio_pipeline(False)(copy.deepcopy(item))
+    excerpt = com(copy.deepcopy(item))
+    for key in ['mix_magnitude', 'mix_audio', 'source_audio']:
+        assert full[key].shape == excerpt[key].shape
+
+
+def test_transform_profiler():
+    np.random.seed(0)
+    sources = {
+        k: nussl.AudioSignal(audio_data_array=np.random.randn(1, 16000), sample_rate=16000)
+        for k in ['s1', 's2']
+    }
+
+    profiler = transforms.TransformProfiler(track_memory=True)
+    assert 'TransformProfiler' in str(profiler)
+    com = transforms.Compose([
+        transforms.MagnitudeSpectrumApproximation(),
+        transforms.MagnitudeWeights(),
+        transforms.MagnitudeWeights(),
+        transforms.ToSeparationModel(),
+    ], profiler=profiler)
+    assert com.stage_names == [
+        'MagnitudeSpectrumApproximation', 'MagnitudeWeights_0', 
+        'MagnitudeWeights_1', 'ToSeparationModel']
+
+    for _ in range(3):
+        data = {'mix': sum(sources.values()), 'sources': copy.deepcopy(sources)}
+        com(data)
+
+    summary = profiler.summary()
+    assert list(summary.keys()) == com.stage_names
+    for stage in summary.values():
+        assert stage['count'] == 3
+        assert stage['mean_time'] > 0
+        assert stage['total_time'] >= stage['mean_time']
+    msa = summary['MagnitudeSpectrumApproximation']
+    assert msa['mean_allocated'] > 0
+    assert msa['mean_output_bytes'] > (
+        data['mix_magnitude'].element_size() * data['mix_magnitude'].nelement())
+
+    table = profiler.table()
+    for name in com.stage_names:
+        assert name in table
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        other = transforms.TransformProfiler(folder=tmpdir, flush_every=1)
+        other.record('process_item', 1.0, 10, 20)
+        # pretend these came from another process
+        os.rename(other._path(), other._path(pid=0))
+        other.reset()
+
+        profiler.folder = tmpdir
+        collected = profiler.collect()
+        assert collected.stats['process_item'] == {
+            'count': 1, 'time': 1.0, 'allocated': 10, 'output_bytes': 20}
+        assert collected.stats['ToSeparationModel']['count'] == 3
+        assert 'process_item' not in profiler.stats
+
+    profiler.reset()
+    assert not profiler.stats
+
+    # every DataLoader worker writes its last records when it exits, and files
+    # from earlier runs are cleared
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stale = transforms.TransformProfiler(folder=tmpdir, flush_every=1)
+        stale.record('_ProfiledItems', 1.0)
+        os.rename(stale._path(), stale._path(pid=0))
+
+        profiler = transforms.TransformProfiler(folder=tmpdir, flush_every=1000)
+        assert not os.listdir(tmpdir)
+        dataloader = torch.utils.data.DataLoader(
+            _ProfiledItems(10, profiler), batch_size=None, num_workers=2)
+        assert len(list(dataloader)) == 10
+        collected = profiler.collect()
+        assert collected.stats['_ProfiledItems']['count'] == 10
+
+
+class _ProfiledItems(torch.utils.data.Dataset):
+    def __init__(self, length, profiler):
+        self.length = length
+        self.profiler = profiler
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        return self.profiler.profile('_ProfiledItems', np.ones, 10)
+
+
 def test_transform_cache(musdb_tracks):
     track = musdb_tracks[10]
     mix, sources = nussl.utils.musdb_track_to_audio_signals(track)
@@ -244,6 +244,150 @@ def test_bss_eval_v4(estimated_and_true_sources):
             assert np.alltrue(_oracle > _random)
 
 
+def test_bss_eval_v4_matches_museval():
+    import museval
+
+    rng = np.random.default_rng(0)
+    references = rng.standard_normal((20000, 2, 3))
+    mixing = np.eye(3) + 0.3 * rng.standard_normal((3, 3))
+    estimates = references @ mixing + 0.1 * rng.standard_normal(references.shape)
+    # a silent window
+    estimates[8000:9000, :, 1] = 0
+
+    kwargs = [
+        {'window': 4000, 'hop': 3000, 'filters_len': 64},
+        {'window': np.inf, 'hop': np.inf, 'filters_len': 32},
+        {'window': 4000, 'hop': 1000, 'filters_len': 32, 'framewise_filters': True},
+        {'window': 4000, 'hop': 1500.5, 'filters_len': 32,
+         'bsseval_sources_version': True},
+    ]
+    for _kwargs in kwargs:
+        expected = museval.metrics.bss_eval(
+            references.transpose(2, 0, 1), estimates.transpose(2, 0, 1),
+            compute_permutation=False, **_kwargs)[:4]
+        output = nussl.evaluation.bss_eval_v4(references, estimates, **_kwargs)
+        for _expected, _output in zip(expected, output):
+            assert _expected.shape == _output.shape
+            assert np.allclose(_expected, _output, rtol=1e-6, equal_nan=True)
+
+    signals = [
+        nussl.AudioSignal(audio_data_array=x.T, sample_rate=8000)
+        for x in np.moveaxis(np.concatenate([references, estimates], -1), -1, 0)
+    ]
+    true_sources, estimated_sources = signals[:3], signals[3:][::-1]
+    evaluator = nussl.evaluation.BSSEvalV4(
+        true_sources, estimated_sources, compute_permutation=True,
+        window=4000, hop=3000, filters_len=64)
+    scores = evaluator.evaluate()
+    assert scores['permutation'] == (2, 1, 0)
+
+    expected = museval.metrics.bss_eval(
+        references.transpose(2, 0, 1), estimates.transpose(2, 0, 1),
+        compute_permutation=False, window=4000, hop=3000, filters_len=64)[:4]
+    for j, label in enumerate(evaluator.source_labels):
+        for key, _expected in zip(['SDR', 'ISR', 'SIR', 'SAR'], expected):
+            assert np.allclose(
+                scores[label][key], _expected[j], rtol=1e-6, equal_nan=True)
+
+    pytest.raises(
+        ValueError, nussl.evaluation.bss_eval_v4, references, 0 * estimates)
+
+
+def test_bss_eval_windowed_and_parallel():
+    rng = np.random.default_rng(0)
+    references = rng.standard_normal((3, 2, 20000))
+    mixing = np.eye(3) + 0.3 * rng.standard_normal((3, 3))
+    estimates = np.einsum('jcn,jk->kcn', references, mixing)
+    estimates += 0.1 * rng.standard_normal(estimates.shape)
+
+    true_sources = [
+        nussl.AudioSignal(audio_data_array=x, sample_rate=8000) for x in references]
+    estimated_sources = [
+        nussl.AudioSignal(audio_data_array=x, sample_rate=8000) for x in estimates]
+
+    evaluator = nussl.evaluation.BSSEvalScale(true_sources, estimated_sources)
+    scores = evaluator.evaluate()
+    _references, _estimates = evaluator.preprocess()
+    for j, label in enumerate(evaluator.source_labels):
+        for ch in range(2):
+            expected = nussl.evaluation.scale_bss_eval(
+                _references[:, ch], _estimates[:, ch, j], evaluator.mixture[:, ch], j)
+            for key, value in zip(nussl.evaluation.BSSEvalScale.keys, expected):
+                assert np.allclose(scores[label][key][ch], value)
+
+    evaluator = nussl.evaluation.BSSEvalScale(
+        true_sources, estimated_sources, window=4000, hop=4000)
+    scores = evaluator.evaluate()
+    _references, _estimates = evaluator.preprocess()
+    for j, label in enumerate(evaluator.source_labels):
+        values = np.array(scores[label]['SI-SDR']).reshape(5, 2)
+        for t in range(5):
+            w = slice(4000 * t, 4000 * (t + 1))
+            for ch in range(2):
+                expected = nussl.evaluation.scale_bss_eval(
+                    _references[w, ch], _estimates[w, ch, j], 
+                    evaluator.mixture[w, ch], j)
+                assert np.allclose(values[t, ch], expected[0])
+
+    parallel_scores = nussl.evaluation.BSSEvalScale(
+        true_sources, estimated_sources, window=4000, hop=4000, 
+        num_workers=2).evaluate()
+    for label in evaluator.source_labels:
+        for key in nussl.evaluation.BSSEvalScale.keys:
+            assert np.allclose(
+                scores[label][key], parallel_scores[label][key], equal_nan=True)
+
+    kwargs = {'window': 4000, 'hop': 3000, 'filters_len': 64}
+    scores = nussl.evaluation.BSSEvalV4(
+        true_sources, estimated_sources[::-1], compute_permutation=True, 
+        **kwargs).evaluate()
+    parallel_scores = nussl.evaluation.BSSEvalV4(
+        true_sources, estimated_sources[::-1], compute_permutation=True,
+        num_workers=2, **kwargs).evaluate()
+    assert scores['permutation'] == parallel_scores['permutation'] == (2, 1, 0)
+    for label in evaluator.source_labels:
+        for key in ['SDR', 'ISR', 'SIR', 'SAR']:
+            assert np.allclose(
+                scores[label][key], parallel_scores[label][key], equal_nan=True)
+
+
+
+def test_bss_eval_scale_silent_reference():
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal((1, 8000))
+    true_sources = [
+        nussl.AudioSignal(audio_data_array=reference, sample_rate=8000),
+        nussl.AudioSignal(audio_data_array=np.zeros((1, 8000)), sample_rate=8000),
+    ]
+    estimated_sources = [
+        nussl.AudioSignal(
+            audio_data_array=reference + 0.1 * rng.standard_normal((1, 8000)), 
+            sample_rate=8000),
+        nussl.AudioSignal(
+            audio_data_array=0.1 * rng.standard_normal((1, 8000)), sample_rate=8000),
+    ]
+
+    # without windows, a silent reference doesn't make the other metrics NaN
+    evaluator = nussl.evaluation.BSSEvalScale(
+        true_sources, estimated_sources, compute_sir_sar=False)
+    scores = evaluator.evaluate()
+    _references, _estimates = evaluator.preprocess()
+    label = evaluator.source_labels[0]
+    expected = nussl.evaluation.scale_bss_eval(
+        _references[:, 0], _estimates[:, 0, 0], evaluator.mixture[:, 0], 0,
+        compute_sir_sar=False)
+    # the mixture is the first reference, so the metrics of the mixture are
+    # only rounding noise
+    for key, value in zip(nussl.evaluation.BSSEvalScale.keys[:6], expected):
+        assert np.allclose(scores[label][key], [value], equal_nan=True)
+    assert scores[label]['SI-SDR'][0] > 15
+
+    # windows where a reference is silent are NaN
+    scores = nussl.evaluation.BSSEvalScale(
+        true_sources, estimated_sources, compute_sir_sar=False, 
+        window=4000, hop=4000).evaluate()
+    assert np.all(np.isnan(scores[evaluator.source_labels[0]]['SI-SDR']))
+
 def test_scale_bss_eval(estimated_and_true_sources):
     true_sources = estimated_and_true_sources['true']
     estimated_sources = estimated_and_true_sources['oracle']
@@ -484,3 +628,204 @@ def test_eval_precision_recall_fscore(estimated_and_true_sources):
 
     scores = evaluator.evaluate()
     check_scores(evaluator)
+
+
+def test_score_store():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_files = []
+        for i in range(10):
+            scores = {'combination': [0, 1], 'permutation': [0, 1]}
+            for source in ['s1', 's2']:
+                scores[source] = {
+                    metric: rng.standard_normal(rng.integers(1, 5)).tolist()
+                    for metric in ['SI-SDR', 'SI-SIR']
+                }
+            scores['s1']['SI-SDR'][0] = np.nan
+            save_scores(tmpdir, scores, f'{i}')
+            json_files.append(os.path.join(tmpdir, f'{i}.json'))
+
+        location = os.path.join(tmpdir, 'scores.zarr')
+        store = nussl.evaluation.ScoreStore(location)
+        assert store.add_score_files(json_files[:4]) == 4
+        assert store.add_score_files(json_files) == 6
+        assert store.add_score_files(json_files) == 0
+
+        with open(json_files[0], 'r') as f:
+            scores = json.load(f)
+        assert not store.add(scores, '0.json')
+        assert store.add(scores, 'extra')
+        assert 'extra' in store
+
+        # the store is read back from disk
+        store = nussl.evaluation.ScoreStore(location)
+        assert store.files == [f'{i}.json' for i in range(10)] + ['extra']
+        assert store.sources == ['s1', 's2']
+        assert store.metrics == ['SI-SDR', 'SI-SIR']
+        columns = store.columns()
+        assert len(store) == columns['value'].shape[0]
+        assert set(columns) == {'source', 'file', 'metric', 'window', 'value'}
+
+        for aggregator in [np.nanmedian, np.nanmean, np.nanmax]:
+            expected = nussl.evaluation.aggregate_score_files(
+                json_files, aggregator=aggregator)
+            df = store.to_frame(aggregator=aggregator)
+            df = df[df['file'] != 'extra'].reset_index(drop=True)
+            assert expected.equals(df)
+            assert list(df.columns) == ['source', 'file', 'SI-SDR', 'SI-SIR']
+            assert list(df['source']) == ['s1'] * 10 + ['s2'] * 10
+            assert list(df['file']) == [f'{i}.json' for i in range(10)] * 2
+            for metric in ['SI-SDR', 'SI-SIR']:
+                for i in range(10):
+                    for source in ['s1', 's2']:
+                        with open(json_files[i], 'r') as f:
+                            values = json.load(f)[source][metric]
+                        row = (df['file'] == f'{i}.json') & (df['source'] == source)
+                        assert np.allclose(
+                            df[row][metric].values, aggregator(values), 
+                            equal_nan=True)
+
+        report_card = nussl.evaluation.report_card(store, 'Testing notes')
+        assert 'Testing notes' in report_card
+        assert 'SI-SDR' in report_card
+
+        # rows that were not committed are dropped when the store is opened
+        store.group['value'].append(np.zeros(3))
+        store = nussl.evaluation.ScoreStore(location)
+        assert store.group['value'].shape[0] == len(store)
+
+
+def test_evaluation_cache(monkeypatch):
+    rng = np.random.default_rng(0)
+    references = rng.standard_normal((2, 1, 8000))
+    estimates = references[::-1] + 0.1 * rng.standard_normal(references.shape)
+
+    def _signals(data):
+        return [nussl.AudioSignal(audio_data_array=x, sample_rate=8000) for x in data]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = nussl.evaluation.EvaluationCache(tmpdir)
+        evaluator = nussl.evaluation.BSSEvalScale(
+            _signals(references), _signals(estimates), compute_permutation=True,
+            cache=cache)
+        scores = evaluator.evaluate()
+        assert len(cache) == 1
+        assert scores['permutation'] == (1, 0)
+
+        def _fail(*args, **kwargs):
+            raise RuntimeError('should have been cached')
+
+        # same signals and settings: the results come from the cache
+        with monkeypatch.context() as m:
+            m.setattr(nussl.evaluation.BSSEvalScale, 'evaluate_helper', _fail)
+            evaluator = nussl.evaluation.BSSEvalScale(
+                _signals(references), _signals(estimates), compute_permutation=True,
+                cache=tmpdir)
+            assert evaluator.evaluate() == scores
+            assert evaluator.scores == scores
+
+            # different estimates, evaluator or arguments all miss the cache
+            for evaluator in [
+                nussl.evaluation.BSSEvalScale(
+                    _signals(references), _signals(estimates + 0.1), cache=cache),
+                nussl.evaluation.BSSEvalScale(
+                    _signals(references), _signals(estimates), cache=cache),
+                nussl.evaluation.BSSEvalScale(
+                    _signals(references), _signals(estimates), compute_permutation=True,
+                    window=4000, cache=cache),
+            ]:
+                pytest.raises(RuntimeError, evaluator.evaluate)
+
+        masks = [BinaryMask(rng.random((100, 10, 1)) > .5) for _ in range(2)]
+        evaluator = nussl.evaluation.PrecisionRecallFScore(masks, masks, cache=cache)
+        scores = evaluator.evaluate()
+        assert len(cache) == 2
+        evaluator = nussl.evaluation.PrecisionRecallFScore(masks, masks, cache=cache)
+        assert evaluator.evaluate() == scores
+        mask_key = nussl.evaluation.evaluation_key(evaluator, *evaluator.preprocess())
+        assert mask_key in cache
+
+        # the least recently used results are evicted past max_size
+        size = sum(os.path.getsize(p) for p in glob.glob(f'{tmpdir}/*.pkl'))
+        cache = nussl.evaluation.EvaluationCache(tmpdir, max_size=size)
+        nussl.evaluation.BSSEvalScale(
+            _signals(references), _signals(estimates), compute_permutation=True,
+            cache=cache).evaluate()
+        evaluator = nussl.evaluation.BSSEvalScale(
+            _signals(references), _signals(estimates + 0.1), cache=cache)
+        key = nussl.evaluation.evaluation_key(evaluator, *evaluator.preprocess())
+        evaluator.evaluate()
+        assert key in cache
+        assert mask_key not in cache
+        assert cache._size <= size
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+def test_precision_recall_fscore_permutations():
+    import sklearn.metrics
+    from itertools import combinations, permutations
+
+    rng = np.random.default_rng(0)
+    references = [BinaryMask(rng.random((50, 20, 2)) > .5) for _ in range(3)]
+    # estimates are noisy copies of the references, shuffled, plus two random masks
+    estimates = [
+        BinaryMask(np.logical_xor(r.mask, rng.random(r.mask.shape) > .8))
+        for r in references
+    ]
+    estimates = [estimates[2], BinaryMask(rng.random((50, 20, 2)) > .5),
+                 estimates[0], estimates[1], BinaryMask(np.zeros((50, 20, 2)))]
+
+    evaluator = nussl.evaluation.PrecisionRecallFScore(
+        references, estimates[2:4] + estimates[:1])
+    _references, _estimates = evaluator.preprocess()
+    scores = evaluator.evaluate_helper(_references, _estimates)
+    sklearn_metrics = {
+        'Accuracy': sklearn.metrics.accuracy_score,
+        'Precision': sklearn.metrics.precision_score,
+        'Recall': sklearn.metrics.recall_score,
+        'F1-Score': sklearn.metrics.f1_score,
+    }
+    for j in range(3):
+        for key, fn in sklearn_metrics.items():
+            for ch in range(2):
+                expected = fn(_references[:, ch, j], _estimates[:, ch, j])
+                assert np.allclose(scores[j][key][ch], expected)
+
+    tp, fp, fn, tn = nussl.evaluation.mask_counts(_references, _estimates)
+    assert tp.shape == (2, 3, 3)
+    assert np.all(tp + fp + fn + tn == _references.shape[0])
+
+    evaluator = nussl.evaluation.PrecisionRecallFScore(
+        references, estimates, compute_permutation=True)
+    scores = evaluator.evaluate()
+    assert scores['combination'] == (0, 2, 3)
+    assert scores['permutation'] == (2, 0, 1)
+
+    # the same as trying every candidate with evaluate_helper
+    _references, _estimates = evaluator.preprocess()
+    best, best_value = None, -np.inf
+    for combo in combinations(range(5), 3):
+        for order in permutations(range(3)):
+            _scores = evaluator.evaluate_helper(
+                _references[..., order], _estimates[..., combo])
+            value = np.mean([_s['F1-Score'] for _s in _scores])
+            if value > best_value:
+                best, best_value = (combo, order, _scores), value
+    combo, order, _scores = best
+    assert scores['combination'] == combo
+    assert scores['permutation'] == order
+    for i, j in enumerate(order):
+        assert scores[evaluator.source_labels[j]] == _scores[i]
+
+    # a key that is not a metric falls back to the first metric, like
+    # EvaluationBase does without compute_permutation
+    for compute_permutation, _estimates in [
+            (True, estimates), (False, estimates[2:4] + estimates[:1])]:
+        scores = nussl.evaluation.PrecisionRecallFScore(
+            references, _estimates, compute_permutation=compute_permutation,
+            best_permutation_key='SI-SDR').evaluate()
+        assert scores == nussl.evaluation.PrecisionRecallFScore(
+            references, _estimates, compute_permutation=compute_permutation,
+            best_permutation_key='Accuracy').evaluate()
@@ -141,3 +141,94 @@ def test_learned_filterbank(one_item):
     decoded = representation(encoded, 'inverse')
 
     assert decoded.shape == data.shape
+
+
+def test_filter_bank_convolutions():
+    torch.manual_seed(0)
+    data = torch.randn(2, 2, 4000)
+
+    for filter_length, hop_length, dilation in [(256, 64, 1), (64, 16, 2)]:
+        representation = ml.networks.modules.LearnedFilterBank(
+            filter_length, hop_length=hop_length, dilation=dilation)
+        encoded = representation(data, 'transform')
+
+        # same as multiplying windowed, overlapping segments with the filters
+        padded = torch.nn.functional.pad(
+            data, (filter_length // 2, filter_length // 2 + 
+                   (-(data.shape[-1] - filter_length) % hop_length) % filter_length))
+        unfold = torch.nn.Unfold(
+            kernel_size=(1, filter_length), stride=(1, hop_length), dilation=dilation)
+        frames = unfold(padded.reshape(4, 1, 1, -1)).view(2, 2, filter_length, -1)
+        frames = frames.permute(0, 3, 1, 2) * representation.window.view(-1)
+        expected = (frames @ representation.transform_filters).transpose(-1, -2)
+        assert torch.allclose(encoded, expected, atol=1e-5)
+
+        decoded = representation(encoded, 'inverse')
+        assert decoded.shape == data.shape
+        decoded.sum().backward()
+        assert representation.transform_filters.grad is not None
+
+    representation = ml.networks.modules.STFT(512, hop_length=128)
+    encoded = representation(data, 'transform')
+    decoded = representation(encoded, 'inverse')
+    assert (decoded - data).abs().max() < 1e-5
+
+    audio_signal = nussl.AudioSignal(
+        audio_data_array=data[0].numpy(), sample_rate=16000,
+        stft_params=nussl.STFTParams(512, 128, 'sqrt_hann'))
+    nussl_magnitude = np.abs(audio_signal.stft())
+    magnitude = encoded[0, :, :257].permute(1, 0, 2).numpy()
+    assert np.abs(magnitude - nussl_magnitude).max() < 1e-6
+
+    # the convolution weights are cached until the filters change
+    representation.direction = 'transform'
+    weight = representation.get_weight()
+    assert representation.get_weight() is weight
+    with torch.no_grad():
+        representation.transform_filters.mul_(2)
+    assert torch.allclose(representation.get_weight(), 2 * weight)
+
+    # apply_filter still works when called, but is deprecated and no longer used
+    frames = torch.randn(2, 10, 512, 1)
+    with pytest.warns(FutureWarning):
+        filtered = representation.apply_filter(frames)
+    expected = (frames.transpose(-1, 2) @ representation.transform_filters)
+    assert torch.allclose(filtered, expected.transpose(-1, 2))
+
+    with pytest.warns(FutureWarning, match='apply_filter'):
+        class _OldFilterBank(ml.networks.modules.LearnedFilterBank):
+            def apply_filter(self, data, **kwargs):
+                return data
+
+
+def test_filter_bank_streaming():
+    torch.manual_seed(0)
+    representation = ml.networks.modules.STFT(256, hop_length=64)
+    data = torch.randn(2, 1, 3000, 3)
+
+    encoded = representation(data, 'transform')
+    decoded = representation(encoded, 'inverse')
+
+    representation.start_stream()
+    frames, audio = [], []
+    padded = torch.cat([data, torch.zeros(2, 1, 256, 3)], dim=-2)
+    for block in torch.split(padded, 200, dim=-2):
+        _frames = representation(block, 'transform')
+        frames.append(_frames)
+        audio.append(representation(_frames, 'inverse'))
+    frames = torch.cat(frames, dim=1)
+    audio = torch.cat(audio, dim=-2)
+    representation.stop_stream()
+
+    num_frames = encoded.shape[1]
+    assert torch.allclose(
+        frames[:, :num_frames, :129], encoded[:, :, :129], atol=1e-5)
+    assert audio.shape[-2] >= data.shape[-2]
+    assert torch.allclose(audio[..., :3000, :], decoded, atol=1e-5)
+    assert torch.allclose(audio[..., :3000, :], data, atol=1e-5)
+
+    # blocks too short for a frame return no frames and no samples
+    representation.start_stream()
+    _frames = representation(torch.randn(1, 1, 10), 'transform')
+    assert _frames.shape == (1, 0, 258, 1)
+    assert representation(_frames, 'inverse').shape == (1, 1, 0)
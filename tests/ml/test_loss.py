@@ -210,3 +210,100 @@ def test_combination_invariant_loss_sdr():
                 [sources_a, sources_b, sources_c], dim=-1)
             _loss_b = LossCPIT(shifted_sources, references).item()
             assert np.allclose(_loss_a, _loss_b, atol=1e-4)
+
+
+def test_pairwise_invariant_losses():
+    n_batch = 4
+    n_samples = 1000
+
+    def _brute_force(estimates, references, loss_function):
+        # best mean loss over every assignment, for each item
+        n_targets, n_estimates = references.shape[-1], estimates.shape[-1]
+        best = []
+        for b in range(n_batch):
+            losses = []
+            for p in permutations(range(n_estimates), n_targets):
+                loss = loss_function(
+                    estimates[b:b + 1, ..., list(p)], references[b:b + 1])
+                losses.append(loss.mean())
+            best.append(torch.stack(losses).min())
+        return torch.stack(best).mean()
+
+    for n_sources in [3, 6]:
+        references = torch.randn(n_batch, n_samples, n_sources)
+        estimates = references + 0.5 * torch.randn(n_batch, n_samples, n_sources)
+        # every item has its own permutation
+        estimates = torch.stack([
+            e[:, torch.randperm(n_sources)] for e in estimates])
+        estimates.requires_grad_(True)
+
+        for loss_function in [ml.train.loss.SISDRLoss(), ml.train.loss.L1Loss()]:
+            LossPIT = ml.train.loss.PermutationInvariantLoss(
+                loss_function=loss_function, pairwise=True)
+            _loss = LossPIT(estimates, references)
+            loss_function.reduction = 'none'
+            expected = _brute_force(estimates, references, loss_function)
+            assert np.allclose(_loss.item(), expected.item(), atol=1e-4)
+
+            _loss.backward()
+            assert estimates.grad is not None
+            estimates.grad = None
+            if isinstance(loss_function, ml.train.loss.SISDRLoss):
+                _sdr_loss = _loss
+
+        # with the default loss, the permutation is also picked per item for SI-SDR
+        LossPIT = ml.train.loss.PermutationInvariantLoss(
+            loss_function=ml.train.loss.SISDRLoss())
+        if n_sources == 3:
+            assert np.allclose(
+                LossPIT(estimates, references).item(), _sdr_loss.item(), atol=1e-4)
+
+    references = torch.randn(n_batch, n_samples, 2)
+    estimates = torch.cat([
+        torch.randn(n_batch, n_samples, 2), 
+        references.flip(-1) + 0.1 * torch.randn(n_batch, n_samples, 2),
+    ], dim=-1)
+    LossCPIT = ml.train.loss.CombinationInvariantLoss(
+        loss_function=ml.train.loss.SISDRLoss(), pairwise=True)
+    _loss = LossCPIT(estimates, references)
+    expected = ml.train.loss.CombinationInvariantLoss(
+        loss_function=ml.train.loss.SISDRLoss())(estimates, references)
+    assert np.allclose(_loss.item(), expected.item(), atol=1e-4)
+
+    # large numbers of assignments are solved with the Hungarian algorithm
+    estimates = torch.cat([estimates, torch.randn(n_batch, n_samples, 10)], dim=-1)
+    _loss = LossCPIT(estimates, references)
+    _expected = _brute_force(
+        estimates, references, ml.train.loss.SISDRLoss(reduction='none'))
+    assert np.allclose(_loss.item(), _expected.item(), atol=1e-4)
+
+
+def test_chunked_clustering_losses():
+    n_batch = 3
+    n_time = 50
+    n_freq = 33
+    n_sources = 3
+    n_embedding = 10
+
+    embedding = torch.randn(n_batch, n_time, n_freq, n_embedding)
+    assignments = (torch.rand(n_batch, n_time, n_freq, n_sources) > .5).float()
+    weights = torch.rand(n_batch, n_time, n_freq)
+
+    for loss_class in [ml.train.loss.DeepClusteringLoss, 
+                       ml.train.loss.WhitenedKMeansLoss]:
+        gradients = []
+        losses = []
+        for chunk_size in [None, 100, 1000, 10 ** 6]:
+            _embedding = embedding.clone().requires_grad_(True)
+            loss = loss_class(chunk_size=chunk_size)(_embedding, assignments, weights)
+            loss.backward()
+            losses.append(loss.item())
+            gradients.append(_embedding.grad)
+
+        for loss, gradient in zip(losses[1:], gradients[1:]):
+            assert np.allclose(loss, losses[0], rtol=1e-4)
+            assert torch.allclose(gradient, gradients[0], atol=1e-6)
+
+        with torch.no_grad():
+            loss = loss_class(chunk_size=100)(embedding, assignments, weights)
+        assert np.allclose(loss.item(), losses[0], rtol=1e-4)
@@ -417,3 +417,104 @@ def test_separation_model_repr_and_verbose(one_item):
     model = SeparationModel(end_to_end_real_config, verbose=True)
     print(model)
     model(one_item)
+
+
+def test_separation_model_streaming():
+    torch.manual_seed(0)
+    # unidirectional end-to-end model, fed blocks of samples
+    config = builders.build_recurrent_end_to_end(
+        256, 256, 64, 'sqrt_hann', 50, 2, False, 0.0, 2, 'softmax')
+    model = SeparationModel(config)
+    mix_audio = torch.randn(1, 1, 4000)
+
+    pytest.raises(ValueError, model.stream, {'mix_audio': mix_audio})
+    pytest.raises(ValueError, model.start_stream)
+    model.eval()
+
+    with torch.no_grad():
+        expected = model({'mix_audio': mix_audio})['audio']
+        model.start_stream()
+        blocks = torch.split(
+            torch.cat([mix_audio, torch.zeros(1, 1, 224)], dim=-1), 128, dim=-1)
+        audio = torch.cat(
+            [model.stream({'mix_audio': b})['audio'] for b in blocks], dim=-2)
+        model.stop_stream()
+
+    assert not model.streaming
+    assert audio.shape[-2] >= expected.shape[-2]
+    # the end of the whole signal is covered by fewer frames
+    assert torch.allclose(audio[:, :, :3872], expected[:, :, :3872], atol=1e-5)
+
+    # unidirectional mask inference, fed one frame at a time
+    config = builders.build_recurrent_mask_inference(
+        n_features, 50, 2, False, 0.0, 2, 'softmax')
+    model = SeparationModel(config).eval()
+    mix_magnitude = torch.rand(1, 40, n_features, 1)
+
+    with torch.no_grad():
+        expected = model({'mix_magnitude': mix_magnitude})['estimates']
+        model.start_stream()
+        estimates = torch.cat([
+            model.stream({'mix_magnitude': mix_magnitude[:, i:i + 1]})['estimates']
+            for i in range(mix_magnitude.shape[1])
+        ], dim=1)
+        # starting again resets the state
+        model.start_stream()
+        first = model.stream({'mix_magnitude': mix_magnitude[:, :1]})['estimates']
+    assert torch.allclose(estimates, expected, atol=1e-6)
+    assert torch.allclose(first, expected[:, :1], atol=1e-6)
+
+    # models that look at the whole sequence can't be streamed
+    for config in [mi_config, dual_path_recurrent_config]:
+        model = SeparationModel(config).eval()
+        pytest.raises(ValueError, model.start_stream)
+
+
+def test_separation_model_quantize():
+    torch.manual_seed(0)
+    mix_magnitude = torch.rand(1, 40, n_features, 1)
+    model = SeparationModel(mi_config).eval()
+    quantized = model.quantize()
+
+    assert model.quantization is None
+    assert quantized.quantization == 'qint8'
+    assert not any(
+        type(m) in (nn.LSTM, nn.GRU, nn.Linear) for m in quantized.modules())
+    pytest.raises(ValueError, quantized.quantize)
+
+    with torch.no_grad():
+        expected = model({'mix_magnitude': mix_magnitude})['mask']
+        mask = quantized({'mix_magnitude': mix_magnitude})['mask']
+    assert torch.allclose(mask, expected, atol=5e-2)
+
+    # quantized weights are saved, and loaded back into a quantized model
+    with tempfile.NamedTemporaryFile(suffix='.pth', delete=True) as tmp:
+        quantized.save(tmp.name)
+        model_dict = torch.load(tmp.name, weights_only=False)
+    assert model_dict['quantization'] == 'qint8'
+    loaded = SeparationModel(model_dict['config']).quantize(
+        getattr(torch, model_dict['quantization']))
+    loaded.load_state_dict(model_dict['state_dict'])
+    with torch.no_grad():
+        assert torch.equal(loaded({'mix_magnitude': mix_magnitude})['mask'], mask)
+
+    # dual path models, and streaming with quantized recurrent stacks
+    model = SeparationModel(dual_path_recurrent_config).eval()
+    mix_audio = torch.randn(1, 1, 4000)
+    with torch.no_grad():
+        expected = model({'mix_audio': mix_audio})['audio']
+        audio = model.quantize()({'mix_audio': mix_audio})['audio']
+    assert audio.shape == expected.shape
+
+    config = builders.build_recurrent_mask_inference(
+        n_features, 50, 2, False, 0.0, 2, 'softmax')
+    quantized = SeparationModel(config).quantize(torch.float16)
+    with torch.no_grad():
+        expected = quantized({'mix_magnitude': mix_magnitude})['estimates']
+        quantized.start_stream()
+        estimates = torch.cat([
+            quantized.stream({'mix_magnitude': mix_magnitude[:, i:i + 1]})['estimates']
+            for i in range(mix_magnitude.shape[1])
+        ], dim=1)
+        quantized.stop_stream()
+    assert torch.allclose(estimates, expected, atol=1e-5)
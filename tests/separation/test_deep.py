@@ -278,3 +278,32 @@ def test_separation_deep_audio_estimation(overfit_audio_model):
 
     dae.model.output_keys = []
     pytest.raises(SeparationException, dae.run)
+
+
+def test_deep_mixin_quantize(overfit_model, scaper_folder):
+    model_path, item = overfit_model
+    quantized_path = nussl.separation.base.deep_mixin.quantized_model_path(model_path)
+    if os.path.exists(quantized_path):
+        os.remove(quantized_path)
+
+    separator = separation.deep.DeepMaskEstimation(item['mix'], model_path)
+    quantized = separation.deep.DeepMaskEstimation(
+        item['mix'], model_path, quantize=True)
+    assert separator.model.quantization is None
+    assert quantized.model.quantization == 'qint8'
+    assert quantized.device == 'cpu'
+    assert os.path.exists(quantized_path)
+
+    # loaded from the saved quantized model the next time
+    reloaded = separation.deep.DeepMaskEstimation(
+        item['mix'], model_path, quantize=True)
+    assert reloaded.model.quantization == 'qint8'
+    for estimate, other in zip(quantized(), reloaded()):
+        assert np.allclose(estimate.audio_data, other.audio_data)
+
+    dataset = datasets.Scaper(scaper_folder)
+    scores = separator.compare_quantized(dataset, num_items=1)
+    assert scores['float'].shape == scores['quantized'].shape == (1,)
+    assert np.isfinite(scores['difference'])
+    assert separator.model.quantization is None
+    pytest.raises(SeparationException, quantized.compare_quantized, dataset)
@@ -164,6 +164,38 @@ def test_mask_separation_base(mix_source_folder, monkeypatch):
 
     pytest.raises(SeparationException, separator.make_audio_signals)
 
+    separator = separation.MaskSeparationBase(
+        mix, mask_type='binary', mask_storage='packed')
+    packed_ones = separator.ones_mask(mix.stft().shape)
+    assert packed_ones.storage == 'packed'
+    separator.result_masks = [packed_ones, separator.make_mask(zeros_mask.mask)]
+    estimates = separator.make_audio_signals()
+
+    for e, s in zip(estimates, [masked_ones, masked_zeros]):
+        assert np.allclose(e.audio_data, s.audio_data)
+
+    separator = separation.MaskSeparationBase(mix, mask_storage='uint8')
+    assert separator.make_mask(np.random.rand(100, 10)).storage == 'uint8'
+
+    pytest.raises(ValueError, separation.MaskSeparationBase, mix, 
+        mask_type='soft', mask_storage='packed')
+
+def test_separators_mask_storage():
+    mix = AudioSignal(
+        audio_data_array=np.random.randn(2, 16000), sample_rate=16000)
+
+    separators = [
+        separation.primitive.HPSS(mix, mask_storage='uint8'),
+        separation.spatial.Duet(mix, 2, mask_storage='packed'),
+        separation.spatial.SpatialClustering(mix, 2, mask_storage='float16'),
+    ]
+    for separator in separators:
+        masks = separator.run()
+        assert all(m.storage == separator.mask_storage for m in masks)
+
+    pytest.raises(ValueError, separation.primitive.HPSS, mix, mask_storage='packed')
+
+
 def test_clustering_separation_base(scaper_folder, monkeypatch):
     dataset = datasets.Scaper(scaper_folder)
     item = dataset[5]
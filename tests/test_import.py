@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['torch', 'ignite', 'musdb', 'librosa', 'vamp', 'sklearn', 'museval']
+
+
+def _run(code):
+    result = subprocess.run(
+        [sys.executable, '-c', code], stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_import_is_lazy():
+    loaded = _run(
+        "import sys, nussl; "
+        f"print([m for m in {HEAVY_MODULES} if m in sys.modules])"
+    )
+    assert loaded == '[]'
+
+    loaded = _run(
+        "import sys, nussl; "
+        "nussl.ml.SeparationModel; nussl.separation.primitive.HPSS; "
+        "nussl.datasets.MUSDB18; nussl.evaluation.BSSEvalScale; "
+        "print('torch' in sys.modules, isinstance(nussl.vamp_imported, bool))"
+    )
+    assert loaded == 'True True'
+
+    import nussl
+    for name in ['evaluation', 'datasets', 'ml', 'separation', 'musdb']:
+        assert name in dir(nussl)
+    pytest.raises(AttributeError, getattr, nussl, 'not_an_attribute')
+
+
+def test_import_loads_only_what_is_used():
+    # each subpackage only pulls in the heavy dependencies it needs
+    loaded = _run(
+        "import sys, nussl; nussl.evaluation.BSSEvalScale; "
+        f"print(sorted(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    )
+    assert 'torch' not in loaded and 'ignite' not in loaded
+
+    loaded = _run(
+        "import sys, nussl; nussl.AudioSignal; nussl.STFTParams; "
+        "print(sorted(m for m in sys.modules "
+        "if m.split('.')[0] == 'nussl' and m.count('.') == 1))"
+    )
+    for name in ['nussl.datasets', 'nussl.evaluation', 'nussl.ml', 'nussl.separation']:
+        assert name not in loaded
+
+    # deep separators only load evaluation when comparing quantized models
+    loaded = _run(
+        "import sys, nussl; nussl.separation.deep.DeepMaskEstimation; "
+        "print('nussl.evaluation' in sys.modules)"
+    )
+    assert loaded == 'False'